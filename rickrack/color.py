@@ -56,6 +56,8 @@ class Color(object):
     Color object. Storing rgb, hsv and hex code (hec) color.
     """
 
+    _hec_tables = None
+
     def __init__(self, item, tp=CTP.color, overflow=OTP.cutoff):
         """
         Init Color ojbect.
@@ -449,35 +451,54 @@ class Color(object):
         return np.array((_h, _s, _v), dtype=np.float32)
 
     @classmethod
-    def fmt_hsv_array(cls, hsv_array):
+    def fmt_hsv_array(cls, hsv_array, overflow=OTP.cutoff, out=None):
         """
-        Class method. Format item to standard hsv array.
+        Class method. Format item to standard hsv array in the same way as fmt_hsv. The hsv array is not modified unless it is given as out.
 
         Args:
-            hsv_array (3D array): array item to be formated.
+            hsv_array (array): array item to be formated in shape (..., 3).
+            overflow (int): method to manipulate overflowed s and v values, in "cutoff", "revert" and "repeat".
+            out (array or None): buffer for formated array. None for a new float32 array.
 
         Returns:
             standard hsv array.
         """
 
-        assert isinstance(hsv_array, np.ndarray) and len(hsv_array.shape) == 3 and hsv_array.shape[2] == 3, hsv_array
+        assert isinstance(hsv_array, np.ndarray) and hsv_array.shape[-1:] == (3,), hsv_array
+        assert isinstance(overflow, int) and overflow in OTP.rgfull, overflow
+
+        dtype = hsv_array.dtype if hsv_array.dtype.kind == "f" and overflow == OTP.cutoff else np.float64
 
-        _h = hsv_array[:, :, 0]
-        _s = hsv_array[:, :, 1]
-        _v = hsv_array[:, :, 2]
+        _h = hsv_array[..., 0].astype(dtype)
+        _s = hsv_array[..., 1].astype(dtype)
+        _v = hsv_array[..., 2].astype(dtype)
+
+        if overflow == OTP.cutoff:
+            np.clip(_s, 0.0, 1.0, out=_s)
+            np.clip(_v, 0.0, 1.0, out=_v)
+
+        else:
+            inside = (_h >= 0.0) & (_h < 360.0) & (_s >= 0.0) & (_s <= 1.0) & (_v >= 0.0) & (_v <= 1.0)
 
-        _s[np.where(_s < 0.0)] = 0.0
-        _s[np.where(_s > 1.0)] = 1.0
-        _v[np.where(_v < 0.0)] = 0.0
-        _v[np.where(_v > 1.0)] = 1.0
+            if overflow == OTP.revert:
+                fmt_s = np.where(_s // 1.0 % 2.0 == 0.0, _s % 1.0, 1.0 - (_s % 1.0))
+                fmt_v = np.where(_v // 1.0 % 2.0 == 0.0, _v % 1.0, 1.0 - (_v % 1.0))
+
+            else: # "repeat"
+                fmt_s = _s % 1.0
+                fmt_v = _v % 1.0
+
+            _s = np.where(inside, _s, fmt_s)
+            _v = np.where(inside, _v, fmt_v)
 
         _h = _h % 360.0
 
-        # _h = np.round(_h % 360.0 * 1E5) / 1E5
-        # _s = np.round(_s * 1E5) / 1E5
-        # _v = np.round(_v * 1E5) / 1E5
+        fmt_hsv = np.empty(hsv_array.shape, dtype=np.float32) if out is None else out
+        fmt_hsv[..., 0] = _h
+        fmt_hsv[..., 1] = _s
+        fmt_hsv[..., 2] = _v
 
-        return np.stack((_h, _s, _v), axis=2).astype(np.float32)
+        return fmt_hsv
 
     @classmethod
     def fmt_hec(cls, hec):
@@ -560,13 +581,8 @@ class Color(object):
             standard hex code (hec) color.
         """
 
-        _hec = re.findall(r"[0-9A-F]+", str(hec).upper())
-        _hec = ["" if len(i) < 6 else i[:6] for i in _hec]
-
-        while "" in _hec:
-            _hec.remove("")
-
-        return _hec
+        # first 6 digits of each hex digit run which is not shorter than 6.
+        return re.findall(r"([0-9A-F]{6})[0-9A-F]*", str(hec).upper())
 
     @classmethod
     def spc_rgb2ryb_h(cls, hue):
@@ -1005,6 +1021,82 @@ class Color(object):
 
         return cls.fmt_rgb((r, g, b))
 
+    @classmethod
+    def rgb2hec_array(cls, rgb_array):
+        """
+        Translate rgb array into hex code (hec) array.
+
+        Args:
+            rgb_array (array, tuple or list): rgb array in shape (..., 3).
+
+        Returns:
+            hex code (hec) array in shape (...) and str type.
+        """
+
+        rgb_array = np.asarray(rgb_array)
+
+        assert rgb_array.shape[-1:] == (3,), rgb_array.shape
+
+        if rgb_array.dtype != np.uint8:
+            inside = (rgb_array.min(axis=-1) >= 0) & (rgb_array.max(axis=-1) <= 255)
+            rgb_array = np.where(inside[..., None], rgb_array, np.clip(np.rint(rgb_array), 0, 255)).astype(np.uint8)
+
+        hec_bytes = cls._get_hec_tables()[0][rgb_array].reshape(-1, 6)
+
+        return hec_bytes.view("S6").reshape(rgb_array.shape[:-1]).astype("U6")
+
+    @classmethod
+    def hec2rgb_array(cls, hec_array):
+        """
+        Translate hex code (hec) array into rgb array.
+
+        Args:
+            hec_array (array, tuple or list): hex code (hec) array or list in shape (...).
+
+        Returns:
+            rgb array in shape (..., 3).
+        """
+
+        hec_array = np.asarray(hec_array)
+
+        if hec_array.size == 0:
+            return np.zeros(hec_array.shape + (3,), dtype=np.uint8)
+
+        assert hec_array.dtype.kind == "U", hec_array.dtype
+
+        if hec_array.dtype.itemsize > np.dtype("U6").itemsize:
+            assert (np.char.str_len(hec_array) == 6).all(), hec_array
+
+            hec_array = hec_array.astype("U6")
+
+        # shorter hex codes are padded with null chars, which are invalid in char table.
+        values = cls._get_hec_tables()[1][hec_array.astype("S6").view(np.uint8)]
+
+        if (values > 15).any():
+            raise ValueError("invalid hex code in hec array.")
+
+        values = values.reshape(hec_array.shape + (3, 2))
+
+        return values[..., 0] << 4 | values[..., 1]
+
+    @classmethod
+    def _get_hec_tables(cls):
+        """
+        Get byte tables of hex code (hec). Value (0 ~ 255) to two ascii hex digits, and ascii char to hex digit value (255 for invalid chars).
+        """
+
+        if cls._hec_tables is None:
+            digits = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+            value = np.arange(256, dtype=np.uint8)
+
+            char_table = np.full(256, 255, dtype=np.uint8)
+            char_table[digits] = range(16)
+            char_table[np.frombuffer(b"abcdef", dtype=np.uint8)] = range(10, 16)
+
+            cls._hec_tables = (np.stack((digits[value >> 4], digits[value & 15]), axis=1), char_table)
+
+        return cls._hec_tables
+
     @classmethod
     def hsv2hec(cls, hsv):
         """
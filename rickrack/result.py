@@ -100,16 +100,23 @@ class Grid(object):
         else:
             raise ValueError("Grid size is not a number list: {}".format(grid_size))
 
+        grid_len = int(np.prod(self._grid_size))
+        color_grid = list(color_grid[:grid_len])
+        name_grid = list(name_grid[:grid_len])
+
+        if not all(isinstance(i, str) and len(i) == 6 for i in color_grid):
+            raise ValueError("Color grid is not a hex code list: {}".format(color_grid))
+
+        color_grid += ["FFFFFF",] * (grid_len - len(color_grid))
+
         if len(self._grid_size) == 1:
-            color_grid = ["FFFFFF" if i >= len(color_grid) else Color.fmt_hec(color_grid[i]) for i in range(self._grid_size[0])]
-            name_grid = ["RR-{}".format(i + 1) if i >= len(name_grid) else str(name_grid[i]) for i in range(self._grid_size[0])]
+            name_grid += ["RR-{}".format(i + 1) for i in range(len(name_grid), grid_len)]
 
         else:
-            color_grid = [["FFFFFF" if i * self._grid_size[1] + j >= len(color_grid) else Color.fmt_hec(color_grid[i * self._grid_size[1] + j]) for j in range(self._grid_size[1])] for i in range(self._grid_size[0])]
-            name_grid = [["RR-{}-{}".format(i + 1, j + 1) if i * self._grid_size[1] + j >= len(name_grid) else str(name_grid[i * self._grid_size[1] + j]) for j in range(self._grid_size[1])] for i in range(self._grid_size[0])]
+            name_grid += ["RR-{}-{}".format(i // self._grid_size[1] + 1, i % self._grid_size[1] + 1) for i in range(len(name_grid), grid_len)]
 
-        self._color_grid = np.array(color_grid, dtype=str).reshape(grid_size)
-        self._name_grid = np.array(name_grid, dtype=str).reshape(grid_size)
+        self._color_grid = np.array(color_grid, dtype=str).reshape(self._grid_size)
+        self._name_grid = np.array(name_grid, dtype=str).reshape(self._grid_size)
 
     # ---------- ---------- ---------- Inner Funcs ---------- ---------- ---------- #
 
@@ -173,6 +180,10 @@ class Grid(object):
     def values(self):
         return self._color_grid.reshape(-1).tolist(), self._name_grid.reshape(-1).tolist()
 
+    @property
+    def rgb(self):
+        return Color.hec2rgb_array(self._color_grid)
+
     @property
     def grid(self):
         return Grid(*self.h_line.values, self.size)
@@ -573,6 +573,41 @@ class Rickrack(object):
 
             client.close()
 
+    def find_nearest_color_sets(self, colors, k=1, method="cie76"):
+        """
+        Find k color sets in Rickrack depot nearest to a color set.
+
+        Args:
+            colors (tuple or list): five colors in Color type, in the sequence of color set list.
+            k (int): number of nearest color sets.
+            method (str): delta e method, "cie76" or "ciede2000".
+
+        Returns:
+            indexes of color sets in depot, from near to far.
+        """
+
+        if self.is_connected:
+            assert len(colors) == 5 and all(isinstance(color, Color) for color in colors), "colors aren't five colors in Color type: {}".format(colors)
+
+            client = socket.socket()
+            client.settimeout(self._timeout)
+            client.connect((self._host, self._port))
+
+            info = "near{}; {}; {}".format(int(k), " ".join([color.hec for color in colors]), method)
+            client.sendall(info.encode("utf-8"))
+
+            head = client.recv(10)
+            head = head.decode("utf-8")
+
+            doc = client.recv(int(head)) if int(head) else b""
+            doc = doc.decode("utf-8")
+
+            client.close()
+
+            return [int(i) for i in doc.split()]
+
+        return []
+
     def import_color_set(self, dps_file):
         """
         Import a dps color file into Rickrack.
@@ -14,29 +14,57 @@ Copyright (c) 2019-2021 by Eigenmiao. All Rights Reserved.
 """
 
 import os
+import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor, CancelledError, wait
 from PIL import Image, ImageFilter
 from PyQt5.QtCore import QThread, pyqtSignal
 from PyQt5.QtGui import QImage
 from ricore.color import Color, CTP
-from ricore.image_act import extract_image
+from ricore.image_act import extract_image_candidates, get_content_hash, get_color_hist, get_color_index, get_rgb_edge, get_hsv_edge, get_ext_data, get_enhance_lut
+from ricore.cache import ChannelCache, MemoCache
 
 
 class Image3C(QThread):
     ps_proceses = pyqtSignal(int)
     ps_describe = pyqtSignal(int)
     ps_finished = pyqtSignal(int)
+    ps_precomputed = pyqtSignal(int)
     ps_enhanced = pyqtSignal(int)
     ps_extracts = pyqtSignal(list)
 
-    def __init__(self, temp_dir, debug_tools):
+    def __init__(self, temp_dir, debug_tools, cache_size=512, cache_spill=True, tile_size=0, tile_memmap=False, workers=0, precompute=False):
         """
         Init image3c with default temp dir.
+
+        Args:
+            temp_dir (QTemporaryDir): temp dir for loaded images and spilled channels.
+            debug_tools (tuple): (d_error, d_info, d_action).
+            cache_size (int): memory budget of channel cache in MB.
+            cache_spill (bool): spill channels evicted from memory into temp dir.
+            tile_size (int or float): memory budget of working data in MB for processing image in row bands. 0 for processing the whole image at once.
+            tile_memmap (bool): store results of row bands in memory-mapped files in temp dir.
+            workers (int): number of threads for processing row bands. 0 for number of cpu cores.
+            precompute (bool): precompute other categories in background after each job.
         """
 
         super().__init__()
         self._d_error, self._d_info, self._d_action = debug_tools
         self._temp_dir = temp_dir
+        self._cache_spill = cache_spill
+        self._cache = ChannelCache(cache_size * 1048576)
+        self._tile_size = tile_size
+        self._tile_memmap = tile_memmap
+        self._tile_paths = []
+        self._workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self._pool = None
+        self._precompute = precompute
+        self._cancel = threading.Event()
+        self._jobs = []
+        self._jobs_cond = threading.Condition()
+        self._job_kind = None
+        self._running = False
+        self._ready = set()
         self.img_data = None
         self.display = None
         self.rgb_data = None
@@ -44,18 +72,76 @@ class Image3C(QThread):
         self.run_args = None
         self.run_category = None
         self.ori_display_data = None
-        self.res_display_data = None
+        self._res_display_data = None
+        self._res_version = 0
         self.rev_display_data = None
-        self._rgb_ext_data = None
-        self._hsv_ext_data = None
+        self._display_version = 0
+        self._display_hist = None
+        self._display_hist_version = -1
+        self._display_index = None
+        self._display_index_version = -1
+        self._display_hash = None
+        self._display_hash_version = -1
+        self._extract_memo = MemoCache(32)
+        self._display_buffers = []
+        self._ori_hsv_data = None
+        self._ori_hsv_version = -1
         self._rgb_vtl_data = None
         self._rgb_hrz_data = None
         self._hsv_vtl_data = None
         self._hsv_hrz_data = None
 
+    @property
+    def res_display_data(self):
+        return self._res_display_data
+
+    @res_display_data.setter
+    def res_display_data(self, data):
+        # display buffers are reused, so every commit gets a new version instead of comparing arrays.
+        self._res_display_data = data
+        self._res_version += 1
+
     def run(self):
         """
-        Start running in thread.
+        Start running in thread. Run queued jobs until the queue is empty, then precompute if required.
+        """
+
+        precompute = self._precompute
+
+        while True:
+            with self._jobs_cond:
+                self._cancel.clear()
+
+                if self._jobs:
+                    kind, self.run_category, self.run_args = self._jobs.pop(0)
+
+                elif precompute and isinstance(self.rgb_data, np.ndarray):
+                    kind = "precompute"
+
+                else:
+                    self._job_kind = None
+                    self._running = False
+                    self._jobs_cond.notify_all()
+                    return
+
+                self._job_kind = kind
+                self._jobs_cond.notify_all()
+
+            try:
+                if kind == "precompute":
+                    precompute = False
+                    self.run_precompute()
+
+                else:
+                    precompute = self._precompute
+                    self.run_job()
+
+            except CancelledError:
+                pass
+
+    def run_job(self):
+        """
+        Run job of run_category with run_args.
         """
 
         self._d_action(500)
@@ -70,27 +156,275 @@ class Image3C(QThread):
             func = getattr(self, "run_{}".format(self.run_category))
             func((0, 100), self.run_args)
 
-    def run_rgb_extend(self):
+    def get_job_kind(self, category, args):
+        """
+        Get job kind of category and whether the job supersedes pending jobs of the same kind (latest wins).
+        Enhance, inverse and cover jobs with reserve are applied on previous result, so they never supersede.
+
+        Args:
+            category (int or str): run category, e.g. 3, "init", "enhance_rgb" or "extract".
+            args (tuple or None): run args.
+
+        Returns:
+            (job kind in "open", "category", "enhance" and "extract", supersede).
+        """
+
+        if isinstance(category, int):
+            return "category", True
+
+        elif category == "init":
+            return "open", True
+
+        elif category == "extract":
+            return "extract", True
+
+        elif category[:7] == "enhance":
+            return "enhance", not args[3]
+
+        else:
+            return "enhance", not args[1]
+
+    def submit(self, category, args=None):
+        """
+        Queue a job. A superseding job replaces pending jobs of the same kind and cancels the running job of the same kind at its next checkpoint.
+        Opening image replaces and cancels all jobs. Speculative precompute is always cancelled by a new job.
+        A superseding job same as the last pending or running one is ignored.
+
+        Args:
+            category (int or str): run category, e.g. 3, "init", "enhance_rgb" or "extract".
+            args (tuple or None): run args.
+        """
+
+        kind, supersede = self.get_job_kind(category, args)
+
+        with self._jobs_cond:
+            if supersede:
+                last_jobs = [job for job in self._jobs if job[0] == kind]
+
+                if last_jobs and last_jobs[-1] == (kind, category, args):
+                    return
+
+                if not last_jobs and self._job_kind == kind and (self.run_category, self.run_args) == (category, args) and not self._cancel.is_set():
+                    return
+
+                self._jobs = [job for job in self._jobs if job[0] != kind and kind != "open"]
+
+                if self._job_kind == kind or (kind == "open" and self._job_kind):
+                    self._cancel.set()
+
+            if self._job_kind == "precompute":
+                self._cancel.set()
+
+            self._jobs.append((kind, category, args))
+            start = not self._running
+            self._running = True
+
+        if start:
+            self.wait()
+            self.start()
+
+    def cancel_jobs(self, kinds=None):
         """
-        Extend rgb data into extended rgb data for Sobel edge detection.
+        Drop pending jobs of kinds, cancel the running job of kinds and wait until it stops.
+
+        Args:
+            kinds (tuple or None): job kinds (see get_job_kind) or None for all jobs and precompute.
         """
 
-        if not isinstance(self._rgb_ext_data, np.ndarray):
-            self._rgb_ext_data = np.insert(self.rgb_data, 0, self.rgb_data[1, :], axis=0)
-            self._rgb_ext_data = np.insert(self._rgb_ext_data, self._rgb_ext_data.shape[0], self._rgb_ext_data[self._rgb_ext_data.shape[0] - 2, :], axis=0)
-            self._rgb_ext_data = np.insert(self._rgb_ext_data, 0, self._rgb_ext_data[:, 1], axis=1)
-            self._rgb_ext_data = np.insert(self._rgb_ext_data, self._rgb_ext_data.shape[1], self._rgb_ext_data[:, self._rgb_ext_data.shape[1] - 2], axis=1)
+        with self._jobs_cond:
+            self._jobs = [job for job in self._jobs if kinds is not None and job[0] not in kinds]
 
-    def run_hsv_extend(self):
+            while self._job_kind and (kinds is None or self._job_kind in kinds):
+                self._cancel.set()
+                self._jobs_cond.wait()
+
+    def is_busy(self):
         """
-        Extend rgb data into extended rgb data for Sobel edge detection.
+        Check if an interactive job (not precompute) is running or pending.
+
+        Returns:
+            bool.
         """
 
-        if not isinstance(self._hsv_ext_data, np.ndarray):
-            self._hsv_ext_data = np.insert(self.hsv_data, 0, self.hsv_data[1, :], axis=0)
-            self._hsv_ext_data = np.insert(self._hsv_ext_data, self._hsv_ext_data.shape[0], self._hsv_ext_data[self._hsv_ext_data.shape[0] - 2, :], axis=0)
-            self._hsv_ext_data = np.insert(self._hsv_ext_data, 0, self._hsv_ext_data[:, 1], axis=1)
-            self._hsv_ext_data = np.insert(self._hsv_ext_data, self._hsv_ext_data.shape[1], self._hsv_ext_data[:, self._hsv_ext_data.shape[1] - 2], axis=1)
+        with self._jobs_cond:
+            return bool(self._jobs) or self._job_kind not in (None, "precompute")
+
+    def run_precompute(self):
+        """
+        Speculatively precompute categories not computed yet, lowest cost first (4, 1, 2, 3, 5, 6 and 7).
+        Stop if the category would not fit into the channel cache budget, which counts cached channels, hsv data and live edge arrays
+        (edge arrays are also cached, so they are counted conservatively). Cancelled by any new job and resumed after it.
+        """
+
+        for category in (4, 1, 2, 3, 5, 6, 7):
+            if category in self._ready:
+                continue
+
+            # category 4 keeps float32 hsv data (12 bytes per pixel), others keep a uint8 rgb array same as rgb data.
+            ctp_bytes = self.rgb_data.nbytes * 4 if category == 4 else self.rgb_data.nbytes
+            live_data = (self.hsv_data, self._rgb_vtl_data, self._rgb_hrz_data, self._hsv_vtl_data, self._hsv_hrz_data)
+            used_bytes = self._cache.nbytes + sum(data.nbytes for data in live_data if isinstance(data, np.ndarray))
+
+            if used_bytes + ctp_bytes > self._cache.max_bytes:
+                break
+
+            self.check_cancel()
+            self._d_info(502, category)
+            getattr(self, "run_{}".format(category))((0, 100))
+
+    def check_cancel(self):
+        """
+        Cancellation checkpoint of long stages.
+        """
+
+        if self._cancel.is_set():
+            raise CancelledError()
+
+    def get_bands(self, shape, px_bytes):
+        """
+        Split rows of image into bands by memory budget of working data and number of workers.
+        Bands processed concurrently share the memory budget, and each band has at least 65536 pixels if image is not tiled.
+
+        Args:
+            shape (tuple): image shape.
+            px_bytes (int): working bytes per pixel of the stage.
+
+        Returns:
+            list of (start row, end row).
+        """
+
+        step = max(-(-shape[0] // self._workers), -(-65536 // shape[1]))
+
+        if self._tile_size > 0:
+            step = min(step, max(1, int(self._tile_size * 1048576 / self._workers / (shape[1] * px_bytes))))
+
+        return [(i, min(i + step, shape[0])) for i in range(0, shape[0], step)]
+
+    def map_bands(self, func, bands):
+        """
+        Run func on bands in thread pool and wait for all bands finished.
+
+        Args:
+            func (function): func(start, end).
+            bands (list): list of (start row, end row).
+        """
+
+        if self._workers == 1 or len(bands) == 1:
+            for start, end in bands:
+                self.check_cancel()
+                func(start, end)
+
+            return
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._workers)
+
+        def run_band(start, end):
+            self.check_cancel()
+            func(start, end)
+
+        jobs = [self._pool.submit(run_band, start, end) for start, end in bands]
+
+        try:
+            for job in jobs:
+                job.result()
+
+        except BaseException:
+            # bands not started are dropped and running bands are awaited, so that no band writes into buffers of the next job.
+            for job in jobs:
+                job.cancel()
+
+            wait(jobs)
+            raise
+
+    def run_stages(self, stages, process_scope):
+        """
+        Run stages (e.g. run_1 and run_2) concurrently with the same process scope.
+
+        Args:
+            stages (list): list of stage functions.
+            process_scope (tuple or list): in format (start point, total length), e.g. (0, 100).
+        """
+
+        if self._workers == 1 or len(stages) < 2:
+            for stage in stages:
+                stage(process_scope)
+
+            return
+
+        with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+            for job in [executor.submit(stage, process_scope) for stage in stages]:
+                job.result()
+
+    def alloc_data(self, shape, dtype):
+        """
+        Allocate result data for row bands, memory-mapped in temp dir if required.
+
+        Args:
+            shape (tuple): image shape.
+            dtype (type): data type.
+
+        Returns:
+            empty array or memmap.
+        """
+
+        if self._tile_memmap and self._tile_size > 0 and os.path.isdir(self._temp_dir.path()):
+            tile_path = os.sep.join((self._temp_dir.path(), "tile_{}.dat".format(len(self._tile_paths))))
+
+            while os.path.isfile(tile_path):
+                tile_path = tile_path[:-4] + "_.dat"
+
+            self._tile_paths.append(tile_path)
+
+            return np.memmap(tile_path, dtype=dtype, mode="w+", shape=shape)
+
+        else:
+            return np.empty(shape, dtype=dtype)
+
+    def remove_tile_data(self):
+        """
+        Remove memory-mapped files of previous image.
+        """
+
+        tile_paths = []
+
+        for tile_path in self._tile_paths:
+            try:
+                os.remove(tile_path)
+
+            except Exception:
+                tile_paths.append(tile_path)
+
+        self._tile_paths = tile_paths
+
+    def run_bands(self, func, shape, dtype, px_bytes):
+        """
+        Run func on row bands and collect results. The whole result of func is returned directly if image is not split.
+
+        Args:
+            func (function): func(start, end) returns result rows start ~ end.
+            shape (tuple): result shape.
+            dtype (type): result data type.
+            px_bytes (int): working bytes per pixel of func.
+
+        Returns:
+            result array.
+        """
+
+        bands = self.get_bands(shape, px_bytes)
+
+        if len(bands) == 1:
+            self.check_cancel()
+            return func(0, shape[0])
+
+        results = self.alloc_data(shape, dtype)
+
+        def run_band(start, end):
+            results[start: end] = func(start, end)
+
+        self.map_bands(run_band, bands)
+
+        return results
 
     def run_init(self, process_scope, script=""):
         """
@@ -135,7 +469,17 @@ class Image3C(QThread):
                 self.img_data = self.img_data.resize((int(self.img_data.size[0] * ratio), int(self.img_data.size[1] * ratio)), Image.ANTIALIAS)
 
         self.ps_proceses.emit(int(process_scope[0] + process_scope[1] * 0.60))
-        self.rgb_data = np.array(self.img_data.convert("RGB"), dtype=np.uint8)
+        self._cache.clear()
+        self._cache.spill_dir = self._temp_dir.path() if self._cache_spill else None
+        self.remove_tile_data()
+        self._ready = set()
+        self._rgb_vtl_data = None
+        self._rgb_hrz_data = None
+        self._hsv_vtl_data = None
+        self._hsv_hrz_data = None
+        self.img_data.load()
+        wid, hig = self.img_data.size
+        self.rgb_data = self.run_bands(lambda start, end: np.array((self.img_data if end - start == hig else self.img_data.crop((0, start, wid, end))).convert("RGB"), dtype=np.uint8), (hig, wid, 3), np.uint8, 8)
         self.ps_proceses.emit(int(process_scope[0] + process_scope[1] * 0.80))
         self.save_rgb_full_data(self.rgb_data, 0)
         self.ps_describe.emit(0)
@@ -158,7 +502,7 @@ class Image3C(QThread):
 
         self.ps_describe.emit(2)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1] * 0.60))
-        self.save_rgb_chnl_data(self.rgb_data, 0)
+        self.save_chnl_data(0)
         self.ps_describe.emit(0)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1]))
 
@@ -179,10 +523,10 @@ class Image3C(QThread):
 
         self.ps_describe.emit(3)
         self.ps_proceses.emit(int(pro_scope[0]))
-        self.hsv_data = Color.rgb2hsv_array(self.rgb_data)
+        self.hsv_data = self.run_bands(lambda start, end: Color.rgb2hsv_array(self.rgb_data[start: end]), self.rgb_data.shape, np.float32, 64)
         self.ps_describe.emit(4)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1] * 0.60))
-        self.save_hsv_chnl_data(self.hsv_data, 4)
+        self.save_chnl_data(4)
         self.ps_describe.emit(0)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1]))
 
@@ -201,22 +545,14 @@ class Image3C(QThread):
         else:
             pro_scope = tuple(process_scope)
 
-        self.run_rgb_extend()
         self.ps_describe.emit(5)
         self.ps_proceses.emit(int(pro_scope[0]))
-        self._rgb_vtl_data = np.zeros((self.rgb_data.shape[0], self.rgb_data.shape[1], 3), dtype=np.uint8)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1] * 0.40))
-
-        for i in range(self.rgb_data.shape[0]):
-            for j in range(self.rgb_data.shape[1]):
-                rgb_result = self._rgb_ext_data[i:i + 3, j:j + 3, :] * [[[-1, -1, -1], [0, 0, 0], [1, 1, 1]], [[-2, -2, -2], [0, 0, 0], [2, 2, 2]], [[-1, -1, -1], [0, 0, 0], [1, 1, 1]]]
-                rgb_result = rgb_result.sum(axis=(0, 1)) / 4
-                self._rgb_vtl_data[i][j] = np.abs(rgb_result).astype(np.uint8)
-
+        self._rgb_vtl_data = self.run_bands(lambda start, end: get_rgb_edge(get_ext_data(self.rgb_data, start, end), vertical=True), self.rgb_data.shape, np.uint8, 32)
         self.ps_describe.emit(6)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1] * 0.80))
         self.save_rgb_full_data(self._rgb_vtl_data, 1)
-        self.save_rgb_chnl_data(self._rgb_vtl_data, 1)
+        self.save_chnl_data(1)
         self.ps_describe.emit(0)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1]))
 
@@ -235,22 +571,14 @@ class Image3C(QThread):
         else:
             pro_scope = tuple(process_scope)
 
-        self.run_rgb_extend()
         self.ps_describe.emit(7)
         self.ps_proceses.emit(int(pro_scope[0]))
-        self._rgb_hrz_data = np.zeros((self.rgb_data.shape[0], self.rgb_data.shape[1], 3), dtype=np.uint8)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1] * 0.40))
-
-        for i in range(self.rgb_data.shape[0]):
-            for j in range(self.rgb_data.shape[1]):
-                rgb_result = self._rgb_ext_data[i:i + 3, j:j + 3, :] * [[[-1, -1, -1], [-2, -2, -2], [-1, -1, -1]], [[0, 0, 0], [0, 0, 0], [0, 0, 0]], [[1, 1, 1], [2, 2, 2], [1, 1, 1]]]
-                rgb_result = rgb_result.sum(axis=(0, 1)) / 4
-                self._rgb_hrz_data[i][j] = np.abs(rgb_result).astype(np.uint8)
-
+        self._rgb_hrz_data = self.run_bands(lambda start, end: get_rgb_edge(get_ext_data(self.rgb_data, start, end), vertical=False), self.rgb_data.shape, np.uint8, 32)
         self.ps_describe.emit(8)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1] * 0.80))
         self.save_rgb_full_data(self._rgb_hrz_data, 2)
-        self.save_rgb_chnl_data(self._rgb_hrz_data, 2)
+        self.save_chnl_data(2)
         self.ps_describe.emit(0)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1]))
 
@@ -262,30 +590,34 @@ class Image3C(QThread):
             process_scope (tuple or list): in format (start point, total length), e.g. (0, 100).
         """
 
-        if not isinstance(self._rgb_vtl_data, np.ndarray):
-            self.run_1((process_scope[0], process_scope[1] * 0.60))
-            pro_scope = (process_scope[0] + process_scope[1] * 0.60, process_scope[1] * 0.40)
+        stages = []
 
-        else:
-            pro_scope = tuple(process_scope)
+        if not isinstance(self._rgb_vtl_data, np.ndarray):
+            stages.append(self.run_1)
 
         if not isinstance(self._rgb_hrz_data, np.ndarray):
-            self.run_2((pro_scope[0], pro_scope[1] * 0.50))
-            pro_scope = (pro_scope[0] + pro_scope[1] * 0.50, pro_scope[1] * 0.50)
+            stages.append(self.run_2)
+
+        if stages and not isinstance(self.rgb_data, np.ndarray):
+            self.run_0((process_scope[0], process_scope[1] * 0.20))
+            pro_scope = (process_scope[0] + process_scope[1] * 0.20, process_scope[1] * 0.80)
 
         else:
-            pro_scope = tuple(pro_scope)
+            pro_scope = tuple(process_scope)
+
+        if stages:
+            self.run_stages(stages, (pro_scope[0], pro_scope[1] * 0.60))
+            pro_scope = (pro_scope[0] + pro_scope[1] * 0.60, pro_scope[1] * 0.40)
 
         self.ps_describe.emit(9)
         self.ps_proceses.emit(int(pro_scope[0]))
-        fnl_results = (np.sqrt(self._rgb_vtl_data.astype(np.uint32) ** 2 + self._rgb_hrz_data.astype(np.uint32) ** 2) / np.sqrt(2)).astype(np.uint8)
+        fnl_results = self.run_bands(lambda start, end: (np.sqrt(self._rgb_vtl_data[start: end].astype(np.uint32) ** 2 + self._rgb_hrz_data[start: end].astype(np.uint32) ** 2) / np.sqrt(2)).astype(np.uint8), self._rgb_vtl_data.shape, np.uint8, 48)
         self.ps_describe.emit(10)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1] * 0.80))
         self.save_rgb_full_data(fnl_results, 3)
-        self.save_rgb_chnl_data(fnl_results, 3)
+        self.save_chnl_data(3)
         self.ps_describe.emit(0)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1]))
-        self._rgb_ext_data = None
         self._rgb_vtl_data = None
         self._rgb_hrz_data = None
 
@@ -304,29 +636,14 @@ class Image3C(QThread):
         else:
             pro_scope = tuple(process_scope)
 
-        self.run_hsv_extend()
         self.ps_describe.emit(11)
         self.ps_proceses.emit(int(pro_scope[0]))
-        self._hsv_vtl_data = np.zeros((self.hsv_data.shape[0], self.hsv_data.shape[1], 3), dtype=np.uint8)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1] * 0.40))
-
-        for i in range(self.hsv_data.shape[0]):
-            for j in range(self.hsv_data.shape[1]):
-                h_result_0 = abs(self._hsv_ext_data[i + 0][j + 2][0] - self._hsv_ext_data[i + 0][j][0])
-                h_result_1 = abs(self._hsv_ext_data[i + 1][j + 2][0] - self._hsv_ext_data[i + 1][j][0])
-                h_result_2 = abs(self._hsv_ext_data[i + 2][j + 2][0] - self._hsv_ext_data[i + 2][j][0])
-                h_result_0 = 360.0 - h_result_0 if h_result_0 > 180.0 else h_result_0
-                h_result_1 = 360.0 - h_result_1 if h_result_1 > 180.0 else h_result_1
-                h_result_2 = 360.0 - h_result_2 if h_result_2 > 180.0 else h_result_2
-                h_result = h_result_0 + h_result_1 * 2 + h_result_2
-                sv_result = self._hsv_ext_data[i:i + 3, j:j + 3, 1:3] * [[[-1, -1], [0, 0], [1, 1]], [[-2, -2], [0, 0], [2, 2]], [[-1, -1], [0, 0], [1, 1]]]
-                sv_result = sv_result.sum(axis=(0, 1)).astype(np.float32)
-                self._hsv_vtl_data[i][j] = np.array((h_result * 0.3542, abs(sv_result[0]) * 63.75, abs(sv_result[1]) * 63.75), dtype=np.uint8)
-
+        self._hsv_vtl_data = self.run_bands(lambda start, end: get_hsv_edge(get_ext_data(self.hsv_data, start, end), vertical=True), self.hsv_data.shape, np.uint8, 160)
         self.ps_describe.emit(12)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1] * 0.80))
         self.save_rgb_full_data(self._hsv_vtl_data, 5)
-        self.save_rgb_chnl_data(self._hsv_vtl_data, 5)
+        self.save_chnl_data(5)
         self.ps_describe.emit(0)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1]))
 
@@ -345,29 +662,14 @@ class Image3C(QThread):
         else:
             pro_scope = tuple(process_scope)
 
-        self.run_hsv_extend()
         self.ps_describe.emit(13)
         self.ps_proceses.emit(int(pro_scope[0]))
-        self._hsv_hrz_data = np.zeros((self.hsv_data.shape[0], self.hsv_data.shape[1], 3), dtype=np.uint8)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1] * 0.40))
-
-        for i in range(self.hsv_data.shape[0]):
-            for j in range(self.hsv_data.shape[1]):
-                h_result_0 = abs(self._hsv_ext_data[i + 2][j + 0][0] - self._hsv_ext_data[i][j + 0][0])
-                h_result_1 = abs(self._hsv_ext_data[i + 2][j + 1][0] - self._hsv_ext_data[i][j + 1][0])
-                h_result_2 = abs(self._hsv_ext_data[i + 2][j + 2][0] - self._hsv_ext_data[i][j + 2][0])
-                h_result_0 = 360.0 - h_result_0 if h_result_0 > 180.0 else h_result_0
-                h_result_1 = 360.0 - h_result_1 if h_result_1 > 180.0 else h_result_1
-                h_result_2 = 360.0 - h_result_2 if h_result_2 > 180.0 else h_result_2
-                h_result = h_result_0 + h_result_1 * 2 + h_result_2
-                sv_result = self._hsv_ext_data[i:i + 3, j:j + 3, 1:3] * [[[-1, -1], [-2, -2], [-1, -1]], [[0, 0], [0, 0], [0, 0]], [[1, 1], [2, 2], [1, 1]]]
-                sv_result = sv_result.sum(axis=(0, 1)).astype(np.float32)
-                self._hsv_hrz_data[i][j] = np.array((h_result * 0.3542, abs(sv_result[0]) * 63.75, abs(sv_result[1]) * 63.75), dtype=np.uint8)
-
+        self._hsv_hrz_data = self.run_bands(lambda start, end: get_hsv_edge(get_ext_data(self.hsv_data, start, end), vertical=False), self.hsv_data.shape, np.uint8, 160)
         self.ps_describe.emit(14)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1] * 0.80))
         self.save_rgb_full_data(self._hsv_hrz_data, 6)
-        self.save_rgb_chnl_data(self._hsv_hrz_data, 6)
+        self.save_chnl_data(6)
         self.ps_describe.emit(0)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1]))
 
@@ -379,30 +681,34 @@ class Image3C(QThread):
             process_scope (tuple or list): in format (start point, total length), e.g. (0, 100).
         """
 
-        if not isinstance(self._hsv_vtl_data, np.ndarray):
-            self.run_5((process_scope[0], process_scope[1] * 0.60))
-            pro_scope = (process_scope[0] + process_scope[1] * 0.60, process_scope[1] * 0.40)
+        stages = []
 
-        else:
-            pro_scope = tuple(process_scope)
+        if not isinstance(self._hsv_vtl_data, np.ndarray):
+            stages.append(self.run_5)
 
         if not isinstance(self._hsv_hrz_data, np.ndarray):
-            self.run_6((pro_scope[0], pro_scope[1] * 0.50))
-            pro_scope = (pro_scope[0] + pro_scope[1] * 0.50, pro_scope[1] * 0.50)
+            stages.append(self.run_6)
+
+        if stages and not isinstance(self.hsv_data, np.ndarray):
+            self.run_4((process_scope[0], process_scope[1] * 0.20))
+            pro_scope = (process_scope[0] + process_scope[1] * 0.20, process_scope[1] * 0.80)
 
         else:
-            pro_scope = tuple(pro_scope)
+            pro_scope = tuple(process_scope)
+
+        if stages:
+            self.run_stages(stages, (pro_scope[0], pro_scope[1] * 0.60))
+            pro_scope = (pro_scope[0] + pro_scope[1] * 0.60, pro_scope[1] * 0.40)
 
         self.ps_describe.emit(15)
         self.ps_proceses.emit(int(pro_scope[0]))
-        fnl_results = (np.sqrt(self._hsv_vtl_data.astype(np.uint32) ** 2 + self._hsv_hrz_data.astype(np.uint32) ** 2) / np.sqrt(2)).astype(np.uint8)
+        fnl_results = self.run_bands(lambda start, end: (np.sqrt(self._hsv_vtl_data[start: end].astype(np.uint32) ** 2 + self._hsv_hrz_data[start: end].astype(np.uint32) ** 2) / np.sqrt(2)).astype(np.uint8), self._hsv_vtl_data.shape, np.uint8, 48)
         self.ps_describe.emit(16)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1] * 0.80))
         self.save_rgb_full_data(fnl_results, 7)
-        self.save_rgb_chnl_data(fnl_results, 7)
+        self.save_chnl_data(7)
         self.ps_describe.emit(0)
         self.ps_proceses.emit(int(pro_scope[0] + pro_scope[1]))
-        self._hsv_ext_data = None
         self._hsv_vtl_data = None
         self._hsv_hrz_data = None
 
@@ -436,130 +742,307 @@ class Image3C(QThread):
 
     def save_rgb_full_data(self, rgb_data, prefix):
         """
-        Save rgb full channel image (0_0.png for category 0 and 4 and channel 0).
+        Save rgb full channel image into channel cache ((0, 0) for category 0 and 4 and channel 0).
 
         Args:
             rgb_data (3D array): rgb image array.
-            prefix (int): graph category as image name prefix.
+            prefix (int): graph category as cache key prefix.
         """
 
-        rgb = QImage(rgb_data, rgb_data.shape[1], rgb_data.shape[0], rgb_data.shape[1] * 3, QImage.Format_RGB888)
-        rgb.save(self._temp_dir.path() + os.sep + "{}_0.png".format(prefix))
+        self._cache.put((prefix, 0), rgb_data)
+        self._ready.add(prefix)
 
         if prefix == 0:
-            self.ps_finished.emit(0)
-            self.ps_finished.emit(40)
+            self.emit_finished(0)
+            self.emit_finished(40)
 
         else:
-            self.ps_finished.emit(prefix * 10)
+            self.emit_finished(prefix * 10)
+
+    def save_chnl_data(self, prefix):
+        """
+        Mark separate channel images (r, g, b, not r, not g and not b for rgb categories, h, s, v, not h, not s and not v for hsv category) as ready.
+        These channel images are rendered on demand by load_image.
+
+        Args:
+            prefix (int): graph category as cache key prefix.
+        """
+
+        self._ready.add(prefix)
+
+        for channel in range(1, 7):
+            self.emit_finished(prefix * 10 + channel)
 
-    def save_rgb_chnl_data(self, rgb_data, prefix):
+    def emit_finished(self, idx):
         """
-        Save r, g, b, not r, not g and not b channel images separately.
+        Emit finished category image. Results of speculative precompute are emitted by ps_precomputed, so they never reset user interaction.
+
+        Args:
+            idx (int): category image index (category * 10 + channel).
+        """
+
+        if self._job_kind == "precompute":
+            self.ps_precomputed.emit(idx)
+
+        else:
+            self.ps_finished.emit(idx)
+
+    def render_rgb_chnl(self, rgb_data, channel):
+        """
+        Render r, g, b, not r, not g or not b channel image.
 
         Args:
             rgb_data (3D array): rgb image array.
-            prefix (int): graph category as image name prefix.
-        """
-
-        z_chl = np.zeros((rgb_data.shape[0], rgb_data.shape[1]), dtype=np.uint8)
-        r_chl = np.stack((rgb_data[:, :, 0], z_chl, z_chl), axis=2)
-        r_chl = QImage(r_chl, r_chl.shape[1], r_chl.shape[0], r_chl.shape[1] * 3, QImage.Format_RGB888)
-        r_chl.save(self._temp_dir.path() + os.sep + "{}_1.png".format(prefix))
-        self.ps_finished.emit(prefix * 10 + 1)
-        g_chl = np.stack((z_chl, rgb_data[:, :, 1], z_chl), axis=2)
-        g_chl = QImage(g_chl, g_chl.shape[1], g_chl.shape[0], g_chl.shape[1] * 3, QImage.Format_RGB888)
-        g_chl.save(self._temp_dir.path() + os.sep + "{}_2.png".format(prefix))
-        self.ps_finished.emit(prefix * 10 + 2)
-        b_chl = np.stack((z_chl, z_chl, rgb_data[:, :, 1]), axis=2)
-        b_chl = QImage(b_chl, b_chl.shape[1], b_chl.shape[0], b_chl.shape[1] * 3, QImage.Format_RGB888)
-        b_chl.save(self._temp_dir.path() + os.sep + "{}_3.png".format(prefix))
-        self.ps_finished.emit(prefix * 10 + 3)
-        n_r_chl = np.stack((z_chl, rgb_data[:, :, 1], rgb_data[:, :, 2]), axis=2)
-        n_r_chl = QImage(n_r_chl, n_r_chl.shape[1], n_r_chl.shape[0], n_r_chl.shape[1] * 3, QImage.Format_RGB888)
-        n_r_chl.save(self._temp_dir.path() + os.sep + "{}_4.png".format(prefix))
-        self.ps_finished.emit(prefix * 10 + 4)
-        n_g_chl = np.stack((rgb_data[:, :, 0], z_chl, rgb_data[:, :, 2]), axis=2)
-        n_g_chl = QImage(n_g_chl, n_g_chl.shape[1], n_g_chl.shape[0], n_g_chl.shape[1] * 3, QImage.Format_RGB888)
-        n_g_chl.save(self._temp_dir.path() + os.sep + "{}_5.png".format(prefix))
-        self.ps_finished.emit(prefix * 10 + 5)
-        n_b_chl = np.stack((rgb_data[:, :, 0], rgb_data[:, :, 1], z_chl), axis=2)
-        n_b_chl = QImage(n_b_chl, n_b_chl.shape[1], n_b_chl.shape[0], n_b_chl.shape[1] * 3, QImage.Format_RGB888)
-        n_b_chl.save(self._temp_dir.path() + os.sep + "{}_6.png".format(prefix))
-        self.ps_finished.emit(prefix * 10 + 6)
-
-    def save_hsv_chnl_data(self, hsv_data, prefix):
-        """
-        Save h, s, v, not h, not s and not v channel images separately.
+            channel (int): graph channel index in 1 ~ 6.
+
+        Returns:
+            rgb image array of channel.
+        """
+
+        keep = (channel - 1,) if channel < 4 else tuple(i for i in range(3) if i != channel - 4)
+        chnl_data = np.zeros(rgb_data.shape, dtype=np.uint8)
+
+        for i in keep:
+            chnl_data[:, :, i] = rgb_data[:, :, i]
+
+        return chnl_data
+
+    def render_hsv_chnl(self, hsv_data, channel):
+        """
+        Render h, s, v, not h, not s or not v channel image. Dropped h is set to 0.0 and dropped s or v is set to 1.0.
 
         Args:
             hsv_data (3D array): hsv image array.
-            prefix (int): graph category as image name prefix.
-        """
-
-        ones = np.ones(hsv_data.shape[:2])
-        zeros = np.zeros(hsv_data.shape[:2])
-        h_chl = Color.hsv2rgb_array(np.stack((hsv_data[:, :, 0], ones, ones), axis=2))
-        h_chl = QImage(h_chl, h_chl.shape[1], h_chl.shape[0], h_chl.shape[1] * 3, QImage.Format_RGB888)
-        h_chl.save(self._temp_dir.path() + os.sep + "{}_1.png".format(prefix))
-        self.ps_finished.emit(prefix * 10 + 1)
-        s_chl = Color.hsv2rgb_array(np.stack((zeros, hsv_data[:, :, 1], ones), axis=2))
-        s_chl = QImage(s_chl, s_chl.shape[1], s_chl.shape[0], s_chl.shape[1] * 3, QImage.Format_RGB888)
-        s_chl.save(self._temp_dir.path() + os.sep + "{}_2.png".format(prefix))
-        self.ps_finished.emit(prefix * 10 + 2)
-        v_chl = Color.hsv2rgb_array(np.stack((zeros, ones, hsv_data[:, :, 2]), axis=2))
-        v_chl = QImage(v_chl, v_chl.shape[1], v_chl.shape[0], v_chl.shape[1] * 3, QImage.Format_RGB888)
-        v_chl.save(self._temp_dir.path() + os.sep + "{}_3.png".format(prefix))
-        self.ps_finished.emit(prefix * 10 + 3)
-        n_h_chl = Color.hsv2rgb_array(np.stack((zeros, hsv_data[:, :, 1], hsv_data[:, :, 2]), axis=2))
-        n_h_chl = QImage(n_h_chl, n_h_chl.shape[1], n_h_chl.shape[0], n_h_chl.shape[1] * 3, QImage.Format_RGB888)
-        n_h_chl.save(self._temp_dir.path() + os.sep + "{}_4.png".format(prefix))
-        self.ps_finished.emit(prefix * 10 + 4)
-        n_s_chl = Color.hsv2rgb_array(np.stack((hsv_data[:, :, 0], ones, hsv_data[:, :, 2]), axis=2))
-        n_s_chl = QImage(n_s_chl, n_s_chl.shape[1], n_s_chl.shape[0], n_s_chl.shape[1] * 3, QImage.Format_RGB888)
-        n_s_chl.save(self._temp_dir.path() + os.sep + "{}_5.png".format(prefix))
-        self.ps_finished.emit(prefix * 10 + 5)
-        n_v_chl = Color.hsv2rgb_array(np.stack((hsv_data[:, :, 0], hsv_data[:, :, 1], ones), axis=2))
-        n_v_chl = QImage(n_v_chl, n_v_chl.shape[1], n_v_chl.shape[0], n_v_chl.shape[1] * 3, QImage.Format_RGB888)
-        n_v_chl.save(self._temp_dir.path() + os.sep + "{}_6.png".format(prefix))
-        self.ps_finished.emit(prefix * 10 + 6)
+            channel (int): graph channel index in 1 ~ 6.
+
+        Returns:
+            rgb image array of channel.
+        """
+
+        keep = (channel - 1,) if channel < 4 else tuple(i for i in range(3) if i != channel - 4)
+        chnl_data = np.empty(hsv_data.shape, dtype=np.float64)
+
+        for i, fill in enumerate((0.0, 1.0, 1.0)):
+            chnl_data[:, :, i] = hsv_data[:, :, i] if i in keep else fill
+
+        return Color.hsv2rgb_array(chnl_data)
+
+    def render_chnl(self, category, channel):
+        """
+        Render channel image from full data of category and store it into channel cache.
+
+        Args:
+            category (int): graph category index.
+            channel (int): graph channel index in 1 ~ 6.
+
+        Returns:
+            rgb image array of channel or None if full data of category is not available.
+        """
+
+        if category == 4:
+            if not isinstance(self.hsv_data, np.ndarray):
+                return None
+
+            img_data = self.render_hsv_chnl(self.hsv_data, channel)
+
+        else:
+            rgb_data = self._cache.get((category, 0))
+
+            if rgb_data is None and category == 0:
+                rgb_data = self.rgb_data
+
+            if not isinstance(rgb_data, np.ndarray):
+                return None
+
+            img_data = self.render_rgb_chnl(rgb_data, channel)
+
+        self._cache.put((category, channel), img_data)
+
+        return img_data
 
     def load_image(self, category, channel):
         """
-        Load image with category and channel.
+        Load image with category and channel from channel cache. Channel image is rendered if not rendered yet.
 
         Args:
             category (int): graph category index.
             channel (int): graph channel index.
+
+        Returns:
+            bool. False if the channel is not (or no longer) in cache.
         """
 
         if category in (0, 4) and channel == 0:
-            img_path = os.sep.join((self._temp_dir.path(), "0_0.png"))
+            img_data = self._cache.get((0, 0))
+
+            if img_data is None:
+                img_data = self.rgb_data
 
         else:
-            img_path = os.sep.join((self._temp_dir.path(), "{}_{}.png".format(category, channel)))
+            img_data = self._cache.get((category, channel))
 
-        if os.path.isfile(img_path):
-            try:
-                img_data = Image.open(img_path).convert("RGB")
+            if img_data is None and channel > 0:
+                img_data = self.render_chnl(category, channel)
 
-            except Exception as err:
-                self._d_error(501, err)
-                img_data = None
+        self._display_version += 1
+        self._ori_hsv_data = None
 
-            if img_data:
-                self.ori_display_data = np.array(img_data, dtype=np.uint8)
-                self.display = QImage(self.ori_display_data, self.ori_display_data.shape[1], self.ori_display_data.shape[0], self.ori_display_data.shape[1] * 3, QImage.Format_RGB888)
-                self.res_display_data = self.ori_display_data
-                self.rev_display_data = None
+        if isinstance(img_data, np.ndarray):
+            self.ori_display_data = img_data
+            self.display = QImage(self.ori_display_data, self.ori_display_data.shape[1], self.ori_display_data.shape[0], self.ori_display_data.shape[1] * 3, QImage.Format_RGB888)
+            self.res_display_data = self.ori_display_data
+            self.rev_display_data = None
 
-            else:
-                self.display = None
-                self.res_display_data = None
-                self.rev_display_data = None
+            return True
 
         else:
             self.display = None
+            self.res_display_data = None
+            self.rev_display_data = None
+
+            return False
+
+    def get_display_buffer(self, shape, dtype):
+        """
+        Get a reusable buffer for display results. Buffers of current res and rev display data are never returned,
+        so that a cancelled job leaves the display untouched.
+
+        Args:
+            shape (tuple): buffer shape.
+            dtype (type): buffer data type.
+
+        Returns:
+            buffer array.
+        """
+
+        self._display_buffers = [x for x in self._display_buffers if x.shape == shape]
+
+        for buffer in self._display_buffers:
+            if buffer.dtype == dtype and buffer is not self.res_display_data and buffer is not self.rev_display_data:
+                return buffer
+
+        buffer = np.empty(shape, dtype=dtype)
+        self._display_buffers.append(buffer)
+
+        return buffer
+
+    def get_ori_hsv(self):
+        """
+        Get hsv data of ori display data. The result is cached until a new image is loaded into display.
+
+        Returns:
+            hsv array.
+        """
+
+        if self._ori_hsv_version != self._display_version or not isinstance(self._ori_hsv_data, np.ndarray):
+            ori_data = self.ori_display_data
+
+            if ori_data is self.rgb_data and isinstance(self.hsv_data, np.ndarray):
+                self._ori_hsv_data = self.hsv_data
+
+            else:
+                self._ori_hsv_data = self.run_bands(lambda start, end: Color.rgb2hsv_array(ori_data[start: end]), ori_data.shape, np.float32, 64)
+
+            self._ori_hsv_version = self._display_version
+
+        return self._ori_hsv_data
+
+    def get_display_hist(self):
+        """
+        Get color histogram of current res (or ori) display data. The result is cached until the display is modified.
+
+        Returns:
+            (rgb colors, pixel counts, flat pixel positions) of non-empty bins.
+        """
+
+        if self._display_hist_version != self._res_version or self._display_hist is None:
+            if isinstance(self.res_display_data, np.ndarray):
+                display_data = self.res_display_data
+
+            else:
+                display_data = self.ori_display_data
+
+            self._display_hist = get_color_hist(display_data)
+            self._display_hist_version = self._res_version
+
+        return self._display_hist
+
+    def get_display_index(self):
+        """
+        Get color index of current res (or ori) display data. The result is cached until the display is modified.
+
+        Returns:
+            sorted color index array.
+        """
+
+        if self._display_index_version != self._res_version or self._display_index is None:
+            if isinstance(self.res_display_data, np.ndarray):
+                display_data = self.res_display_data
+
+            else:
+                display_data = self.ori_display_data
+
+            self._display_index = get_color_index(display_data)
+            self._display_index_version = self._res_version
+
+        return self._display_index
+
+    def get_display_hash(self):
+        """
+        Get content hash of ori display data. The result is cached until a new image is loaded into display.
+
+        Returns:
+            hex digest string.
+        """
+
+        if self._display_hash_version != self._display_version or self._display_hash is None:
+            self._display_hash = get_content_hash(self.ori_display_data)
+            self._display_hash_version = self._display_version
+
+        return self._display_hash
+
+    def run_hsv_display(self, modify, res):
+        """
+        Modify hsv display band by band and commit results into display.
+
+        Args:
+            modify (function): modify(start, end, band_data) modifies hsv rows start ~ end in place.
+            res (bool): modify based on last result (reserve) or ori display data.
+        """
+
+        src_hsv, src_rgb = None, None
+
+        if res and isinstance(self.rev_display_data, np.ndarray):
+            src_hsv = self.rev_display_data
+
+        elif res and isinstance(self.res_display_data, np.ndarray) and self.res_display_data is not self.ori_display_data:
+            src_rgb = self.res_display_data
+
+        else:
+            src_hsv = self.get_ori_hsv()
+
+        shape = self.ori_display_data.shape
+        hsv_data = self.get_display_buffer(shape, np.float32)
+        rgb_data = self.get_display_buffer(shape, np.uint8)
+
+        def modify_band(start, end):
+            band_data = hsv_data[start: end]
+
+            if src_hsv is None:
+                Color.rgb2hsv_array(src_rgb[start: end], out=band_data)
+
+            else:
+                band_data[:] = src_hsv[start: end]
+
+            modify(start, end, band_data)
+            # overflowed s and v are cut off in reserved hsv data as well.
+            np.clip(band_data[:, :, 1:], 0.0, 1.0, out=band_data[:, :, 1:])
+            Color.hsv2rgb_array(band_data, out=rgb_data[start: end])
+
+        self.map_bands(modify_band, self.get_bands(shape, 64))
+        self.rev_display_data = hsv_data
+        self.res_display_data = rgb_data
+        self.display = QImage(rgb_data, rgb_data.shape[1], rgb_data.shape[0], rgb_data.shape[1] * 3, QImage.Format_RGB888)
 
     def run_enhance_rgb(self, process_scope, values):
         """
@@ -576,10 +1059,10 @@ class Image3C(QThread):
         reg, separ, fact, res, sigma, onedir, useryb = values
 
         if res and isinstance(self.res_display_data, np.ndarray):
-            display_data = self.res_display_data
+            src_data = self.res_display_data
 
         else:
-            display_data = np.array(self.ori_display_data, dtype=np.uint8)
+            src_data = self.ori_display_data
 
         if isinstance(separ, (int, float)):
             separ = [separ,] * len(reg)
@@ -597,36 +1080,18 @@ class Image3C(QThread):
         sigma = 0.0 if sigma < 0.0 else sigma
         sigma = 1.0 if sigma > 1.0 else sigma
 
-        for k, k_separ, k_fact in zip(reg, separ, fact):
-            if abs(k_fact) < 1E-3:
-                continue
-
-            data = np.array(display_data[:, :, k], dtype=np.float32)
-
-            if sigma == 0.0:
-                expd = np.zeros(data.shape)
-                expd[np.where((data < k_separ + 1) & (data > k_separ - 1))] = k_fact
-
-            elif sigma == 1.0:
-                expd = np.ones(data.shape) * k_fact
-
-            else:
-                expd = 0.001 * (10 ** (4.5 * sigma)) * -1
-                expd = np.exp(((data - k_separ) / 255.0) ** 2 / expd) * k_fact
+        lut = get_enhance_lut(reg, separ, fact, sigma, onedir)
 
-            if onedir:
-                data = data + expd * 255.0
+        def enhance_band(start, end):
+            band_data = np.empty((end - start,) + src_data.shape[1:], dtype=np.uint8)
 
-            else:
-                expd = np.abs(expd)
-                selection = np.where(data >= k_separ) if k_separ < 125 else np.where(data > k_separ)
-                data = data * (1.0 - expd)
-                data[selection] = data[selection] + expd[selection] * 255.0
+            for k in range(3):
+                band_data[:, :, k] = lut[k][src_data[start: end, :, k]]
 
-            data[np.where(data < 0)] = 0
-            data[np.where(data > 255)] = 255
-            display_data[:, :, k] = np.array(data, dtype=np.uint8)
+            return band_data
 
+        # enhance into a new array and commit it at the end, so that a cancelled job leaves the display untouched.
+        display_data = self.run_bands(enhance_band, src_data.shape, np.uint8, 6)
         self.res_display_data = display_data
         self.rev_display_data = None
         self.display = QImage(display_data, display_data.shape[1], display_data.shape[0], display_data.shape[1] * 3, QImage.Format_RGB888)
@@ -646,15 +1111,6 @@ class Image3C(QThread):
 
         reg, separ, fact, res, sigma, onedir, useryb = values
 
-        if res and isinstance(self.rev_display_data, np.ndarray):
-            display_data = self.rev_display_data
-
-        elif res and isinstance(self.res_display_data, np.ndarray):
-            display_data = Color.rgb2hsv_array(self.res_display_data)
-
-        else:
-            display_data = Color.rgb2hsv_array(self.ori_display_data)
-
         if isinstance(separ, (int, float)):
             separ = [separ,] * len(reg)
 
@@ -671,71 +1127,70 @@ class Image3C(QThread):
         sigma = 0.0 if sigma < 0.0 else sigma
         sigma = 1.0 if sigma > 1.0 else sigma
 
-        for k, k_separ, k_fact in zip(reg, separ, fact):
-            if abs(k_fact) < 1E-3:
-                continue
+        def enhance_band(start, end, band_data):
+            for k, k_separ, k_fact in zip(reg, separ, fact):
+                if abs(k_fact) < 1E-3:
+                    continue
 
-            data = np.array(display_data[:, :, k], dtype=np.float32)
+                data = np.array(band_data[:, :, k], dtype=np.float32)
 
-            if k == 0:
-                if useryb:
-                    data = Color.spc_rgb2ryb_h_array(data)
-                    k_separ = Color.spc_rgb2ryb_h(k_separ)
+                if k == 0:
+                    if useryb:
+                        data = Color.spc_rgb2ryb_h_array(data)
+                        k_separ = Color.spc_rgb2ryb_h(k_separ)
 
-                data = Color((k_separ, 1.0, 1.0), tp=CTP.hsv).ref_h_array(data)
+                    data = Color((k_separ, 1.0, 1.0), tp=CTP.hsv).ref_h_array(data)
 
-                if sigma == 0.0:
-                    expd = np.zeros(data.shape)
-                    expd[np.where((data > -1E-3) & (data < 1E-3))] = k_fact
+                    if sigma == 0.0:
+                        expd = np.zeros(data.shape)
+                        expd[np.where((data > -1E-3) & (data < 1E-3))] = k_fact
 
-                elif sigma == 1.0:
-                    expd = np.ones(data.shape) * k_fact
+                    elif sigma == 1.0:
+                        expd = np.ones(data.shape) * k_fact
 
-                else:
-                    expd = 0.001 * (10 ** (4.5 * sigma)) * -1
-                    expd = np.exp((data / 180.0) ** 2 / expd) * k_fact
+                    else:
+                        expd = 0.001 * (10 ** (4.5 * sigma)) * -1
+                        expd = np.exp((data / 180.0) ** 2 / expd) * k_fact
 
-                if onedir:
-                    data = data + expd * 180.0 + k_separ
+                    if onedir:
+                        data = data + expd * 180.0 + k_separ
 
-                else:
-                    data = data * (1.0 - expd)
-                    selection = np.where(data < 0.0)
-                    expd[selection] = expd[selection] * -1
-                    data = data + expd * 180.0 + k_separ
+                    else:
+                        data = data * (1.0 - expd)
+                        selection = np.where(data < 0.0)
+                        expd[selection] = expd[selection] * -1
+                        data = data + expd * 180.0 + k_separ
 
-                if useryb:
-                    data = Color.spc_ryb2rgb_h_array(data)
+                    if useryb:
+                        data = Color.spc_ryb2rgb_h_array(data)
 
-            else:
-                if sigma == 0.0:
-                    expd = np.zeros(data.shape)
-                    expd[np.where((data - k_separ > -1E-3) & (data - k_separ < 1E-3))] = k_fact
+                else:
+                    if sigma == 0.0:
+                        expd = np.zeros(data.shape)
+                        expd[np.where((data - k_separ > -1E-3) & (data - k_separ < 1E-3))] = k_fact
 
-                elif sigma == 1.0:
-                    expd = np.ones(data.shape) * k_fact
+                    elif sigma == 1.0:
+                        expd = np.ones(data.shape) * k_fact
 
-                else:
-                    expd = 0.001 * (10 ** (4.5 * sigma)) * -1
-                    expd = np.exp((data - k_separ) ** 2 / expd) * k_fact
+                    else:
+                        expd = 0.001 * (10 ** (4.5 * sigma)) * -1
+                        expd = np.exp((data - k_separ) ** 2 / expd) * k_fact
 
-                if onedir:
-                    data = data + expd
+                    if onedir:
+                        data = data + expd
 
-                else:
-                    expd = np.abs(expd)
-                    selection = np.where(data >= k_separ) if k_separ < 0.5 else np.where(data > k_separ)
-                    data = data * (1.0 - expd)
-                    data[selection] = data[selection] + expd[selection]
+                    else:
+                        expd = np.abs(expd)
+                        selection = np.where(data >= k_separ) if k_separ < 0.5 else np.where(data > k_separ)
+                        data = data * (1.0 - expd)
+                        data[selection] = data[selection] + expd[selection]
 
-                data[np.where(data < 0)] = 0
-                data[np.where(data > 1)] = 1
+                    data[np.where(data < 0)] = 0
+                    data[np.where(data > 1)] = 1
 
-            display_data[:, :, k] = data
-        self.rev_display_data = display_data
-        display_data = Color.hsv2rgb_array(display_data)
-        self.res_display_data = display_data
-        self.display = QImage(display_data, display_data.shape[1], display_data.shape[0], display_data.shape[1] * 3, QImage.Format_RGB888)
+                band_data[:, :, k] = data
+
+        self.run_hsv_display(enhance_band, res)
         self.ps_enhanced.emit(1)
 
     def run_inverse_rgb(self, process_scope, values):
@@ -752,7 +1207,7 @@ class Image3C(QThread):
 
         reg, res = values
 
-        if res and isinstance(self.res_display_data, np.ndarray):
+        if res and isinstance(self.res_display_data, np.ndarray) and self.res_display_data is not self.ori_display_data:
             display_data = self.res_display_data
 
         else:
@@ -780,26 +1235,15 @@ class Image3C(QThread):
 
         reg, res = values
 
-        if res and isinstance(self.rev_display_data, np.ndarray):
-            display_data = self.rev_display_data
-
-        elif res and isinstance(self.res_display_data, np.ndarray):
-            display_data = Color.rgb2hsv_array(self.res_display_data)
-
-        else:
-            display_data = Color.rgb2hsv_array(self.ori_display_data)
-
-        for k in reg:
-            if k == 0:
-                display_data[:, :, 0] = display_data[:, :, 0] + 180.0
+        def inverse_band(start, end, band_data):
+            for k in reg:
+                if k == 0:
+                    band_data[:, :, 0] = band_data[:, :, 0] + 180.0
 
-            else:
-                display_data[:, :, k] = 1.0 - display_data[:, :, k]
+                else:
+                    band_data[:, :, k] = 1.0 - band_data[:, :, k]
 
-        self.rev_display_data = display_data
-        display_data = Color.hsv2rgb_array(display_data)
-        self.res_display_data = display_data
-        self.display = QImage(display_data, display_data.shape[1], display_data.shape[0], display_data.shape[1] * 3, QImage.Format_RGB888)
+        self.run_hsv_display(inverse_band, res)
         self.ps_enhanced.emit(1)
 
     def run_cover_rgb(self, process_scope, values):
@@ -816,7 +1260,7 @@ class Image3C(QThread):
 
         reg, res, path = values
 
-        if res and isinstance(self.res_display_data, np.ndarray):
+        if res and isinstance(self.res_display_data, np.ndarray) and self.res_display_data is not self.ori_display_data:
             display_data = self.res_display_data
 
         else:
@@ -861,15 +1305,7 @@ class Image3C(QThread):
             return
 
         reg, res, path = values
-
-        if res and isinstance(self.rev_display_data, np.ndarray):
-            display_data = self.rev_display_data
-
-        elif res and isinstance(self.res_display_data, np.ndarray):
-            display_data = Color.rgb2hsv_array(self.res_display_data)
-
-        else:
-            display_data = Color.rgb2hsv_array(self.ori_display_data)
+        data = None
 
         if os.path.isfile(path):
             try:
@@ -881,23 +1317,21 @@ class Image3C(QThread):
                 data = None
                 self.ps_enhanced.emit(3)
 
-            if isinstance(data, np.ndarray):
-                if data.shape == display_data.shape:
-                    data = Color.rgb2hsv_array(data)
-
-                    for k in reg:
-                        display_data[:, :, k] = data[:, :, k]
-
-                else:
-                    self.ps_enhanced.emit(2)
+            if isinstance(data, np.ndarray) and data.shape != self.ori_display_data.shape:
+                data = None
+                self.ps_enhanced.emit(2)
 
         else:
             self.ps_enhanced.emit(3)
 
-        self.rev_display_data = display_data
-        display_data = Color.hsv2rgb_array(display_data)
-        self.res_display_data = display_data
-        self.display = QImage(display_data, display_data.shape[1], display_data.shape[0], display_data.shape[1] * 3, QImage.Format_RGB888)
+        def cover_band(start, end, band_data):
+            if isinstance(data, np.ndarray):
+                cover_data = Color.rgb2hsv_array(data[start: end])
+
+                for k in reg:
+                    band_data[:, :, k] = cover_data[:, :, k]
+
+        self.run_hsv_display(cover_band, res)
         self.ps_enhanced.emit(1)
 
     def run_extract(self, process_scope, values):
@@ -906,19 +1340,34 @@ class Image3C(QThread):
 
         Args:
             process_scope (tuple or list): in format (start point, total length), e.g. (0, 100).
-            values (tuple or list): (random number, color type).
+            values (tuple or list): (random number, color type, use ryb, number of candidates, seed). Seed is None for random results.
         """
 
         if not isinstance(self.ori_display_data, np.ndarray):
             return
 
-        rand_num, color_type, useryb = values
+        rand_num, color_type, useryb = values[:3]
+        num = values[3] if len(values) > 3 else 1
+        seed = values[4] if len(values) > 4 else None
 
-        if isinstance(self.res_display_data, np.ndarray):
+        if isinstance(self.res_display_data, np.ndarray) and self.res_display_data is not self.ori_display_data:
             display_data = self.res_display_data
+            version = self._res_version
 
         else:
             display_data = self.ori_display_data
+            version = 0
+
+        # seeded results are reproducible, so they are cached by image content and enhancement version.
+        key = None if seed is None else (self.get_display_hash(), version, rand_num, color_type, bool(useryb), seed, num)
+        candidates = None if key is None else self._extract_memo.get(key)
+
+        if candidates is None:
+            # the histogram is built once per display, so that repeated extracts cost O(bins) instead of O(pixels). The color index is only built if a color is not in the histogram.
+            rng = None if seed is None else np.random.RandomState(seed)
+            candidates = extract_image_candidates(display_data, rand_num, color_type, num, useryb=useryb, hist=self.get_display_hist(), color_index=self.get_display_index, rng=rng)
+
+            if key is not None:
+                self._extract_memo.put(key, candidates)
 
-        extracts = extract_image(display_data, rand_num, color_type, useryb=useryb)
-        self.ps_extracts.emit(extracts)
+        self.ps_extracts.emit([list(x) for x in candidates])
@@ -675,6 +675,7 @@ class Rickrack(QMainWindow, Ui_MainWindow):
         self._wget_script.ps_print.connect(self._wget_image.save_image)
         self._wget_script.ps_print.connect(self._wget_board.save_image)
         self._wget_script.ps_extract.connect(self._wget_image.extract_image)
+        self._wget_script.ps_switch_extract.connect(self._wget_image.switch_extract)
 
     def _setup_channel(self):
         """
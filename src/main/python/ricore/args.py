@@ -20,7 +20,7 @@ import time
 import locale
 import shutil
 import unittest
-from ricore.color import CTP, OTP
+from ricore.color import Color, CTP, OTP
 from ricore.color_set import ColorSet
 from ricore.check import check_key, check_file_name, check_nonempt_str_lst
 
@@ -302,6 +302,16 @@ class Args(object):
         self.zoom_step = 1.1
         self.move_step = 5
         self.rand_num = 10000
+        self.extract_num = 8
+        self.extract_seed = -1
+        self.image_cache_size = 512
+        self.image_cache_spill = True
+        self.image_tile_size = 0
+        self.image_tile_memmap = False
+        self.image_workers = 0
+        self.image_precompute = False
+        self.color_memo_size = 0
+        self.color_uint24_tables = False
         self.circle_dist = 16
         self.positive_wid = 3
         self.negative_wid = 3
@@ -390,6 +400,8 @@ class Args(object):
         self.dep_circle_dist_2 = self.circle_dist ** 2
         self.dep_circle_dist_wid = self.circle_dist + (self.positive_wid + self.negative_wid) * 2
         self.dep_circle_dist_wid_2 = self.dep_circle_dist_wid ** 2
+        Color.set_memo(self.color_memo_size)
+        Color.set_uint24_tables(self.color_uint24_tables)
         self.dep_rtp = self.color_spc % 2
         self.dep_wtp = self.color_spc // 2
         self.dep_wtp_s, self.dep_wtp_n = ((CTP.s, 1), (CTP.v, 2))[self.dep_rtp]
@@ -410,7 +422,7 @@ class Args(object):
             "usr_color", "usr_image", "store_loc", "hm_rule", "overflow", "lang", "press_move", "color_spc",
             "show_rgb", "show_hsv", "show_info_pts", "h_range", "s_range", "v_range",
             "wheel_ratio", "volum_ratio", "cubic_ratio", "coset_ratio",
-            "rev_direct", "s_tag_radius", "v_tag_radius", "zoom_step", "move_step", "rand_num", "circle_dist",
+            "rev_direct", "s_tag_radius", "v_tag_radius", "zoom_step", "move_step", "rand_num", "extract_num", "extract_seed", "image_cache_size", "image_cache_spill", "image_tile_size", "image_tile_memmap", "image_workers", "image_precompute", "color_memo_size", "color_uint24_tables", "circle_dist",
             "positive_wid", "negative_wid", "wheel_ed_wid",
             "positive_color", "negative_color", "wheel_ed_color",
             "stab_column", # "main_win_state", "main_win_geometry",
@@ -470,6 +482,16 @@ class Args(object):
             "zoom_step": lambda vl: self.pfmt_num_in_scope(vl, (1.0, 10.0), float, self.zoom_step),
             "move_step": lambda vl: self.pfmt_num_in_scope(vl, (1, 100), int, self.move_step),
             "rand_num": lambda vl: self.pfmt_num_in_scope(vl, (0, 1000000000), int, self.rand_num),
+            "extract_num": lambda vl: self.pfmt_num_in_scope(vl, (1, 100), int, self.extract_num),
+            "extract_seed": lambda vl: self.pfmt_num_in_scope(vl, (-1, 2147483647), int, self.extract_seed),
+            "image_cache_size": lambda vl: self.pfmt_num_in_scope(vl, (64, 65536), int, self.image_cache_size),
+            "image_cache_spill": lambda vl: self.pfmt_value(vl, bool, self.image_cache_spill),
+            "image_tile_size": lambda vl: self.pfmt_num_in_scope(vl, (0, 65536), int, self.image_tile_size),
+            "image_tile_memmap": lambda vl: self.pfmt_value(vl, bool, self.image_tile_memmap),
+            "image_workers": lambda vl: self.pfmt_num_in_scope(vl, (0, 256), int, self.image_workers),
+            "image_precompute": lambda vl: self.pfmt_value(vl, bool, self.image_precompute),
+            "color_memo_size": lambda vl: self.pfmt_num_in_scope(vl, (0, 1048576), int, self.color_memo_size),
+            "color_uint24_tables": lambda vl: self.pfmt_value(vl, bool, self.color_uint24_tables),
             "circle_dist": lambda vl: self.pfmt_num_in_scope(vl, (0, 50), int, self.circle_dist),
             "positive_wid": lambda vl: self.pfmt_num_in_scope(vl, (0, 20), int, self.positive_wid),
             "negative_wid": lambda vl: self.pfmt_num_in_scope(vl, (0, 20), int, self.negative_wid),
@@ -509,6 +531,12 @@ class Args(object):
                 self.dep_circle_dist_wid = self.circle_dist + (self.positive_wid + self.negative_wid) * 2
                 self.dep_circle_dist_wid_2 = self.dep_circle_dist_wid ** 2
 
+            elif item == "color_memo_size":
+                Color.set_memo(self.color_memo_size)
+
+            elif item == "color_uint24_tables":
+                Color.set_uint24_tables(self.color_uint24_tables)
+
             elif item == "color_spc":
                 self.dep_rtp = self.color_spc % 2
                 self.dep_wtp = self.color_spc // 2
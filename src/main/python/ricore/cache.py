@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+
+"""
+DigitalPalette is a free software, which is distributed in the hope 
+that it will be useful, but WITHOUT ANY WARRANTY. You can redistribute 
+it and/or modify it under the terms of the GNU General Public License 
+as published by the Free Software Foundation. See the GNU General Public 
+License for more details.
+
+Please visit https://github.com/eigenmiao/DigitalPalette for more 
+infomation about DigitalPalette.
+
+Copyright (c) 2019-2021 by Eigenmiao. All Rights Reserved.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import threading
+import numpy as np
+from collections import OrderedDict
+
+
+class ChannelCache(object):
+    """
+    Channel cache object. Keep rendered image arrays in memory with a byte budget and LRU eviction.
+    Evicted arrays are spilled into spill dir (uncompressed npy files) if spill dir is given, otherwise dropped.
+    """
+
+    def __init__(self, max_bytes, spill_dir=None):
+        """
+        Init channel cache.
+
+        Args:
+            max_bytes (int): memory budget in bytes.
+            spill_dir (str or None): directory for spilled arrays. None for no disk spill.
+        """
+
+        self.max_bytes = int(max_bytes)
+        self.spill_dir = spill_dir
+        self._items = OrderedDict()
+        self._spilled = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items or key in self._spilled
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def put(self, key, data):
+        """
+        Store an array. The array is stored by reference and should not be modified afterwards.
+
+        Args:
+            key (tuple): cache key, e.g. (category, channel).
+            data (array): image array.
+        """
+
+        with self._lock:
+            self._pop(key)
+            self._remove_spilled(key)
+            self._items[key] = data
+            self._nbytes += data.nbytes
+            self._evict()
+
+    def get(self, key):
+        """
+        Get a stored array. Spilled arrays are loaded back into memory.
+
+        Args:
+            key (tuple): cache key, e.g. (category, channel).
+
+        Returns:
+            array or None. None if key not in cache.
+        """
+
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+
+            if key not in self._spilled:
+                return None
+
+            try:
+                data = np.load(self._spilled[key])
+
+            except Exception:
+                self._remove_spilled(key)
+                return None
+
+            self._items[key] = data
+            self._nbytes += data.nbytes
+            self._evict()
+
+            return data
+
+    def discard(self, key):
+        """
+        Remove an array from memory and spill dir.
+
+        Args:
+            key (tuple): cache key, e.g. (category, channel).
+        """
+
+        with self._lock:
+            self._pop(key)
+            self._remove_spilled(key)
+
+    def clear(self):
+        """
+        Remove all arrays from memory and spill dir.
+        """
+
+        with self._lock:
+            self._items.clear()
+            self._nbytes = 0
+
+            for key in list(self._spilled):
+                self._remove_spilled(key)
+
+    def _pop(self, key):
+        data = self._items.pop(key, None)
+
+        if data is not None:
+            self._nbytes -= data.nbytes
+
+        return data
+
+    def _remove_spilled(self, key):
+        path = self._spilled.pop(key, None)
+
+        if path and os.path.isfile(path):
+            try:
+                os.remove(path)
+
+            except Exception:
+                pass
+
+    def _evict(self):
+        # the most recent item is always kept even if it is larger than budget.
+        while self._nbytes > self.max_bytes and len(self._items) > 1:
+            key, data = self._items.popitem(last=False)
+            self._nbytes -= data.nbytes
+
+            if key in self._spilled or not (self.spill_dir and os.path.isdir(self.spill_dir)):
+                continue
+
+            path = os.sep.join((self.spill_dir, "cache_{}.npy".format("_".join(str(x) for x in key))))
+
+            try:
+                np.save(path, data)
+                self._spilled[key] = path
+
+            except Exception:
+                pass
+
+
+class MemoCache(object):
+    """
+    Memo cache object. Keep results of scalar functions with a length limit and LRU eviction.
+    Hits and misses are counted for profiling.
+    """
+
+    def __init__(self, max_len):
+        """
+        Init memo cache.
+
+        Args:
+            max_len (int): max number of stored results.
+        """
+
+        self.max_len = int(max_len)
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    def get(self, key):
+        """
+        Get a stored result.
+
+        Args:
+            key (hashable): quantized function input.
+
+        Returns:
+            result or None. None if key not in cache.
+        """
+
+        with self._lock:
+            value = self._items.get(key)
+
+            if value is None:
+                self.misses += 1
+
+            else:
+                self.hits += 1
+                self._items.move_to_end(key)
+
+            return value
+
+    def put(self, key, value):
+        """
+        Store a result. The result is stored by reference and should not be modified afterwards.
+
+        Args:
+            key (hashable): quantized function input.
+            value (object): function result.
+        """
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+
+            while len(self._items) > self.max_len:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all results and reset counters.
+        """
+
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Get profiling counters.
+
+        Returns:
+            dict of hits, misses and len.
+        """
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "len": len(self._items)}
+
+
+class TestChannelCache(unittest.TestCase):
+    def test_lru(self):
+        cache = ChannelCache(300)
+
+        for i in range(3):
+            cache.put((0, i), np.full((10, 10), i, dtype=np.uint8))
+
+        self.assertEqual(cache.nbytes, 300)
+        cache.get((0, 0))
+        cache.put((0, 3), np.full((10, 10), 3, dtype=np.uint8))
+        self.assertEqual(cache.nbytes, 300)
+        self.assertIsNone(cache.get((0, 1)))
+        self.assertEqual(int(cache.get((0, 0))[0, 0]), 0)
+
+    def test_spill(self):
+        spill_dir = tempfile.mkdtemp()
+
+        try:
+            cache = ChannelCache(200, spill_dir)
+
+            for i in range(4):
+                cache.put((1, i), np.full((10, 10), i, dtype=np.uint8))
+
+            self.assertEqual(len(cache), 2)
+
+            for i in range(4):
+                self.assertIn((1, i), cache)
+                self.assertEqual(int(cache.get((1, i))[5, 5]), i)
+
+            self.assertLessEqual(cache.nbytes, 200)
+            cache.clear()
+            self.assertEqual(os.listdir(spill_dir), [])
+
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+class TestMemoCache(unittest.TestCase):
+    def test_lru(self):
+        memo = MemoCache(2)
+        self.assertIsNone(memo.get("a"))
+        memo.put("a", 1)
+        memo.put("b", 2)
+        self.assertEqual(memo.get("a"), 1)
+        memo.put("c", 3)
+        self.assertIsNone(memo.get("b"))
+        self.assertEqual(memo.get("c"), 3)
+        self.assertEqual(memo.stats(), {"hits": 2, "misses": 2, "len": 2})
+        memo.clear()
+        self.assertEqual(memo.stats(), {"hits": 0, "misses": 0, "len": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
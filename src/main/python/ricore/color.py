@@ -14,8 +14,10 @@ Copyright (c) 2019-2021 by Eigenmiao. All Rights Reserved.
 """
 
 import re
+import time
 import unittest
 import numpy as np
+from ricore.cache import MemoCache
 
 
 class CTP(object):
@@ -48,8 +50,19 @@ class OTP(object):
 class Color(object):
     """
     Color object. Storing rgb, hsv and hex code (hec) color.
+    Only the assigned representation is formated when setting, others are derived on first access.
     """
 
+    __slots__ = ("_rgb", "_hsv", "_hec", "_overflow")
+    _memo = None
+    _uint24_tables = None
+    _hec_tables = None
+    _hsv_h_tables = None
+    _rgb_sext_tables = None
+    _srgb_table = None
+    _rgb2xyz_matrix = ((0.412453, 0.357580, 0.180423), (0.212671, 0.715160, 0.072169), (0.019334, 0.119193, 0.950227))
+    _xyz2rgb_matrix = ((3.24048134, -1.53715152, -0.49853633), (-0.96925495, 1.87599, 0.04155593), (0.05564664, -0.20404134, 1.05731107))
+
     def __init__(self, item, tp=CTP.color, overflow=OTP.cutoff):
         """
         Init Color ojbect.
@@ -119,31 +132,31 @@ class Color(object):
         assert isinstance(tp, int) and tp in CTP.rgfull, tp
 
         if tp == CTP.rgb:
-            return self._rgb
+            return self.rgb
 
         elif tp == CTP.hsv:
-            return self._hsv
+            return self.hsv
 
         elif tp == CTP.hec:
-            return self._hec
+            return self.hec
 
         elif tp == CTP.r:
-            return self._rgb[0]
+            return self.rgb[0]
 
         elif tp == CTP.g:
-            return self._rgb[1]
+            return self.rgb[1]
 
         elif tp == CTP.b:
-            return self._rgb[2]
+            return self.rgb[2]
 
         elif tp == CTP.h:
-            return self._hsv[0]
+            return self.hsv[0]
 
         elif tp == CTP.s:
-            return self._hsv[1]
+            return self.hsv[1]
 
         elif tp == CTP.v:
-            return self._hsv[2]
+            return self.hsv[2]
 
         else: # CTP.color
             return self
@@ -183,39 +196,48 @@ class Color(object):
 
     @property
     def rgb(self):
+        if self._rgb is None:
+            self._rgb = self.hsv2rgb(self._hsv) if self._hsv is not None else self.hec2rgb(self._hec)
+
         return self._rgb
 
     @property
     def hsv(self):
+        if self._hsv is None:
+            self._hsv = self.rgb2hsv(self.rgb)
+
         return self._hsv
 
     @property
     def hec(self):
+        if self._hec is None:
+            self._hec = self.rgb2hec(self.rgb)
+
         return self._hec
 
     @property
     def r(self):
-        return self._rgb[0]
+        return self.rgb[0]
 
     @property
     def g(self):
-        return self._rgb[1]
+        return self.rgb[1]
 
     @property
     def b(self):
-        return self._rgb[2]
+        return self.rgb[2]
 
     @property
     def h(self):
-        return self._hsv[0]
+        return self.hsv[0]
 
     @property
     def s(self):
-        return self._hsv[1]
+        return self.hsv[1]
 
     @property
     def v(self):
-        return self._hsv[2]
+        return self.hsv[2]
 
     @property
     def color(self):
@@ -224,54 +246,54 @@ class Color(object):
     @rgb.setter
     def rgb(self, item):
         self._rgb = self.fmt_rgb(item)
-        self._hsv = self.rgb2hsv(self._rgb)
-        self._hec = self.rgb2hec(self._rgb)
+        self._hsv = None
+        self._hec = None
 
     @hsv.setter
     def hsv(self, item):
         self._hsv = self.fmt_hsv(item, overflow=self._overflow)
-        self._rgb = self.hsv2rgb(self._hsv)
-        self._hec = self.hsv2hec(self._hsv)
+        self._rgb = None
+        self._hec = None
 
     @hec.setter
     def hec(self, item):
         self._hec = self.fmt_hec(item)
-        self._rgb = self.hec2rgb(self._hec)
-        self._hsv = self.hec2hsv(self._hec)
+        self._rgb = None
+        self._hsv = None
 
     @r.setter
     def r(self, item):
-        rgb = list(self._rgb)
+        rgb = list(self.rgb)
         rgb[0] = item
         self.rgb = rgb
 
     @g.setter
     def g(self, item):
-        rgb = list(self._rgb)
+        rgb = list(self.rgb)
         rgb[1] = item
         self.rgb = rgb
 
     @b.setter
     def b(self, item):
-        rgb = list(self._rgb)
+        rgb = list(self.rgb)
         rgb[2] = item
         self.rgb = rgb
 
     @h.setter
     def h(self, item):
-        hsv = list(self._hsv)
+        hsv = list(self.hsv)
         hsv[0] = item
         self.hsv = hsv
 
     @s.setter
     def s(self, item):
-        hsv = list(self._hsv)
+        hsv = list(self.hsv)
         hsv[1] = item
         self.hsv = hsv
 
     @v.setter
     def v(self, item):
-        hsv = list(self._hsv)
+        hsv = list(self.hsv)
         hsv[2] = item
         self.hsv = hsv
 
@@ -280,7 +302,7 @@ class Color(object):
         self._rgb, self._hsv, self._hec = self.fmt_rgb(item.rgb), self.fmt_hsv(item.hsv), self.fmt_hec(item.hec)
 
     def export(self):
-        return {"rgb": self._rgb.tolist(), "hsv": self._hsv.tolist(), "hex_code": self._hec}
+        return {"rgb": self.rgb.tolist(), "hsv": self.hsv.tolist(), "hex_code": self.hec}
 
     def ref_h(self, hue):
         """
@@ -413,27 +435,53 @@ class Color(object):
         return np.array((_h, _s, _v), dtype=np.float32)
 
     @classmethod
-    def fmt_hsv_array(cls, hsv_array):
+    def fmt_hsv_array(cls, hsv_array, overflow=OTP.cutoff, out=None):
         """
-        Class method. Format item to standard hsv array.
+        Class method. Format item to standard hsv array in the same way as fmt_hsv. The hsv array is not modified unless it is given as out.
+        Values are calculated in float64 as fmt_hsv (or in the data type of float hsv array for "cutoff") before translated into float32.
 
         Args:
-            hsv_array (3D array): array item to be formated.
+            hsv_array (array): array item to be formated in shape (..., 3).
+            overflow (int): method to manipulate overflowed s and v values, in "cutoff", "revert" and "repeat".
+            out (array or None): buffer for formated array. None for a new float32 array.
 
         Returns:
             standard hsv array.
         """
 
-        assert isinstance(hsv_array, np.ndarray) and len(hsv_array.shape) == 3 and hsv_array.shape[2] == 3, hsv_array
-        _h = hsv_array[:, :, 0]
-        _s = hsv_array[:, :, 1]
-        _v = hsv_array[:, :, 2]
-        _s[np.where(_s < 0.0)] = 0.0
-        _s[np.where(_s > 1.0)] = 1.0
-        _v[np.where(_v < 0.0)] = 0.0
-        _v[np.where(_v > 1.0)] = 1.0
+        assert isinstance(hsv_array, np.ndarray) and hsv_array.shape[-1:] == (3,), hsv_array
+        assert isinstance(overflow, int) and overflow in OTP.rgfull, overflow
+        dtype = hsv_array.dtype if hsv_array.dtype.kind == "f" and overflow == OTP.cutoff else np.float64
+        _h = hsv_array[..., 0].astype(dtype)
+        _s = hsv_array[..., 1].astype(dtype)
+        _v = hsv_array[..., 2].astype(dtype)
+
+        if overflow == OTP.cutoff:
+            # in range colors are not changed by clip and modulo.
+            np.clip(_s, 0.0, 1.0, out=_s)
+            np.clip(_v, 0.0, 1.0, out=_v)
+
+        else:
+            inside = (_h >= 0.0) & (_h < 360.0) & (_s >= 0.0) & (_s <= 1.0) & (_v >= 0.0) & (_v <= 1.0)
+
+            if overflow == OTP.revert:
+                fmt_s = np.where(_s // 1.0 % 2.0 == 0.0, _s % 1.0, 1.0 - (_s % 1.0))
+                fmt_v = np.where(_v // 1.0 % 2.0 == 0.0, _v % 1.0, 1.0 - (_v % 1.0))
+
+            else: # OTP.repeat
+                fmt_s = _s % 1.0
+                fmt_v = _v % 1.0
+
+            _s = np.where(inside, _s, fmt_s)
+            _v = np.where(inside, _v, fmt_v)
+
         _h = _h % 360.0
-        return np.stack((_h, _s, _v), axis=2).astype(np.float32)
+        fmt_hsv = np.empty(hsv_array.shape, dtype=np.float32) if out is None else out
+        fmt_hsv[..., 0] = _h
+        fmt_hsv[..., 1] = _s
+        fmt_hsv[..., 2] = _v
+
+        return fmt_hsv
 
     @classmethod
     def fmt_hec(cls, hec):
@@ -510,13 +558,8 @@ class Color(object):
             standard hex code (hec) color.
         """
 
-        _hec = re.findall(r"[0-9A-F]+", str(hec).upper())
-        _hec = ["" if len(i) < 6 else i[:6] for i in _hec]
-
-        while "" in _hec:
-            _hec.remove("")
-
-        return _hec
+        # first 6 digits of each hex digit run which is not shorter than 6.
+        return re.findall(r"([0-9A-F]{6})[0-9A-F]*", str(hec).upper())
 
     @classmethod
     def spc_rgb2ryb_h(cls, hue):
@@ -536,12 +579,12 @@ class Color(object):
             return _h
 
     @classmethod
-    def spc_rgb2ryb_h_array(cls, hue_array):
+    def spc_rgb2ryb_h_array(cls, hue_array, dtype=np.float32):
         """
-        Class method. Transfer hue of rgb array to hue of ryb array.
+        Class method. Transfer hue of rgb array to hue of ryb array. Values are calculated in dtype.
         """
 
-        _h_array = np.array(hue_array, dtype=np.float32)
+        _h_array = np.array(hue_array, dtype=dtype)
         _h_array = _h_array % 360
         sel_1 = np.where((_h_array >=   0) & (_h_array <  60))
         sel_2 = np.where((_h_array >=  60) & (_h_array < 240))
@@ -587,12 +630,12 @@ class Color(object):
             return _h
 
     @classmethod
-    def spc_ryb2rgb_h_array(cls, hue_array):
+    def spc_ryb2rgb_h_array(cls, hue_array, dtype=np.float32):
         """
-        Class method. Transfer hue of ryb array to hue of rgb array.
+        Class method. Transfer hue of ryb array to hue of rgb array. Values are calculated in dtype.
         """
 
-        _h_array = np.array(hue_array, dtype=np.float32)
+        _h_array = np.array(hue_array, dtype=dtype)
         _h_array = _h_array % 360
         sel_1 = np.where((_h_array >=   0) & (_h_array < 120))
         sel_2 = np.where((_h_array >= 120) & (_h_array < 240))
@@ -666,6 +709,77 @@ class Color(object):
         else:
             return None
 
+    @classmethod
+    def set_memo(cls, max_len):
+        """
+        Class method. Enable or disable memo caches of scalar translations (rgb2hsv, hsv2rgb, rgb2hec and hec2rgb).
+        Inputs are quantized by fmt_rgb and fmt_hsv as keys, so cached results are the same as calculated ones.
+
+        Args:
+            max_len (int): max number of stored results for each translation. 0 for disable.
+        """
+
+        if max_len > 0:
+            cls._memo = dict((name, MemoCache(max_len)) for name in ("rgb2hsv", "hsv2rgb", "rgb2hec", "hec2rgb"))
+
+        else:
+            cls._memo = None
+
+    @classmethod
+    def get_memo_stats(cls):
+        """
+        Class method. Get hits and misses of memo caches for profiling.
+
+        Returns:
+            dict of translation name and counters. Empty if memo caches are disabled.
+        """
+
+        if cls._memo is None:
+            return {}
+
+        return dict((name, memo.stats()) for name, memo in cls._memo.items())
+
+    @classmethod
+    def set_uint24_tables(cls, enable):
+        """
+        Class method. Enable or disable precomputed hex code (hec) and hsv tables of all 16M rgb colors for batch translations in ColorArray.
+        Tables are indexed by uint24 rgb (r << 16 | g << 8 | b) and take about 300 MB memory.
+
+        Args:
+            enable (bool): if use uint24 tables.
+        """
+
+        if enable and cls._uint24_tables is None:
+            index = np.arange(1 << 24, dtype=np.uint32)
+            digits = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+            hec_table = np.empty((1 << 24, 6), dtype=np.uint8)
+
+            for k in range(6):
+                hec_table[:, k] = digits[(index >> (20 - 4 * k)) & 15]
+
+            hsv_table = np.empty((1 << 24, 3), dtype=np.float32)
+
+            for start in range(0, 1 << 24, 1 << 20):
+                band = index[start: start + (1 << 20)]
+                rgb = np.stack((band >> 16, band >> 8 & 255, band & 255), axis=1).astype(np.uint8)
+                hsv_table[start: start + (1 << 20)] = ColorArray._rgb2hsv_rows(rgb)
+
+            cls._uint24_tables = (hec_table.view("S6").reshape(-1), hsv_table)
+
+        elif not enable:
+            cls._uint24_tables = None
+
+    @classmethod
+    def _memo_call(cls, name, key, func, item):
+        memo = cls._memo[name]
+        value = memo.get(key)
+
+        if value is None:
+            value = func(item)
+            memo.put(key, value)
+
+        return value.copy() if isinstance(value, np.ndarray) else value
+
     @classmethod
     def rgb2hsv(cls, rgb):
         """
@@ -678,6 +792,13 @@ class Color(object):
             hsv color.
         """
 
+        if cls._memo is not None:
+            return cls._memo_call("rgb2hsv", cls.fmt_rgb(rgb).tobytes(), cls._rgb2hsv, rgb)
+
+        return cls._rgb2hsv(rgb)
+
+    @classmethod
+    def _rgb2hsv(cls, rgb):
         color = cls.fmt_rgb(rgb)
         v = max(color) / 255.0
 
@@ -720,47 +841,76 @@ class Color(object):
         return cls.fmt_hsv((h, s, v))
 
     @classmethod
-    def rgb2hsv_array(cls, rgb_array):
+    def rgb2hsv_array(cls, rgb_array, out=None, dtype=np.float32):
         """
         Translate rgb array into hsv array.
 
         Args:
             rgb (3D array): rgb array.
+            out (3D array or None): buffer for hsv array. None for a new array.
+            dtype (type): data type of hsv array if out is None.
 
         Returns:
             hsv array.
         """
 
-        colors = cls.fmt_rgb_array(rgb_array).astype(np.float32)
-        v = np.max(colors, axis=2) / 255.0
-        v[np.where(v < 1E-5)] = 1E-12
-        colors[:, :, 0] = colors[:, :, 0] / v
-        colors[:, :, 1] = colors[:, :, 1] / v
-        colors[:, :, 2] = colors[:, :, 2] / v
-        colors[np.where(v < 1E-5)] = np.array((255, 0, 0))
-        v[np.where(v < 1E-5)] = 0
-        s = 1 - np.min(colors, axis=2) / 255.0
-        s[np.where(s < 1E-5)] = 1E-12
-        colors[:, :, 0] = (colors[:, :, 0] - 255 * (1 - s)) / s
-        colors[:, :, 1] = (colors[:, :, 1] - 255 * (1 - s)) / s
-        colors[:, :, 2] = (colors[:, :, 2] - 255 * (1 - s)) / s
-        colors[np.where(s < 1E-5)] = np.array((255, 0, 0))
-        colors = np.rint(colors).astype(np.uint8)
-        s[np.where(s < 1E-5)] = 0
+        if not (isinstance(rgb_array, np.ndarray) and rgb_array.dtype == np.uint8):
+            rgb_array = cls.fmt_rgb_array(rgb_array)
+
+        assert len(rgb_array.shape) == 3 and rgb_array.shape[2] == 3, rgb_array.shape
+        hsv_array = np.empty(rgb_array.shape, dtype=dtype) if out is None else out
+        r, g, b = rgb_array[:, :, 0], rgb_array[:, :, 1], rgb_array[:, :, 2]
+        c_max = np.maximum(np.maximum(r, g), b)
+        c_min = np.minimum(np.minimum(r, g), b)
+
+        # v is zero only for black, which is divided by 1.0 instead of 1E-12, both give (h, s, v) = (0, 1, 0).
+        v = np.divide(c_max, np.float32(255.0), dtype=np.float32)
+        w = v + (c_max == 0)
+        s = np.divide(c_min, w, dtype=np.float32)
+        s /= np.float32(255.0)
+        np.subtract(np.float32(1.0), s, out=s)
+        gray = s < 1E-5
+        s[gray] = 1.0
+        t = np.subtract(np.float32(1.0), s)
+        t *= np.float32(255.0)
         h = np.zeros(v.shape, dtype=np.float32)
-        pos = np.where((colors[:, :, 2] == 255) & (colors[:, :, 0] == 0))
-        h[pos] = 240 - colors[pos][:, 1] / 255 * 60
-        pos = np.where((colors[:, :, 2] == 255) & (colors[:, :, 1] == 0))
-        h[pos] = 240 + colors[pos][:, 0] / 255 * 60
-        pos = np.where((colors[:, :, 1] == 255) & (colors[:, :, 2] == 0))
-        h[pos] = 120 - colors[pos][:, 0] / 255 * 60
-        pos = np.where((colors[:, :, 1] == 255) & (colors[:, :, 0] == 0))
-        h[pos] = 120 + colors[pos][:, 2] / 255 * 60
-        pos = np.where((colors[:, :, 0] == 255) & (colors[:, :, 1] == 0))
-        h[pos] = 360 - colors[pos][:, 2] / 255 * 60
-        pos = np.where((colors[:, :, 0] == 255) & (colors[:, :, 2] == 0))
-        h[pos] = colors[pos][:, 1] / 255 * 60
-        return cls.fmt_hsv_array(np.stack((h, s, v), axis=2))
+        chnls = []
+        temp = np.empty(v.shape, dtype=np.float32)
+
+        for c in (r, g, b):
+            np.divide(c, w, out=temp, dtype=np.float32)
+            temp -= t
+            temp /= s
+            np.rint(temp, out=temp)
+            chnls.append(temp.astype(np.uint8))
+
+        is_max = [x == 255 for x in chnls]
+        is_min = [x == 0 for x in chnls]
+        h_tables = cls._get_hsv_h_tables()
+
+        for k, (i, j, m) in enumerate(((2, 0, 1), (2, 1, 0), (1, 2, 0), (1, 0, 2), (0, 1, 2), (0, 2, 1))):
+            np.copyto(h, h_tables[k][chnls[m]], where=is_max[i] & is_min[j])
+
+        h[gray] = 0.0
+        s[gray] = 0.0
+        hsv_array[:, :, 0] = h
+        hsv_array[:, :, 1] = s
+        hsv_array[:, :, 2] = v
+
+        return hsv_array
+
+    @classmethod
+    def _get_hsv_h_tables(cls):
+        """
+        Get h tables of rgb2hsv_array. Normalized channel value (0 ~ 255) to h in each hue sextant, formated into 0 ~ 360.
+        """
+
+        if cls._hsv_h_tables is None:
+            x = np.arange(256, dtype=np.uint8)
+            tables = (240 - x / 255 * 60, 240 + x / 255 * 60, 120 - x / 255 * 60, 120 + x / 255 * 60, 360 - x / 255 * 60, x / 255 * 60)
+            cls._hsv_h_tables = np.array(tables, dtype=np.float32) % 360.0
+
+        return cls._hsv_h_tables
 
     @classmethod
     def hsv2rgb(cls, hsv):
@@ -774,6 +924,13 @@ class Color(object):
             rgb color.
         """
 
+        if cls._memo is not None:
+            return cls._memo_call("hsv2rgb", cls.fmt_hsv(hsv).tobytes(), cls._hsv2rgb, hsv)
+
+        return cls._hsv2rgb(hsv)
+
+    @classmethod
+    def _hsv2rgb(cls, hsv):
         h, s, v = cls.fmt_hsv(hsv)
 
         if 0 <= h < 60:
@@ -805,46 +962,76 @@ class Color(object):
         return cls.fmt_rgb(color)
 
     @classmethod
-    def hsv2rgb_array(cls, hsv_array):
+    def hsv2rgb_array(cls, hsv_array, out=None, dtype=np.uint8):
         """
-        Translate hsv array into rgb array.
+        Translate hsv array into rgb array. The hsv array is not modified.
 
         Args:
             hsv (3D array): hsv array.
+            out (3D array or None): buffer for rgb array. None for a new array.
+            dtype (type): data type of rgb array if out is None.
 
         Returns:
             rgb array.
         """
 
-        colors = cls.fmt_hsv_array(hsv_array)
-        r = np.zeros(colors.shape[:2], dtype=np.uint8)
-        g = np.zeros(colors.shape[:2], dtype=np.uint8)
-        b = np.zeros(colors.shape[:2], dtype=np.uint8)
-        pos = np.where((colors[:, :, 0] >= 0) & (colors[:, :, 0] < 60))
-        r[pos] = 255
-        g[pos] = np.round(colors[pos][:, 0] / 60 * 255)
-        pos = np.where((colors[:, :, 0] >= 60) & (colors[:, :, 0] < 120))
-        r[pos] = np.round((1 - (colors[pos][:, 0] - 60) / 60) * 255)
-        g[pos] = 255
-        pos = np.where((colors[:, :, 0] >= 120) & (colors[:, :, 0] < 180))
-        g[pos] = 255
-        b[pos] = np.round((colors[pos][:, 0] - 120) / 60 * 255)
-        pos = np.where((colors[:, :, 0] >= 180) & (colors[:, :, 0] < 240))
-        g[pos] = np.round((1 - (colors[pos][:, 0] - 180) / 60) * 255)
-        b[pos] = 255
-        pos = np.where((colors[:, :, 0] >= 240) & (colors[:, :, 0] < 300))
-        r[pos] = np.round((colors[pos][:, 0] - 240) / 60 * 255)
-        b[pos] = 255
-        pos = np.where((colors[:, :, 0] >= 300) & (colors[:, :, 0] < 360))
-        r[pos] = 255
-        b[pos] = np.round((1 - (colors[pos][:, 0] - 300) / 60) * 255)
-        r = r + (r * -1 + 255) * (1 - colors[:, :, 1])
-        g = g + (g * -1 + 255) * (1 - colors[:, :, 1])
-        b = b + (b * -1 + 255) * (1 - colors[:, :, 1])
-        r = r * colors[:, :, 2]
-        g = g * colors[:, :, 2]
-        b = b * colors[:, :, 2]
-        return cls.fmt_rgb_array(np.stack((r, g, b), axis=2))
+        assert isinstance(hsv_array, np.ndarray) and len(hsv_array.shape) == 3 and hsv_array.shape[2] == 3, hsv_array
+        rgb_array = np.empty(hsv_array.shape, dtype=dtype) if out is None else out
+        h = hsv_array[:, :, 0]
+
+        if h.dtype != np.float32 or h.size and not (h.min() >= 0.0 and h.max() < 360.0):
+            h = (h % 360.0).astype(np.float32)
+
+        s = np.clip(hsv_array[:, :, 1], 0.0, 1.0).astype(np.float32)
+        v = np.clip(hsv_array[:, :, 2], 0.0, 1.0).astype(np.float32)
+
+        # sextant index of h, 6 for invalid h (nan or 360.0 after modulo).
+        sext = (h >= 60).view(np.uint8) + (h >= 120) + (h >= 180) + (h >= 240) + (h >= 300)
+        sext[~((h >= 0) & (h < 360))] = 6
+        ramp = h - np.multiply(sext, np.float32(60.0), dtype=np.float32)
+        ramp /= np.float32(60.0)
+        falling = (sext & 1).view(np.bool_)
+        np.subtract(np.float32(1.0), ramp, out=ramp, where=falling)
+        ramp *= np.float32(255.0)
+        np.round(ramp, out=ramp)
+        ramp = ramp.astype(np.uint8)
+        np.subtract(np.float32(1.0), s, out=s)
+        temp = np.empty(h.shape, dtype=np.float32)
+        sext_tables = cls._get_rgb_sext_tables()
+        index = np.left_shift(sext, 8, dtype=np.uint16)
+        index += ramp
+
+        for k in range(3):
+            chnl = np.take(sext_tables[k], index)
+            np.subtract(np.float32(255.0), chnl, out=temp, dtype=np.float32)
+            temp *= s
+            temp += chnl
+            temp *= v
+            np.rint(temp, out=temp)
+            np.clip(temp, 0, 255, out=temp)
+            rgb_array[:, :, k] = temp
+
+        return rgb_array
+
+    @classmethod
+    def _get_rgb_sext_tables(cls):
+        """
+        Get sextant tables of hsv2rgb_array. Hue sextant (0 ~ 6) and ramp value (0 ~ 255) to r, g and b values,
+        indexed by sextant * 256 + ramp value.
+        """
+
+        if cls._rgb_sext_tables is None:
+            roles = ((1, 2, 0, 0, 2, 1, 0), (2, 1, 1, 2, 0, 0, 0), (0, 0, 2, 1, 1, 2, 0))
+            ramp = np.arange(256, dtype=np.uint8)
+            tables = np.zeros((3, 7, 256), dtype=np.uint8)
+
+            for k in range(3):
+                for i, role in enumerate(roles[k]):
+                    tables[k, i] = ramp if role == 2 else 255 * role
+
+            cls._rgb_sext_tables = tables.reshape(3, -1)
+
+        return cls._rgb_sext_tables
 
     @classmethod
     def rgb2hec(cls, rgb):
@@ -858,6 +1045,13 @@ class Color(object):
             hex code (hec) color.
         """
 
+        if cls._memo is not None:
+            return cls._memo_call("rgb2hec", cls.fmt_rgb(rgb).tobytes(), cls._rgb2hec, rgb)
+
+        return cls._rgb2hec(rgb)
+
+    @classmethod
+    def _rgb2hec(cls, rgb):
         r, g, b = cls.fmt_rgb(rgb)
         hec_r = hex(int(r))[2:].upper()
         hec_g = hex(int(g))[2:].upper()
@@ -879,6 +1073,13 @@ class Color(object):
             rgb color.
         """
 
+        if cls._memo is not None:
+            return cls._memo_call("hec2rgb", hec, cls._hec2rgb, hec)
+
+        return cls._hec2rgb(hec)
+
+    @classmethod
+    def _hec2rgb(cls, hec):
         hec_r = hec[0:2]
         hec_g = hec[2:4]
         hec_b = hec[4:6]
@@ -887,6 +1088,75 @@ class Color(object):
         b = int("0x{}".format(hec_b), 16)
         return cls.fmt_rgb((r, g, b))
 
+    @classmethod
+    def rgb2hec_array(cls, rgb_array):
+        """
+        Translate rgb array into hex code (hec) array.
+
+        Args:
+            rgb_array (array, tuple or list): rgb array in shape (..., 3).
+
+        Returns:
+            hex code (hec) array in shape (...) and str type.
+        """
+
+        if not (isinstance(rgb_array, np.ndarray) and rgb_array.dtype == np.uint8):
+            rgb_array = cls._fmt_rgb_rows(np.asarray(rgb_array).reshape(-1, 3)).reshape(np.shape(rgb_array))
+
+        assert rgb_array.shape[-1:] == (3,), rgb_array.shape
+        hec_bytes = cls._get_hec_tables()[0][rgb_array].reshape(-1, 6)
+
+        return hec_bytes.view("S6").reshape(rgb_array.shape[:-1]).astype("U6")
+
+    @classmethod
+    def hec2rgb_array(cls, hec_array):
+        """
+        Translate hex code (hec) array into rgb array.
+
+        Args:
+            hec_array (array, tuple or list): hex code (hec) array or list in shape (...).
+
+        Returns:
+            rgb array in shape (..., 3).
+        """
+
+        hec_array = np.asarray(hec_array)
+
+        if hec_array.size == 0:
+            return np.zeros(hec_array.shape + (3,), dtype=np.uint8)
+
+        assert hec_array.dtype.kind == "U", hec_array.dtype
+
+        if hec_array.dtype.itemsize > np.dtype("U6").itemsize:
+            assert (np.char.str_len(hec_array) == 6).all(), hec_array
+            hec_array = hec_array.astype("U6")
+
+        # shorter hex codes are padded with null chars, which are invalid in char table.
+        values = cls._get_hec_tables()[1][hec_array.astype("S6").view(np.uint8)]
+
+        if (values > 15).any():
+            raise ValueError("invalid hex code in hec array.")
+
+        values = values.reshape(hec_array.shape + (3, 2))
+
+        return values[..., 0] << 4 | values[..., 1]
+
+    @classmethod
+    def _get_hec_tables(cls):
+        """
+        Get byte tables of hex code (hec). Value (0 ~ 255) to two ascii hex digits, and ascii char to hex digit value (255 for invalid chars).
+        """
+
+        if cls._hec_tables is None:
+            digits = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+            value = np.arange(256, dtype=np.uint8)
+            char_table = np.full(256, 255, dtype=np.uint8)
+            char_table[digits] = range(16)
+            char_table[np.frombuffer(b"abcdef", dtype=np.uint8)] = range(10, 16)
+            cls._hec_tables = (np.stack((digits[value >> 4], digits[value & 15]), axis=1), char_table)
+
+        return cls._hec_tables
+
     @classmethod
     def hsv2hec(cls, hsv):
         """
@@ -1024,6 +1294,208 @@ class Color(object):
         b = (1.0 - y) * 255.0
         return cls.fmt_rgb((r, g, b))
 
+    @classmethod
+    def rgb2xyz_array(cls, rgb_array):
+        """
+        Translate rgb array into xyz array (ref: http://www.easyrgb.com/en/math.php).
+
+        Args:
+            rgb_array (array): rgb array in shape (..., 3).
+
+        Returns:
+            xyz array in shape (..., 3), in scope 0 ~ 100.
+        """
+
+        rgb_array = np.asarray(rgb_array)
+
+        if rgb_array.dtype != np.uint8:
+            rgb_array = cls._fmt_rgb_rows(rgb_array)
+
+        normed_rgb = cls._get_srgb_table()[rgb_array]
+
+        return cls._dot_array(cls._rgb2xyz_matrix, normed_rgb)
+
+    @classmethod
+    def xyz2rgb_array(cls, xyz_array):
+        """
+        Translate xyz array into rgb array (ref: http://www.easyrgb.com/en/math.php).
+
+        Args:
+            xyz_array (array): xyz array in shape (..., 3), in scope 0 ~ 100.
+
+        Returns:
+            rgb array in shape (..., 3).
+        """
+
+        normed_rgb = cls._dot_array(cls._xyz2rgb_matrix, np.asarray(xyz_array, dtype=np.float64) / 100.0)
+        rgb = np.empty(normed_rgb.shape)
+        selection = normed_rgb > 0.0031308
+        rgb[selection] = 1.055 * (normed_rgb[selection] ** (1 / 2.4)) - 0.055
+        rgb[~selection] = 12.92 * normed_rgb[~selection]
+
+        return cls._fmt_rgb_rows(rgb * 255)
+
+    @classmethod
+    def xyz2lab_array(cls, xyz_array, white_ref=(95.047, 100.0, 108.883)):
+        """
+        Translate xyz array into lab array.
+
+        Args:
+            xyz_array (array): xyz array in shape (..., 3), in scope 0 ~ 100.
+            white_ref (tuple or list): xyz (Tristimulus) Reference values of a perfect reflecting diffuser. default: value of standard "D65, 2Ang".
+
+        Returns:
+            lab array in shape (..., 3).
+        """
+
+        xyz = np.asarray(xyz_array, dtype=np.float64) / np.array(white_ref, dtype=np.float64)
+        selection = xyz > 0.008856
+        xyz[selection] = xyz[selection] ** (1 / 3)
+        xyz[~selection] = (7.787 * xyz[~selection]) + (16 / 116)
+        lab = np.empty(xyz.shape, dtype=np.float32)
+        lab[..., 0] = np.clip(116 * xyz[..., 1] - 16, 0.0, 100.0)
+        lab[..., 1] = np.clip(500 * (xyz[..., 0] - xyz[..., 1]), -128.0, 128.0)
+        lab[..., 2] = np.clip(200 * (xyz[..., 1] - xyz[..., 2]), -128.0, 128.0)
+
+        return lab
+
+    @classmethod
+    def lab2xyz_array(cls, lab_array, white_ref=(95.047, 100.0, 108.883)):
+        """
+        Translate lab array into xyz array.
+
+        Args:
+            lab_array (array): lab array in shape (..., 3).
+            white_ref (tuple or list): xyz (Tristimulus) Reference values of a perfect reflecting diffuser. default: value of standard "D65, 2Ang".
+
+        Returns:
+            xyz array in shape (..., 3), in scope 0 ~ 100.
+        """
+
+        # lab is formated into float32 as fmt_lab, then calculated in float64.
+        lab = np.asarray(lab_array, dtype=np.float64)
+        l = np.clip(lab[..., 0], 0.0, 100.0).astype(np.float32).astype(np.float64)
+        a = np.clip(lab[..., 1], -128.0, 128.0).astype(np.float32).astype(np.float64)
+        b = np.clip(lab[..., 2], -128.0, 128.0).astype(np.float32).astype(np.float64)
+        normed_xyz = np.empty(lab.shape, dtype=np.float64)
+        normed_xyz[..., 1] = (l + 16) / 116
+        normed_xyz[..., 0] = a / 500 + normed_xyz[..., 1]
+        normed_xyz[..., 2] = normed_xyz[..., 1] - b / 200
+        selection = normed_xyz > 0.008856
+        normed_xyz[selection] = normed_xyz[selection] ** 3
+        normed_xyz[~selection] = (normed_xyz[~selection] - 16 / 116) / 7.787
+
+        return normed_xyz * np.array(white_ref, dtype=np.float64)
+
+    @classmethod
+    def rgb2lab_array(cls, rgb_array, white_ref=(95.047, 100.0, 108.883)):
+        """
+        Translate rgb array into lab array (ref: http://www.easyrgb.com/en/math.php).
+
+        Args:
+            rgb_array (array): rgb array in shape (..., 3).
+            white_ref (tuple or list): xyz (Tristimulus) Reference values of a perfect reflecting diffuser. default: value of standard "D65, 2Ang".
+
+        Returns:
+            lab array in shape (..., 3).
+        """
+
+        return cls.xyz2lab_array(cls.rgb2xyz_array(rgb_array), white_ref=white_ref)
+
+    @classmethod
+    def lab2rgb_array(cls, lab_array, white_ref=(95.047, 100.0, 108.883)):
+        """
+        Translate lab array into rgb array (ref: http://www.easyrgb.com/en/math.php).
+
+        Args:
+            lab_array (array): lab array in shape (..., 3).
+            white_ref (tuple or list): xyz (Tristimulus) Reference values of a perfect reflecting diffuser. default: value of standard "D65, 2Ang".
+
+        Returns:
+            rgb array in shape (..., 3).
+        """
+
+        return cls.xyz2rgb_array(cls.lab2xyz_array(lab_array, white_ref=white_ref))
+
+    @classmethod
+    def rgb2cmyk_array(cls, rgb_array):
+        """
+        Translate rgb array into cmyk array (ref: http://www.easyrgb.com/en/math.php).
+
+        Args:
+            rgb_array (array): rgb array in shape (..., 3).
+
+        Returns:
+            cmyk array in shape (..., 4).
+        """
+
+        rgb_array = np.asarray(rgb_array)
+
+        if rgb_array.dtype != np.uint8:
+            rgb_array = cls._fmt_rgb_rows(rgb_array)
+
+        cmy = 1.0 - (rgb_array / 255.0)
+        k = np.min(cmy, axis=-1, keepdims=True)
+        black = k == 1.0
+        cmyk = np.empty(rgb_array.shape[:-1] + (4,), dtype=np.float32)
+        cmyk[..., :3] = np.where(black, 0.0, (cmy - k) / np.where(black, 1.0, 1 - k))
+        cmyk[..., 3:] = k
+
+        return cmyk
+
+    @classmethod
+    def cmyk2rgb_array(cls, cmyk_array):
+        """
+        Translate cmyk array into rgb array (ref: http://www.easyrgb.com/en/math.php).
+
+        Args:
+            cmyk_array (array): cmyk array in shape (..., 4).
+
+        Returns:
+            rgb array in shape (..., 3).
+        """
+
+        # cmyk is formated into float32 as fmt_cmyk, then calculated in float64.
+        cmyk = np.clip(np.asarray(cmyk_array, dtype=np.float64), 0.0, 1.0).astype(np.float32).astype(np.float64)
+        k = cmyk[..., 3:]
+        cmy = cmyk[..., :3] * (1.0 - k) + k
+
+        return cls._fmt_rgb_rows((1.0 - cmy) * 255.0)
+
+    @classmethod
+    def _fmt_rgb_rows(cls, rgb_array):
+        """
+        Format rgb array row by row in the same way as fmt_rgb, i.e. colors in scope are truncated, others are rounded and cut off.
+        """
+
+        inside = np.all((rgb_array >= 0) & (rgb_array <= 255), axis=-1, keepdims=True)
+
+        return np.where(inside, np.trunc(rgb_array), np.clip(np.rint(rgb_array), 0, 255)).astype(np.uint8)
+
+    @classmethod
+    def _dot_array(cls, matrix, array):
+        """
+        Apply 3x3 matrix on the last axis of array, summed in the same order as matrix.dot(vector).
+        """
+
+        result = np.empty(array.shape, dtype=np.float64)
+
+        for i in range(3):
+            result[..., i] = matrix[i][0] * array[..., 0] + matrix[i][1] * array[..., 1] + matrix[i][2] * array[..., 2]
+
+        return result
+
+    @classmethod
+    def _get_srgb_table(cls):
+        """
+        Get companded rgb (0 ~ 100) of each rgb value (0 ~ 255).
+        """
+
+        if cls._srgb_table is None:
+            cls._srgb_table = np.array([((i + 0.055) / 1.055) ** 2.4 if i > 0.04045 else i / 12.92 for i in np.arange(256, dtype=np.uint8) / 255.0]) * 100.0
+
+        return cls._srgb_table
+
     @classmethod
     def sign(cls, hsv):
         """
@@ -1096,11 +1568,636 @@ class Color(object):
             else:
                 return (9, prefix)
 
+class ColorItem(Color):
+    """
+    Color proxy of an item in ColorArray. Values are read from the array until the color is modified,
+    then the proxy holds its own values like a normal Color object.
+    """
+
+    __slots__ = ("_colors", "_index")
+
+    def __init__(self, colors, index):
+        """
+        Init color proxy.
+
+        Args:
+            colors (ColorArray): color array.
+            index (int): index of color in array.
+        """
+
+        self._colors = colors
+        self._index = index
+        self._rgb = None
+        self._hsv = None
+        self._hec = None
+        self._overflow = colors.get_overflow()
+
+    @property
+    def rgb(self):
+        return Color.rgb.fget(self) if self._colors is None else self._colors.rgb[self._index]
+
+    @property
+    def hsv(self):
+        return Color.hsv.fget(self) if self._colors is None else self._colors.hsv[self._index]
+
+    @property
+    def hec(self):
+        return Color.hec.fget(self) if self._colors is None else self._colors.hec[self._index]
+
+    @property
+    def color(self):
+        return self
+
+    @rgb.setter
+    def rgb(self, item):
+        self._colors = None
+        Color.rgb.fset(self, item)
+
+    @hsv.setter
+    def hsv(self, item):
+        self._colors = None
+        Color.hsv.fset(self, item)
+
+    @hec.setter
+    def hec(self, item):
+        self._colors = None
+        Color.hec.fset(self, item)
+
+    @color.setter
+    def color(self, item):
+        color = Color(item, tp=CTP.color)
+        self._colors = None
+        self._rgb, self._hsv, self._hec = color._rgb, color._hsv, color._hec
+
+class ColorArray(object):
+    """
+    Color array object. Storing colors as struct of arrays, i.e. a contiguous n x 3 uint8 rgb array, a n x 3 float32 hsv array and a hex code (hec) list.
+    Only the given representation is stored at first, others are derived on first access with the same results as Color.
+    Arrays are read only. Indexing with int returns a ColorItem proxy, and indexing with slice or index array returns a new ColorArray.
+    """
+
+    def __init__(self, item, tp=CTP.rgb, overflow=OTP.cutoff):
+        """
+        Init ColorArray object.
+
+        Args:
+            item (array, tuple, list or ColorArray): rgb array in shape (..., 3), hsv array in shape (..., 3), hex code (hec) list, Color list or another ColorArray.
+            tp (int): type of array items, in "rgb", "hsv", "hec" and "color".
+            overflow (int): method to manipulate overflowed s and v values, in "cutoff", "revert" and "repeat".
+        """
+
+        assert isinstance(tp, int) and tp in CTP.rgcorh, tp
+        _overflow = overflow if isinstance(overflow, int) else OTP.s2n[overflow]
+        assert isinstance(_overflow, int) and _overflow in OTP.rgfull, _overflow
+        self._overflow = _overflow
+        self._rgb = None
+        self._hsv = None
+        self._hec = None
+
+        if isinstance(item, ColorArray):
+            self._rgb, self._hsv, self._hec = item._rgb, item._hsv, item._hec
+
+        elif tp == CTP.rgb:
+            rgb = np.asarray(item).reshape(-1, 3)
+            self._set_rgb(rgb if rgb.dtype == np.uint8 else Color._fmt_rgb_rows(rgb))
+
+        elif tp == CTP.hsv:
+            self._set_hsv(Color.fmt_hsv_array(np.asarray(item, dtype=np.float64).reshape(-1, 3), overflow=self._overflow))
+
+        elif tp == CTP.hec:
+            self._hec = tuple(Color.fmt_hec(hec) for hec in item)
+
+        else: # CTP.color
+            item = tuple(item)
+            self._set_rgb(np.array([color.rgb for color in item], dtype=np.uint8).reshape(-1, 3))
+            self._set_hsv(np.array([color.hsv for color in item], dtype=np.float32).reshape(-1, 3))
+            self._hec = tuple(color.hec for color in item)
+
+    def __len__(self):
+        if self._rgb is not None:
+            return self._rgb.shape[0]
+
+        if self._hsv is not None:
+            return self._hsv.shape[0]
+
+        return len(self._hec)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, (int, np.integer)):
+            if not -len(self) <= idx < len(self):
+                raise IndexError("color array index out of range")
+
+            return ColorItem(self, int(idx) % len(self))
+
+        idx = idx if isinstance(idx, slice) else np.asarray(idx)
+        rgb = None if self._rgb is None else self._rgb[idx]
+        hsv = None if self._hsv is None else self._hsv[idx]
+        hec = None
+
+        if self._hec is not None:
+            hec = self._hec[idx] if isinstance(idx, slice) else tuple(self._hec[i] for i in np.arange(len(self))[idx])
+
+        return self._create(rgb, hsv, hec, self._overflow)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield ColorItem(self, idx)
+
+    def __str__(self):
+        return "ColorArray({} colors)".format(len(self))
+
+    def __repr__(self):
+        return "ColorArray({} colors)".format(len(self))
+
+    def get_overflow(self):
+        """
+        Get the overflow method.
+        """
+
+        return self._overflow
+
+    @property
+    def rgb(self):
+        if self._rgb is None:
+            if self._hsv is not None:
+                self._set_rgb(self._hsv2rgb_rows(self._hsv))
+
+            else:
+                self._set_rgb(Color.hec2rgb_array(np.array(self._hec, dtype="U6")).reshape(-1, 3))
+
+        return self._rgb
+
+    @property
+    def hsv(self):
+        if self._hsv is None:
+            self._set_hsv(self._rgb2hsv_rows(self.rgb))
+
+        return self._hsv
+
+    @property
+    def hec(self):
+        if self._hec is None:
+            self._hec = self._rgb2hec_rows(self.rgb)
+
+        return self._hec
+
+    def tolist(self):
+        """
+        Translate into a list of independent Color objects.
+        """
+
+        colors = []
+
+        for idx in range(len(self)):
+            color = Color((0, 0, 0), tp=CTP.rgb, overflow=self._overflow)
+            color._rgb, color._hsv, color._hec = np.array(self.rgb[idx]), np.array(self.hsv[idx]), self.hec[idx]
+            colors.append(color)
+
+        return colors
+
+    def export(self):
+        return [{"rgb": rgb, "hsv": hsv, "hex_code": hec} for rgb, hsv, hec in zip(self.rgb.tolist(), self.hsv.tolist(), self.hec)]
+
+    @classmethod
+    def concat(cls, items, overflow=OTP.cutoff):
+        """
+        Concatenate ColorArray and Color objects into one ColorArray.
+        A representation is kept if any item holds it, e.g. exact hsv of colors created by hsv.
+
+        Args:
+            items (tuple or list): ColorArray or Color objects.
+            overflow (int): method to manipulate overflowed s and v values, in "cutoff", "revert" and "repeat".
+
+        Returns:
+            ColorArray.
+        """
+
+        items = [ColorArray((item,), tp=CTP.color) if isinstance(item, Color) else item for item in items]
+
+        if not items:
+            return ColorArray(np.zeros((0, 3), dtype=np.uint8), overflow=overflow)
+
+        rgb = np.concatenate([item.rgb for item in items])
+        hsv = np.concatenate([item.hsv for item in items]) if any(item._hsv is not None for item in items) else None
+        hec = tuple(hec for item in items for hec in item.hec) if any(item._hec is not None for item in items) else None
+
+        return cls._create(rgb, hsv, hec, overflow)
+
+    @classmethod
+    def _create(cls, rgb, hsv, hec, overflow):
+        colors = cls.__new__(cls)
+        colors._overflow = overflow
+        colors._rgb = None
+        colors._hsv = None
+        colors._hec = hec
+
+        if rgb is not None:
+            colors._set_rgb(rgb)
+
+        if hsv is not None:
+            colors._set_hsv(hsv)
+
+        return colors
+
+    def _set_rgb(self, rgb):
+        self._rgb = np.ascontiguousarray(rgb, dtype=np.uint8).reshape(-1, 3)
+        self._rgb.setflags(write=False)
+
+    def _set_hsv(self, hsv):
+        self._hsv = np.ascontiguousarray(hsv, dtype=np.float32).reshape(-1, 3)
+        self._hsv.setflags(write=False)
+
+    @classmethod
+    def _rgb2hsv_rows(cls, rgb):
+        """
+        Translate rgb rows into hsv rows in the same way as Color.rgb2hsv.
+        """
+
+        if Color._uint24_tables is not None:
+            return Color._uint24_tables[1][cls._rgb2uint24_rows(rgb)]
+
+        v = np.max(rgb, axis=1) / 255.0
+        black = np.abs(v - 0) < 1E-5
+        color = rgb / np.where(black, 1.0, v)[:, None]
+        color[black] = (255, 0, 0)
+        s = 1 - np.min(color, axis=1) / 255.0
+        gray = np.abs(s - 0) < 1E-5
+        color = np.rint((color - (255 * (1 - s))[:, None]) / np.where(gray, 1.0, s)[:, None]).astype(np.uint8)
+        color[gray] = (255, 0, 0)
+        c_r, c_g, c_b = color[:, 0], color[:, 1], color[:, 2]
+        conds = (
+            (c_r == 255) & (c_b == 0),
+            c_r == 255,
+            (c_g == 255) & (c_r == 0),
+            c_g == 255,
+            c_g == 0,
+        )
+        values = (c_g / 255 * 60, 360 - c_b / 255 * 60, 120 + c_b / 255 * 60, 120 - c_r / 255 * 60, 240 + c_r / 255 * 60)
+        h = np.select(conds, values, 240 - c_g / 255 * 60)
+
+        return Color.fmt_hsv_array(np.stack((h, s, v), axis=1))
+
+    @classmethod
+    def _hsv2rgb_rows(cls, hsv):
+        """
+        Translate hsv rows (formated) into rgb rows in the same way as Color.hsv2rgb.
+        """
+
+        h, s, v = (hsv[:, i].astype(np.float64) for i in range(3))
+        conds = ((h >= 0) & (h < 60), (h >= 60) & (h < 120), (h >= 120) & (h < 180), (h >= 180) & (h < 240), (h >= 240) & (h < 300))
+        ramps = (np.round(h / 60 * 255), np.round((1 - (h - 60) / 60) * 255), np.round((h - 120) / 60 * 255), np.round((1 - (h - 180) / 60) * 255), np.round((h - 240) / 60 * 255))
+        ramp = np.select(conds, ramps, np.round((1 - (h - 300) / 60) * 255))
+        sext = np.select(conds, range(5), 5)
+        color = np.empty(hsv.shape, dtype=np.float64)
+
+        for k, roles in enumerate(((1, 2, 0, 0, 2, 1), (2, 1, 1, 2, 0, 0), (0, 0, 2, 1, 1, 2))):
+            roles = np.array(roles)[sext]
+            color[:, k] = np.where(roles == 2, ramp, roles * 255.0)
+
+        color = color + (color * -1 + 255) * (1 - s)[:, None]
+        color = color * v[:, None]
+
+        return Color._fmt_rgb_rows(color)
+
+    @classmethod
+    def _rgb2hec_rows(cls, rgb):
+        """
+        Translate rgb rows into hex code (hec) list.
+        """
+
+        if Color._uint24_tables is not None:
+            return tuple(Color._uint24_tables[0][cls._rgb2uint24_rows(rgb)].astype("U6").tolist())
+
+        return tuple(Color.rgb2hec_array(rgb).tolist())
+
+    @classmethod
+    def _rgb2uint24_rows(cls, rgb):
+        """
+        Translate rgb rows into uint24 indexes (r << 16 | g << 8 | b).
+        """
+
+        rgb = rgb.astype(np.uint32)
+
+        return rgb[:, 0] << 16 | rgb[:, 1] << 8 | rgb[:, 2]
+
 class TestColor(unittest.TestCase):
     """
     Test Color object.
     """
 
+    @classmethod
+    def array_rgb2hsv(cls, rgb_array):
+        colors = Color.fmt_rgb_array(rgb_array).astype(np.float32)
+        v = np.max(colors, axis=2) / 255.0
+        v[np.where(v < 1E-5)] = 1E-12
+        colors[:, :, 0] = colors[:, :, 0] / v
+        colors[:, :, 1] = colors[:, :, 1] / v
+        colors[:, :, 2] = colors[:, :, 2] / v
+        colors[np.where(v < 1E-5)] = np.array((255, 0, 0))
+        v[np.where(v < 1E-5)] = 0
+        s = 1 - np.min(colors, axis=2) / 255.0
+        s[np.where(s < 1E-5)] = 1E-12
+        colors[:, :, 0] = (colors[:, :, 0] - 255 * (1 - s)) / s
+        colors[:, :, 1] = (colors[:, :, 1] - 255 * (1 - s)) / s
+        colors[:, :, 2] = (colors[:, :, 2] - 255 * (1 - s)) / s
+        colors[np.where(s < 1E-5)] = np.array((255, 0, 0))
+        colors = np.rint(colors).astype(np.uint8)
+        s[np.where(s < 1E-5)] = 0
+        h = np.zeros(v.shape, dtype=np.float32)
+        pos = np.where((colors[:, :, 2] == 255) & (colors[:, :, 0] == 0))
+        h[pos] = 240 - colors[pos][:, 1] / 255 * 60
+        pos = np.where((colors[:, :, 2] == 255) & (colors[:, :, 1] == 0))
+        h[pos] = 240 + colors[pos][:, 0] / 255 * 60
+        pos = np.where((colors[:, :, 1] == 255) & (colors[:, :, 2] == 0))
+        h[pos] = 120 - colors[pos][:, 0] / 255 * 60
+        pos = np.where((colors[:, :, 1] == 255) & (colors[:, :, 0] == 0))
+        h[pos] = 120 + colors[pos][:, 2] / 255 * 60
+        pos = np.where((colors[:, :, 0] == 255) & (colors[:, :, 1] == 0))
+        h[pos] = 360 - colors[pos][:, 2] / 255 * 60
+        pos = np.where((colors[:, :, 0] == 255) & (colors[:, :, 2] == 0))
+        h[pos] = colors[pos][:, 1] / 255 * 60
+        return Color.fmt_hsv_array(np.stack((h, s, v), axis=2))
+
+    @classmethod
+    def array_hsv2rgb(cls, hsv_array):
+        colors = Color.fmt_hsv_array(hsv_array)
+        r = np.zeros(colors.shape[:2], dtype=np.uint8)
+        g = np.zeros(colors.shape[:2], dtype=np.uint8)
+        b = np.zeros(colors.shape[:2], dtype=np.uint8)
+        pos = np.where((colors[:, :, 0] >= 0) & (colors[:, :, 0] < 60))
+        r[pos] = 255
+        g[pos] = np.round(colors[pos][:, 0] / 60 * 255)
+        pos = np.where((colors[:, :, 0] >= 60) & (colors[:, :, 0] < 120))
+        r[pos] = np.round((1 - (colors[pos][:, 0] - 60) / 60) * 255)
+        g[pos] = 255
+        pos = np.where((colors[:, :, 0] >= 120) & (colors[:, :, 0] < 180))
+        g[pos] = 255
+        b[pos] = np.round((colors[pos][:, 0] - 120) / 60 * 255)
+        pos = np.where((colors[:, :, 0] >= 180) & (colors[:, :, 0] < 240))
+        g[pos] = np.round((1 - (colors[pos][:, 0] - 180) / 60) * 255)
+        b[pos] = 255
+        pos = np.where((colors[:, :, 0] >= 240) & (colors[:, :, 0] < 300))
+        r[pos] = np.round((colors[pos][:, 0] - 240) / 60 * 255)
+        b[pos] = 255
+        pos = np.where((colors[:, :, 0] >= 300) & (colors[:, :, 0] < 360))
+        r[pos] = 255
+        b[pos] = np.round((1 - (colors[pos][:, 0] - 300) / 60) * 255)
+        r = r + (r * -1 + 255) * (1 - colors[:, :, 1])
+        g = g + (g * -1 + 255) * (1 - colors[:, :, 1])
+        b = b + (b * -1 + 255) * (1 - colors[:, :, 1])
+        r = r * colors[:, :, 2]
+        g = g * colors[:, :, 2]
+        b = b * colors[:, :, 2]
+        return Color.fmt_rgb_array(np.stack((r, g, b), axis=2))
+
+    def test_translate_array(self):
+        rs = np.random.RandomState(0)
+        rgb_array = rs.randint(0, 256, (64, 64, 3)).astype(np.uint8)
+        rgb_array[0, :16] = np.arange(0, 256, 16)[:, None]
+        rgb_array[1, :6] = ((0, 0, 0), (255, 255, 255), (255, 0, 0), (0, 255, 255), (1, 0, 0), (254, 255, 255))
+        hsv_array = Color.rgb2hsv_array(rgb_array)
+        self.assertEqual(hsv_array.dtype, np.float32)
+        self.assertTrue(np.array_equal(hsv_array, self.array_rgb2hsv(rgb_array)))
+        self.assertTrue(np.array_equal(Color.rgb2hsv_array(rgb_array.astype(np.float64) + 0.2), self.array_rgb2hsv(rgb_array.astype(np.float64) + 0.2)))
+        out = np.zeros((64, 64, 3), dtype=np.float32)
+        self.assertIs(Color.rgb2hsv_array(rgb_array, out=out), out)
+        self.assertTrue(np.array_equal(out, hsv_array))
+        self.assertEqual(Color.rgb2hsv_array(rgb_array, dtype=np.float64).dtype, np.float64)
+
+        hsv_array = np.stack((rs.uniform(-400, 800, (64, 64)), rs.uniform(-0.2, 1.2, (64, 64)), rs.uniform(-0.2, 1.2, (64, 64))), axis=2)
+        hsv_array[0, :7, 0] = np.arange(0, 361, 60)
+        hsv_array[1, :7, 0] = np.arange(0, 361, 60) - 1E-5
+        hsv_array[2, :, 0] = -1E-9
+
+        for dtype in (np.float32, np.float64):
+            data = hsv_array.astype(dtype)
+            rgb_array = Color.hsv2rgb_array(data)
+            self.assertEqual(rgb_array.dtype, np.uint8)
+            self.assertTrue(np.array_equal(data, hsv_array.astype(dtype)))
+            self.assertTrue(np.array_equal(rgb_array, self.array_hsv2rgb(data.copy())))
+            out = np.zeros((64, 64, 3), dtype=np.uint8)
+            self.assertIs(Color.hsv2rgb_array(data, out=out), out)
+            self.assertTrue(np.array_equal(out, rgb_array))
+
+    def test_translate_lab_cmyk_array(self):
+        rs = np.random.RandomState(0)
+        rgb_array = rs.randint(0, 256, (500, 3)).astype(np.uint8)
+        rgb_array[:6] = ((0, 0, 0), (255, 255, 255), (255, 0, 0), (0, 255, 0), (0, 0, 255), (1, 1, 1))
+
+        for white_ref in ((95.047, 100.0, 108.883), (109.850, 100.000, 35.585)):
+            lab_array = Color.rgb2lab_array(rgb_array, white_ref=white_ref)
+            self.assertEqual(lab_array.dtype, np.float32)
+            self.assertTrue(np.array_equal(lab_array, [Color.rgb2lab(rgb, white_ref=white_ref) for rgb in rgb_array]))
+            self.assertTrue(np.array_equal(Color.lab2rgb_array(lab_array, white_ref=white_ref), [Color.lab2rgb(lab, white_ref=white_ref) for lab in lab_array]))
+            lab_array = np.stack((rs.uniform(-10, 110, 500), rs.uniform(-150, 150, 500), rs.uniform(-150, 150, 500)), axis=1)
+            self.assertTrue(np.array_equal(Color.lab2rgb_array(lab_array, white_ref=white_ref), [Color.lab2rgb(lab, white_ref=white_ref) for lab in lab_array]))
+
+        cmyk_array = Color.rgb2cmyk_array(rgb_array)
+        self.assertTrue(np.array_equal(cmyk_array, [Color.rgb2cmyk(rgb) for rgb in rgb_array]))
+        self.assertTrue(np.array_equal(Color.cmyk2rgb_array(cmyk_array), [Color.cmyk2rgb(cmyk) for cmyk in cmyk_array]))
+        cmyk_array = rs.uniform(-0.2, 1.2, (500, 4))
+        self.assertTrue(np.array_equal(Color.cmyk2rgb_array(cmyk_array), [Color.cmyk2rgb(cmyk) for cmyk in cmyk_array]))
+        self.assertEqual(Color.rgb2lab_array(rgb_array.reshape(20, 25, 3)).shape, (20, 25, 3))
+        self.assertEqual(Color.rgb2cmyk_array(rgb_array.reshape(20, 25, 3)).shape, (20, 25, 4))
+
+    def test_color_lazy(self):
+        color = Color((200, 0.5, 0.5), tp=CTP.hsv)
+        self.assertIsNone(color._rgb)
+        self.assertIsNone(color._hec)
+        self.assertEqual(color.hec, Color.hsv2hec((200, 0.5, 0.5)))
+        self.assertTrue(np.array_equal(color.rgb, Color.hsv2rgb((200, 0.5, 0.5))))
+        color.r = 255
+        self.assertIsNone(color._hsv)
+        self.assertEqual(color.hec, Color.rgb2hec(color.rgb))
+        self.assertTrue(np.array_equal(color.hsv, Color.rgb2hsv(color.rgb)))
+        color.hec = "0C2238"
+        self.assertEqual(tuple(color.rgb), (12, 34, 56))
+        self.assertTrue(np.array_equal(color.hsv, Color.hec2hsv("0C2238")))
+        self.assertEqual(Color(color).export(), color.export())
+        self.assertRaises(AttributeError, setattr, color, "name", "")
+
+    def test_color_benchmark(self):
+        hsv_list = [tuple(hsv) for hsv in np.random.RandomState(0).uniform((0, 0, 0), (360, 1, 1), (20000, 3))]
+
+        start = time.perf_counter()
+
+        for hsv in hsv_list:
+            color = Color(hsv, tp=CTP.hsv)
+            color.rgb, color.hsv, color.hec
+
+        cost_before = time.perf_counter() - start
+        start = time.perf_counter()
+
+        for hsv in hsv_list:
+            Color(hsv, tp=CTP.hsv).rgb
+
+        cost_after = time.perf_counter() - start
+        color = Color(hsv_list[0], tp=CTP.hsv)
+        start = time.perf_counter()
+
+        for hsv in hsv_list:
+            color.h, color.s, color.v
+
+        cost_access = time.perf_counter() - start
+        print("color of {} colors: construct with all values {:.4f} s, construct with rgb only {:.4f} s, access hsv {:.4f} s.".format(len(hsv_list), cost_before, cost_after, cost_access))
+
+    def test_translate_hec_array(self):
+        rs = np.random.RandomState(0)
+        rgb_array = rs.randint(0, 256, (2000, 3)).astype(np.uint8)
+        hec_array = Color.rgb2hec_array(rgb_array)
+        self.assertEqual(hec_array.tolist(), [Color.rgb2hec(rgb) for rgb in rgb_array])
+        self.assertTrue(np.array_equal(Color.hec2rgb_array(hec_array.tolist()), rgb_array))
+        self.assertTrue(np.array_equal(Color.hec2rgb_array(np.char.lower(hec_array)), rgb_array))
+        self.assertEqual(Color.rgb2hec_array(rgb_array.reshape(20, 100, 3)).shape, (20, 100))
+        self.assertEqual(Color.hec2rgb_array([]).shape, (0, 3))
+        float_array = rs.uniform(-20, 280, (500, 3))
+        self.assertEqual(Color.rgb2hec_array(float_array).tolist(), [Color.rgb2hec(rgb) for rgb in float_array])
+        self.assertRaises(ValueError, Color.hec2rgb_array, ["12345G"])
+        self.assertRaises(ValueError, Color.hec2rgb_array, ["12345"])
+        self.assertRaises(AssertionError, Color.hec2rgb_array, ["1234567"])
+        text = "#12abcd, 1234 FFEEDDCC; 0x00ff00\n" * 3
+        self.assertEqual(Color.findall_hec_lst(text), ["12ABCD", "FFEEDD", "00FF00"] * 3)
+
+    def test_fmt_hsv_array(self):
+        rs = np.random.RandomState(0)
+        hsv_array = rs.uniform((-400, -2.5, -2.5), (800, 3.5, 3.5), (2000, 3))
+        hsv_array[:500] = rs.uniform((0, 0, 0), (360, 1, 1), (500, 3))
+        backup = hsv_array.copy()
+
+        for overflow in OTP.rgfull:
+            fmt_array = Color.fmt_hsv_array(hsv_array, overflow=overflow)
+            self.assertTrue(np.array_equal(hsv_array, backup))
+            self.assertEqual(fmt_array.dtype, np.float32)
+            self.assertTrue(np.array_equal(fmt_array, [Color.fmt_hsv(hsv, overflow=overflow) for hsv in hsv_array]))
+            float_array = hsv_array.astype(np.float32)
+            self.assertTrue(np.array_equal(Color.fmt_hsv_array(float_array, overflow=overflow), [Color.fmt_hsv(hsv, overflow=overflow) for hsv in float_array]))
+            out =np.empty((20, 100, 3), dtype=np.float32)
+            Color.fmt_hsv_array(hsv_array.reshape(20, 100, 3), overflow=overflow, out=out)
+            self.assertTrue(np.array_equal(out.reshape(-1, 3), fmt_array))
+
+    def test_memo(self):
+        rs = np.random.RandomState(0)
+        rgb_list = [tuple(rgb) for rgb in rs.randint(0, 256, (200, 3))] * 3
+        hsv_list = [tuple(hsv) for hsv in rs.uniform((-30, -0.2, -0.2), (390, 1.2, 1.2), (200, 3))] * 3
+        results = []
+
+        for max_len in (0, 128):
+            Color.set_memo(max_len)
+
+            try:
+                results.append((
+                    [Color.rgb2hsv(rgb) for rgb in rgb_list],
+                    [Color.hsv2rgb(hsv) for hsv in hsv_list],
+                    [Color.rgb2hec(rgb) for rgb in rgb_list],
+                    [Color.hec2rgb(Color.rgb2hec(rgb)) for rgb in rgb_list],
+                ))
+                stats = Color.get_memo_stats()
+
+            finally:
+                Color.set_memo(0)
+
+        self.assertEqual(stats["rgb2hec"]["hits"] + stats["rgb2hec"]["misses"], 1200)
+        self.assertEqual(stats["hsv2rgb"]["len"], 128)
+
+        for before, after in zip(*results):
+            for x, y in zip(before, after):
+                self.assertTrue(np.array_equal(x, y))
+                self.assertEqual(type(x), type(y))
+
+        Color.set_memo(16)
+
+        try:
+            rgb = Color.hsv2rgb((10, 0.5, 0.5))
+            pr_rgb = rgb.copy()
+            rgb[0] = 0
+            self.assertTrue(np.array_equal(Color.hsv2rgb((10, 0.5, 0.5)), pr_rgb))
+            self.assertEqual(Color.get_memo_stats()["hsv2rgb"]["hits"], 1)
+
+        finally:
+            Color.set_memo(0)
+
+        self.assertEqual(Color.get_memo_stats(), {})
+
+    def test_uint24_tables(self):
+        rgb_array = np.random.RandomState(0).randint(0, 256, (5000, 3)).astype(np.uint8)
+        rgb_array[:3] = ((0, 0, 0), (255, 255, 255), (12, 34, 56))
+        colors = ColorArray(rgb_array, tp=CTP.rgb)
+        Color.set_uint24_tables(True)
+
+        try:
+            tab_colors = ColorArray(rgb_array, tp=CTP.rgb)
+            self.assertTrue(np.array_equal(tab_colors.hsv, colors.hsv))
+            self.assertEqual(tab_colors.hec, colors.hec)
+
+        finally:
+            Color.set_uint24_tables(False)
+
+    def test_color_array(self):
+        rs = np.random.RandomState(0)
+        rgb_array = rs.randint(0, 256, (500, 3)).astype(np.uint8)
+        colors = ColorArray(rgb_array, tp=CTP.rgb)
+        self.assertEqual(len(colors), 500)
+        self.assertTrue(np.array_equal(colors.rgb, rgb_array))
+        self.assertTrue(np.array_equal(colors.hsv, [Color(rgb, tp=CTP.rgb).hsv for rgb in rgb_array]))
+        self.assertEqual(colors.hec, tuple(Color(rgb, tp=CTP.rgb).hec for rgb in rgb_array))
+
+        for overflow in OTP.rgfull:
+            hsv_array = np.stack((rs.uniform(-400, 800, 500), rs.uniform(-2.5, 2.5, 500), rs.uniform(-2.5, 2.5, 500)), axis=1)
+            hsv_array[:250] = colors.hsv[:250]
+            hsv_colors = ColorArray(hsv_array, tp=CTP.hsv, overflow=overflow)
+            pr_colors = [Color(hsv, tp=CTP.hsv, overflow=overflow) for hsv in hsv_array]
+            self.assertTrue(np.array_equal(hsv_colors.hsv, [color.hsv for color in pr_colors]))
+            self.assertTrue(np.array_equal(hsv_colors.rgb, [color.rgb for color in pr_colors]))
+            self.assertEqual(hsv_colors.hec, tuple(color.hec for color in pr_colors))
+
+        hec_colors = ColorArray(colors.hec, tp=CTP.hec)
+        self.assertTrue(np.array_equal(hec_colors.rgb, rgb_array))
+        self.assertTrue(np.array_equal(hec_colors[10:20].hsv, colors.hsv[10:20]))
+        self.assertEqual(hec_colors[[3, 1, 4]].hec, (colors.hec[3], colors.hec[1], colors.hec[4]))
+
+        color = colors[-1]
+        self.assertIsInstance(color, Color)
+        self.assertEqual(color.hec, colors.hec[-1])
+        color.h = color.h + 180
+        self.assertEqual(colors.hec[-1], Color(rgb_array[-1], tp=CTP.rgb).hec)
+        self.assertEqual(color.hec, Color(colors.hsv[-1] + (180, 0, 0), tp=CTP.hsv).hec)
+        self.assertRaises(IndexError, colors.__getitem__, 500)
+        self.assertRaises(ValueError, colors.rgb.__setitem__, 0, (0, 0, 0))
+
+        pr_colors = ColorArray.concat([Color((12, 34, 56), tp=CTP.rgb), colors[:3], Color((200, 0.5, 0.5), tp=CTP.hsv)])
+        self.assertEqual(len(pr_colors), 5)
+        self.assertEqual(pr_colors.hec[:4], ("0C2238",) + colors.hec[:3])
+        self.assertTrue(np.array_equal(pr_colors.hsv[4], (200, 0.5, 0.5)))
+        self.assertEqual([c.hec for c in pr_colors.tolist()], list(pr_colors.hec))
+        self.assertEqual(pr_colors.export()[0], Color((12, 34, 56), tp=CTP.rgb).export())
+        self.assertEqual(len(ColorArray.concat([])), 0)
+
+    def test_color_array_benchmark(self):
+        rgb_array = np.random.RandomState(0).randint(0, 256, (30000, 3)).astype(np.uint8)
+
+        start = time.perf_counter()
+        hecs = [Color(rgb, tp=CTP.rgb).hec for rgb in rgb_array]
+        cost_before = time.perf_counter() - start
+        start = time.perf_counter()
+        colors = ColorArray(rgb_array, tp=CTP.rgb)
+        colors.hsv
+        self.assertEqual(list(colors.hec), hecs)
+        cost_after = time.perf_counter() - start
+        print("color array of {} colors: before {:.4f} s, after {:.4f} s.".format(len(hecs), cost_before, cost_after))
+
+    def test_translate_array_benchmark(self):
+        rgb_array = np.random.RandomState(0).randint(0, 256, (1000, 1000, 3)).astype(np.uint8)
+        hsv_array = Color.rgb2hsv_array(rgb_array)
+
+        for name, rgb2hsv, hsv2rgb in (("before", self.array_rgb2hsv, self.array_hsv2rgb), ("after", Color.rgb2hsv_array, Color.hsv2rgb_array)):
+            start = time.perf_counter()
+            rgb2hsv(rgb_array)
+            cost_hsv = time.perf_counter() - start
+            start = time.perf_counter()
+            hsv2rgb(hsv_array.copy())
+            cost_rgb = time.perf_counter() - start
+            print("translate array ({}): rgb2hsv {:.2f} MP/s, hsv2rgb {:.2f} MP/s.".format(name, 1.0 / cost_hsv, 1.0 / cost_rgb))
+
     def test_translate(self):
         pr_color = Color((0, 0, 0), tp=CTP.rgb)
 
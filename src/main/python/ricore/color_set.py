@@ -14,7 +14,9 @@ Copyright (c) 2019-2021 by Eigenmiao. All Rights Reserved.
 """
 
 import random
-from ricore.color import Color, CTP
+import unittest
+import numpy as np
+from ricore.color import Color, CTP, OTP
 
 
 class ColorSet(object):
@@ -191,6 +193,51 @@ class ColorSet(object):
         assert harmony_rule in methods, harmony_rule
         methods[harmony_rule]()
 
+    def create_batch(self, harmony_rule, n, seed=None, tp=CTP.hsv):
+        """
+        Create n color sets at once under a selected harmony rule, in the same way as initialize and create.
+        The color set itself is not changed.
+
+        Args:
+            harmony_rule (str): rule, in "analogous", "monochromatic", "triad", "tetrad", "pentad", "complementary", "shades" and "custom".
+            n (int): number of color sets.
+            seed (int or None): random seed for reproducible color sets. None for a random seed.
+            tp (int): type of returned array, CTP.hsv or CTP.rgb.
+
+        Returns:
+            n x 5 x 3 hsv (float32) or rgb (uint8) array.
+        """
+
+        methods = {
+            "analogous": self._analogous_create_batch,
+            "monochromatic": self._monochromatic_create_batch,
+            "triad": lambda hsv_sets, rand: self._rotate_create_batch(hsv_sets, (0.0, -120.0, -120.0, 120.0, 120.0)),
+            "tetrad": lambda hsv_sets, rand: self._rotate_create_batch(hsv_sets, (0.0, -90.0, -180.0, 90.0, 180.0)),
+            "pentad": lambda hsv_sets, rand: self._rotate_create_batch(hsv_sets, (0.0, -72.0, -144.0, 72.0, 144.0)),
+            "complementary": self._complementary_create_batch,
+            "shades": self._shades_create_batch,
+            "custom": lambda hsv_sets, rand: None,
+        }
+
+        assert harmony_rule in methods, harmony_rule
+        assert tp in (CTP.hsv, CTP.rgb), tp
+        rand = np.random.RandomState(seed)
+        ranges = np.array((self._h_range, self._s_range, self._v_range))
+        hsv_sets = ranges[:, 0] + (ranges[:, 1] - ranges[:, 0]) * rand.random_sample((int(n), 5, 3))
+
+        if self.dep_wtp:
+            hsv_sets[..., 0] = Color.spc_ryb2rgb_h_array(hsv_sets[..., 0], dtype=np.float64)
+
+        overflow = self.get_overflow()
+        hsv_sets = Color.fmt_hsv_array(hsv_sets, overflow=overflow).astype(np.float64)
+        methods[harmony_rule](hsv_sets, rand)
+        hsv_sets = Color.fmt_hsv_array(hsv_sets, overflow=overflow)
+
+        if tp == CTP.rgb:
+            return Color.hsv2rgb_array(hsv_sets)
+
+        return hsv_sets
+
     def modify(self, harmony_rule, idx, color, do_sync=True):
         """
         Modify color set under a selected harmony rule.
@@ -220,6 +267,67 @@ class ColorSet(object):
             assert harmony_rule in methods, harmony_rule
             methods[harmony_rule](idx, color)
 
+    def modify_batch(self, harmony_rule, hsv_sets, idx, hsv_colors, do_sync=True, tp=CTP.hsv):
+        """
+        Modify color sets at once under a selected harmony rule, in the same way as modify.
+        Each edit is applied to its own color set and the color set itself is not changed.
+        Chained edits could be applied by calling modify_batch with returned color sets again.
+
+        Args:
+            harmony_rule (str): rule, in "analogous", "monochromatic", "triad", "tetrad", "pentad", "complementary", "shades" and "custom".
+            hsv_sets (array): hsv color sets in shape (..., 5, 3), such as a single color set in shape (5, 3) for many edits.
+            idx (int or array): indexes in range 0 ~ 4 which indicate the color in each color set for modify.
+            hsv_colors (array): replace the selected colors with these hsv colors in shape (..., 3).
+            do_sync (bool): if run synchronization.
+            tp (int): type of returned array, CTP.hsv or CTP.rgb.
+
+        Returns:
+            hsv (float32) or rgb (uint8) color sets in shape (..., 5, 3), broadcasted from hsv_sets, idx and hsv_colors.
+        """
+
+        if do_sync and self.synchronization:
+            method = self._sync_modify_batch
+
+        else:
+            methods = {
+                "analogous": self._analogous_modify_batch,
+                "monochromatic": self._monochromatic_modify_batch,
+                "triad": self._multiple_modify_batch,
+                "tetrad": self._tetrad_modify_batch,
+                "pentad": self._multiple_modify_batch,
+                "complementary": self._multiple_modify_batch,
+                "shades": self._shades_modify_batch,
+                "custom": self._custom_modify_batch,
+            }
+
+            assert harmony_rule in methods, harmony_rule
+            method = methods[harmony_rule]
+
+        assert tp in (CTP.hsv, CTP.rgb), tp
+        hsv_sets = np.asarray(hsv_sets)
+        hsv_colors = np.asarray(hsv_colors)
+        idx = np.asarray(idx)
+        assert hsv_sets.shape[-2:] == (5, 3) and hsv_colors.shape[-1:] == (3,), (hsv_sets.shape, hsv_colors.shape)
+        assert idx.dtype.kind in "iu" and np.all((idx >= 0) & (idx < 5)), idx
+        shape = np.broadcast_shapes(hsv_sets.shape[:-2], idx.shape, hsv_colors.shape[:-1])
+        overflow = self.get_overflow()
+        color_sets = Color.fmt_hsv_array(np.broadcast_to(hsv_sets, shape + (5, 3)), overflow=overflow).reshape(-1, 5, 3)
+        pr_colors = Color.fmt_hsv_array(np.broadcast_to(hsv_colors, shape + (3,)), overflow=overflow).reshape(-1, 3)
+        idx = np.broadcast_to(idx, shape).reshape(-1)
+
+        for i in range(5):
+            selected = idx == i
+
+            if selected.any():
+                sub_sets = color_sets[selected]
+                method(sub_sets, i, pr_colors[selected])
+                color_sets[selected] = sub_sets
+
+        if tp == CTP.rgb:
+            return Color.hsv2rgb_array(color_sets).reshape(shape + (5, 3))
+
+        return color_sets.reshape(shape + (5, 3))
+
     def _rotate(self, delta_h, delta_s, delta_v):
         """
         Rotate color set by delta values.
@@ -230,15 +338,46 @@ class ColorSet(object):
             delta_v (int or float): shift value for v.
         """
 
+        hsv_set = self.rotate_array(np.array([color.hsv for color in self._color_set]), delta_h, delta_s, delta_v, dep_wtp=self.dep_wtp)
+
+        # each color keeps its own overflow method.
         for idx in range(5):
-            if self.dep_wtp:
-                self._color_set[idx].h = Color.spc_ryb2rgb_h(Color.spc_rgb2ryb_h(self._color_set[idx].h) + delta_h)
+            self._color_set[idx].hsv = hsv_set[idx]
 
-            else:
-                self._color_set[idx].h = self._color_set[idx].h + delta_h
+    @classmethod
+    def rotate_array(cls, hsv_array, delta_h, delta_s, delta_v, dep_wtp=False, overflow=None):
+        """
+        Class method. Rotate hsv colors in array by delta values, e.g. a n x 5 x 3 array of color sets.
+        Values are shifted in the same data types as shifting h, s and v of a Color by the delta values.
+
+        Args:
+            hsv_array (array): hsv colors in shape (..., 3).
+            delta_h (int, float or array): shift value for h, broadcastable with hsv_array[..., 0].
+            delta_s (int, float or array): shift value for s, broadcastable with hsv_array[..., 1].
+            delta_v (int, float or array): shift value for v, broadcastable with hsv_array[..., 2].
+            dep_wtp (bool or int): if is ryb system.
+            overflow (int, str or None): method to format rotated colors, in "cutoff", "revert" and "repeat". None for unformated values.
+
+        Returns:
+            rotated hsv array.
+        """
+
+        hsv_array = np.asarray(hsv_array)
+        hsv_array = hsv_array if hsv_array.dtype.kind == "f" else hsv_array.astype(np.float64)
+        shift = lambda values, delta: values.astype((values.dtype.type(0) + delta).dtype) + delta
+
+        if dep_wtp:
+            h = Color.spc_ryb2rgb_h_array(Color.spc_rgb2ryb_h_array(hsv_array[..., 0], dtype=np.float64) + delta_h, dtype=np.float64)
+
+        else:
+            h = shift(hsv_array[..., 0], delta_h)
+
+        rotated = np.stack(np.broadcast_arrays(h, shift(hsv_array[..., 1], delta_s), shift(hsv_array[..., 2], delta_v)), axis=-1)
 
-            self._color_set[idx].s = self._color_set[idx].s + delta_s
-            self._color_set[idx].v = self._color_set[idx].v + delta_v
+        if overflow is None:
+            return rotated
+
+        return Color.fmt_hsv_array(rotated, overflow=overflow if isinstance(overflow, int) else OTP.s2n[overflow])
 
     def _analogous_create(self):
         """
@@ -266,6 +405,48 @@ class ColorSet(object):
             self._color_set[3].h = self._color_set[0].h + angle
             self._color_set[4].h = self._color_set[0].h + angle * 2
 
+    def _rotate_create_batch(self, hsv_sets, angles):
+        # hue of the first color is kept and others are rotated from it.
+        hsv_sets[:, 1:, 0] = self.rotate_array(hsv_sets[:, :1], np.asarray(angles)[..., 1:], 0.0, 0.0, dep_wtp=self.dep_wtp)[..., 0]
+
+    def _vary_sv_batch(self, hsv_sets, rand):
+        # same random shifts of s and v as in _monochromatic_create.
+        urand, lrand = rand.random_sample((2, 2, len(hsv_sets)))
+        sign = np.where(hsv_sets[:, 0, 1:] < 0.5, 1.0, -1.0).T
+        upper = hsv_sets[:, 0, 1:].T + sign * (0.2 + 0.25 * urand)
+        lower = hsv_sets[:, 0, 1:].T + sign * 0.15 * lrand
+        hsv_sets[:, 1:, 1] = np.stack((upper[0], upper[0], lower[0], lower[0]), axis=1)
+        hsv_sets[:, 1:, 2] = np.stack((upper[1], lower[1], upper[1], lower[1]), axis=1)
+
+    def _analogous_create_batch(self, hsv_sets, rand):
+        if self.dep_wtp:
+            ryb_h = Color.spc_rgb2ryb_h_array(hsv_sets[:, (1, 3), 0], dtype=np.float64)
+            angle = (ryb_h[:, 1] - ryb_h[:, 0]) / 2
+
+        else:
+            angle = (hsv_sets[:, 3, 0] - hsv_sets[:, 1, 0]) / 2
+
+        over = np.abs(angle) > 30.0
+
+        while over.any():
+            angle[over] = angle[over] / 1.5
+            over = np.abs(angle) > 30.0
+
+        self._rotate_create_batch(hsv_sets, angle[:, np.newaxis] * np.array((0.0, -1.0, -2.0, 1.0, 2.0)))
+
+    def _monochromatic_create_batch(self, hsv_sets, rand):
+        hsv_sets[:, 1:, 0] = hsv_sets[:, :1, 0]
+        self._vary_sv_batch(hsv_sets, rand)
+
+    def _complementary_create_batch(self, hsv_sets, rand):
+        self._rotate_create_batch(hsv_sets, (0.0, 0.0, 180.0, 0.0, 180.0))
+        hsv_sets[:, (1, 3), 0] = hsv_sets[:, :1, 0]
+        self._vary_sv_batch(hsv_sets, rand)
+
+    def _shades_create_batch(self, hsv_sets, rand):
+        hsv_sets[:, 1:] = hsv_sets[:, :1]
+        hsv_sets[:, 1:, 2] = (0.15, 0.40, 0.65, 0.90)
+
     def _analogous_modify(self, idx, pr_color):
         """
         Modify color set in analogous rule.
@@ -684,3 +865,201 @@ class ColorSet(object):
             delta_v = 0
 
         self._rotate(delta_h, delta_s, delta_v)
+
+    # array forms of modify methods. color sets in shape (n, 5, 3) are modified in place
+    # with the same steps and data types as setting h, s and v of each Color.
+
+    def _set_batch(self, color_sets, cols, ch, values):
+        hsv = color_sets[:, cols].astype(np.float64)
+        hsv[..., ch] = values
+        color_sets[:, cols] = Color.fmt_hsv_array(hsv, overflow=self.get_overflow())
+
+    def _rotate_batch(self, color_sets, delta_h, delta_s, delta_v):
+        expand = lambda delta: delta[:, np.newaxis] if isinstance(delta, np.ndarray) else delta
+        color_sets[:] = self.rotate_array(color_sets, expand(delta_h), expand(delta_s), expand(delta_v), dep_wtp=self.dep_wtp, overflow=self.get_overflow())
+
+    def _delta_h_batch(self, color_sets, idx, pr_colors):
+        if self.dep_wtp:
+            return Color.spc_rgb2ryb_h_array(pr_colors[:, 0], dtype=np.float64) - Color.spc_rgb2ryb_h_array(color_sets[:, idx, 0], dtype=np.float64)
+
+        return pr_colors[:, 0] - color_sets[:, idx, 0]
+
+    def _analogous_modify_batch(self, color_sets, idx, pr_colors):
+        if idx == 0:
+            delta_h = self._delta_h_batch(color_sets, 0, pr_colors)
+            self._rotate_batch(color_sets, delta_h, pr_colors[:, 1] - color_sets[:, 0, 1], pr_colors[:, 2] - color_sets[:, 0, 2])
+
+        else:
+            if self.dep_wtp:
+                angle = Color.spc_rgb2ryb_h_array(color_sets[:, 0, 0], dtype=np.float64) - Color.spc_rgb2ryb_h_array(pr_colors[:, 0], dtype=np.float64)
+
+            else:
+                angle = color_sets[:, 0, 0] - pr_colors[:, 0]
+
+            angle = angle if idx in (1, 2) else -angle
+
+            if idx in (2, 4):
+                angle = angle.astype(np.float64)
+                angle = np.where(angle > 180, angle - 360, angle)
+                angle = np.where(angle < -180, angle + 360, angle)
+                angle = angle / 2
+
+            if self.dep_wtp:
+                ryb_h = Color.spc_rgb2ryb_h_array(color_sets[:, 0, 0], dtype=np.float64)
+
+                for col, factor in ((1, -1), (2, -2), (3, 1), (4, 2)):
+                    self._set_batch(color_sets, col, 0, Color.spc_ryb2rgb_h_array(ryb_h + angle * factor, dtype=np.float64))
+
+            else:
+                h = color_sets[:, 0, 0]
+                double_angle = angle.astype(np.float64) * 2
+                self._set_batch(color_sets, 1, 0, h - angle)
+                self._set_batch(color_sets, 2, 0, h - double_angle)
+                self._set_batch(color_sets, 3, 0, h + angle)
+                self._set_batch(color_sets, 4, 0, h + double_angle)
+
+        color_sets[:, idx] = pr_colors
+
+    def _monochromatic_modify_batch(self, color_sets, idx, pr_colors):
+        self._set_batch(color_sets, slice(None), 0, pr_colors[:, :1])
+        color_sets[:, idx] = pr_colors
+
+    def _multiple_modify_batch(self, color_sets, idx, pr_colors):
+        delta_h = self._delta_h_batch(color_sets, idx, pr_colors)
+
+        if idx == 0:
+            self._rotate_batch(color_sets, delta_h, pr_colors[:, 1] - color_sets[:, 0, 1], pr_colors[:, 2] - color_sets[:, 0, 2])
+
+        elif self.dep_wtp:
+            ryb_h = Color.spc_rgb2ryb_h_array(color_sets[..., 0], dtype=np.float64) + delta_h[:, np.newaxis]
+            self._set_batch(color_sets, slice(None), 0, Color.spc_ryb2rgb_h_array(ryb_h, dtype=np.float64))
+
+        else:
+            self._set_batch(color_sets, slice(None), 0, color_sets[..., 0] + delta_h[:, np.newaxis])
+
+        color_sets[:, idx] = pr_colors
+
+    def _tetrad_modify_batch(self, color_sets, idx, pr_colors):
+        delta_h = self._delta_h_batch(color_sets, idx, pr_colors)
+
+        if idx == 0:
+            self._rotate_batch(color_sets, delta_h, pr_colors[:, 1] - color_sets[:, 0, 1], pr_colors[:, 2] - color_sets[:, 0, 2])
+
+        else:
+            cols = [0, 2, 4] if idx in (2, 4) else [1, 3]
+            self._set_batch(color_sets, cols, 0, color_sets[:, cols, 0] + delta_h[:, np.newaxis])
+
+        color_sets[:, idx] = pr_colors
+
+    def _shades_modify_batch(self, color_sets, idx, pr_colors):
+        self._set_batch(color_sets, slice(None), 0, pr_colors[:, :1])
+        self._set_batch(color_sets, slice(None), 1, pr_colors[:, 1:2])
+        color_sets[:, idx] = pr_colors
+
+    def _custom_modify_batch(self, color_sets, idx, pr_colors):
+        color_sets[:, idx] = pr_colors
+
+    def _sync_modify_batch(self, color_sets, idx, pr_colors):
+        delta_h = self._delta_h_batch(color_sets, idx, pr_colors)
+        delta_s = delta_v = 0
+
+        if self.synchronization == 1:
+            delta_h = 0
+            delta_s = pr_colors[:, 1] - color_sets[:, idx, 1]
+            delta_v = pr_colors[:, 2] - color_sets[:, idx, 2]
+
+        elif self.synchronization == 3:
+            delta_s = pr_colors[:, 1] - color_sets[:, idx, 1]
+            delta_v = pr_colors[:, 2] - color_sets[:, idx, 2]
+
+        elif self.synchronization == 4:
+            self._set_batch(color_sets, slice(None), 1, pr_colors[:, 1:2])
+            self._set_batch(color_sets, slice(None), 2, pr_colors[:, 2:3])
+
+        elif self.synchronization == 5:
+            for ch in (1, 2):
+                self._set_batch(color_sets, idx, ch, pr_colors[:, ch])
+
+                if idx in (1, 3):
+                    for col, ref in ((2, 1), (4, 3)):
+                        self._set_batch(color_sets, col, ch, color_sets[:, ref, ch].astype(np.float64) * 2 - color_sets[:, 0, ch])
+
+                else:
+                    for col, ref in ((1, 2), (3, 4)):
+                        self._set_batch(color_sets, col, ch, (color_sets[:, ref, ch] + color_sets[:, 0, ch]) / 2)
+
+        elif self.synchronization == 6:
+            self._set_batch(color_sets, idx, 1, pr_colors[:, 1])
+            self._set_batch(color_sets, idx, 2, pr_colors[:, 2])
+
+            for ch in (1, 2):
+                if idx in (1, 2):
+                    self._set_batch(color_sets, [3, 4], ch, color_sets[:, [1, 2], ch])
+
+                elif idx in (3, 4):
+                    self._set_batch(color_sets, [1, 2], ch, color_sets[:, [3, 4], ch])
+
+                else:
+                    self._set_batch(color_sets, [1, 2], ch, (color_sets[:, [1, 2], ch] + color_sets[:, [3, 4], ch]) / 2)
+                    self._set_batch(color_sets, [3, 4], ch, color_sets[:, [1, 2], ch])
+
+        self._rotate_batch(color_sets, delta_h, delta_s, delta_v)
+
+
+class TestColorSet(unittest.TestCase):
+    def test_create_batch(self):
+        num = 400
+
+        for dep_wtp in (0, 1):
+            for overflow in ("cutoff", "revert", "repeat"):
+                color_set = ColorSet((20.0, 300.0), (0.3, 1.0), (0.2, 0.9), overflow=overflow, dep_wtp=dep_wtp)
+
+                for harmony_rule in ("analogous", "monochromatic", "triad", "tetrad", "pentad", "complementary", "shades", "custom"):
+                    hsv_sets = color_set.create_batch(harmony_rule, num, seed=1)
+                    self.assertEqual(hsv_sets.shape, (num, 5, 3))
+                    self.assertEqual(hsv_sets.dtype, np.float32)
+                    self.assertTrue(np.array_equal(hsv_sets, color_set.create_batch(harmony_rule, num, seed=1)))
+                    rgb_sets = color_set.create_batch(harmony_rule, num, seed=2, tp=CTP.rgb).astype(np.float64)
+                    random.seed(3)
+                    single_sets = []
+
+                    for _ in range(num):
+                        color_set.initialize()
+                        color_set.create(harmony_rule)
+                        single_sets.append([color.rgb for color in color_set])
+
+                    single_sets = np.array(single_sets, dtype=np.float64)
+                    z_score = np.abs(rgb_sets.mean(axis=0) - single_sets.mean(axis=0)) / np.sqrt((rgb_sets.var(axis=0) + single_sets.var(axis=0)) / num + 1E-6)
+                    self.assertLess(z_score.max(), 5.0, (dep_wtp, overflow, harmony_rule))
+
+    def test_modify_batch(self):
+        rs = np.random.RandomState(0)
+
+        for dep_wtp in (0, 1):
+            for overflow in ("cutoff", "revert", "repeat"):
+                color_set = ColorSet((0.0, 360.0), (0.0, 1.0), (0.0, 1.0), overflow=overflow, dep_wtp=dep_wtp)
+
+                for synchronization in range(7):
+                    color_set.synchronization = synchronization
+
+                    for harmony_rule in ("analogous", "monochromatic", "triad", "tetrad", "pentad", "complementary", "shades", "custom"):
+                        hsv_sets = rs.uniform((0.0, 0.0, 0.0), (360.0, 1.0, 1.0), (10, 5, 3)).astype(np.float32)
+                        idx = rs.randint(0, 5, 10)
+                        hsv_colors = rs.uniform((-100.0, -0.3, -0.3), (460.0, 1.3, 1.3), (10, 3))
+                        do_sync = bool(rs.randint(2))
+                        batch_sets = color_set.modify_batch(harmony_rule, hsv_sets, idx, hsv_colors, do_sync=do_sync)
+
+                        for i in range(10):
+                            for j in range(5):
+                                color_set[j].hsv = hsv_sets[i, j]
+
+                            color_set.modify(harmony_rule, int(idx[i]), Color(hsv_colors[i], tp=CTP.hsv, overflow=overflow), do_sync=do_sync)
+                            self.assertTrue(np.array_equal(batch_sets[i], [color.hsv for color in color_set]), (dep_wtp, overflow, synchronization, harmony_rule))
+
+        rgb_sets = color_set.modify_batch("triad", np.zeros((5, 3)), 2, rs.uniform(0.0, 1.0, (7, 3)), tp=CTP.rgb)
+        self.assertEqual(rgb_sets.shape, (7, 5, 3))
+        self.assertEqual(rgb_sets.dtype, np.uint8)
+
+
+if __name__ == "__main__":
+    unittest.main()
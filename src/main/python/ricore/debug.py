@@ -190,6 +190,7 @@ def debug_info(idx, value, func=None):
         ), (      # 5, Image
             "Run Category",           # 500
             "Run Args",               # 501
+            "Precompute Category",    # 502
             "",
 
         ), (      # 6, Board
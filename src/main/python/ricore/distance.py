@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+
+"""
+Real-time Color Kit (Rickrack) is a free software, which is distributed
+in the hope that it will be useful, but WITHOUT ANY WARRANTY. You can
+redistribute it and/or modify it under the terms of the GNU General Public
+License as published by the Free Software Foundation. See the GNU General
+Public License for more details.
+
+Please visit https://github.com/eigenmiao/Rickrack for more
+infomation about Rickrack.
+
+Copyright (c) 2019-2023 by Eigenmiao. All Rights Reserved.
+"""
+
+import time
+import unittest
+import numpy as np
+from ricore.color import Color, CTP, ColorArray
+
+
+def delta_e_cie76(lab_a, lab_b):
+    """
+    Color difference CIE76 (Euclidean distance in lab space).
+
+    Args:
+        lab_a (array): lab colors in shape (..., 3).
+        lab_b (array): lab colors in shape (..., 3), broadcastable with lab_a.
+
+    Returns:
+        delta e array in shape (...).
+    """
+
+    diff = np.asarray(lab_a, dtype=np.float64) - np.asarray(lab_b, dtype=np.float64)
+    return np.sqrt(np.sum(diff * diff, axis=-1))
+
+def delta_e_ciede2000(lab_a, lab_b, k_l=1.0, k_c=1.0, k_h=1.0):
+    """
+    Color difference CIEDE2000 (ref: G. Sharma, W. Wu and E. N. Dalal, The CIEDE2000 color-difference formula, 2005).
+
+    Args:
+        lab_a (array): lab colors in shape (..., 3).
+        lab_b (array): lab colors in shape (..., 3), broadcastable with lab_a.
+        k_l, k_c, k_h (float): parametric weighting factors for lightness, chroma and hue.
+
+    Returns:
+        delta e array in shape (...).
+    """
+
+    lab_a = np.asarray(lab_a, dtype=np.float64)
+    lab_b = np.asarray(lab_b, dtype=np.float64)
+    l_1, a_1, b_1 = lab_a[..., 0], lab_a[..., 1], lab_a[..., 2]
+    l_2, a_2, b_2 = lab_b[..., 0], lab_b[..., 1], lab_b[..., 2]
+    c_mean_7 = ((np.hypot(a_1, b_1) + np.hypot(a_2, b_2)) / 2) ** 7
+    g = 0.5 * (1 - np.sqrt(c_mean_7 / (c_mean_7 + 25.0 ** 7)))
+    ap_1 = (1 + g) * a_1
+    ap_2 = (1 + g) * a_2
+    cp_1 = np.hypot(ap_1, b_1)
+    cp_2 = np.hypot(ap_2, b_2)
+    # hues are calculated in radians as the reference implementation for the edge cases of opposite hues.
+    hp_1 = np.arctan2(b_1, ap_1)
+    hp_2 = np.arctan2(b_2, ap_2)
+    hp_1 = np.where(hp_1 < 0, hp_1 + 2 * np.pi, hp_1)
+    hp_2 = np.where(hp_2 < 0, hp_2 + 2 * np.pi, hp_2)
+    achromatic = cp_1 * cp_2 == 0
+
+    dhp = hp_2 - hp_1
+    dhp = np.where(dhp > np.pi, dhp - 2 * np.pi, dhp)
+    dhp = np.where(dhp < -np.pi, dhp + 2 * np.pi, dhp)
+    dhp = np.where(achromatic, 0.0, dhp)
+    dlp = l_2 - l_1
+    dcp = cp_2 - cp_1
+    dhp = 2 * np.sqrt(cp_1 * cp_2) * np.sin(dhp / 2)
+
+    lp_mean = (l_1 + l_2) / 2
+    cp_mean = (cp_1 + cp_2) / 2
+    hp_sum = hp_1 + hp_2
+    hp_mean = np.where(np.abs(hp_1 - hp_2) <= np.pi, hp_sum / 2, np.where(hp_sum < 2 * np.pi, (hp_sum + 2 * np.pi) / 2, (hp_sum - 2 * np.pi) / 2))
+    hp_mean = np.degrees(np.where(achromatic, hp_sum, hp_mean))
+
+    t = 1 - 0.17 * np.cos(np.radians(hp_mean - 30)) + 0.24 * np.cos(np.radians(2 * hp_mean)) + 0.32 * np.cos(np.radians(3 * hp_mean + 6)) - 0.20 * np.cos(np.radians(4 * hp_mean - 63))
+    d_theta = 30 * np.exp(-((hp_mean - 275) / 25) ** 2)
+    cp_mean_7 = cp_mean ** 7
+    r_c = 2 * np.sqrt(cp_mean_7 / (cp_mean_7 + 25.0 ** 7))
+    s_l = 1 + 0.015 * (lp_mean - 50) ** 2 / np.sqrt(20 + (lp_mean - 50) ** 2)
+    s_c = 1 + 0.045 * cp_mean
+    s_h = 1 + 0.015 * cp_mean * t
+    r_t = -np.sin(np.radians(2 * d_theta)) * r_c
+
+    term_l = dlp / (k_l * s_l)
+    term_c = dcp / (k_c * s_c)
+    term_h = dhp / (k_h * s_h)
+
+    return np.sqrt(np.maximum(term_l ** 2 + term_c ** 2 + term_h ** 2 + r_t * term_c * term_h, 0.0))
+
+
+class PaletteIndex(object):
+    """
+    Palette index object. Nearest neighbour search over color sets by perceptual distance.
+    The distance of two color sets is the root mean square of delta e between their colors in the same order.
+    """
+
+    methods = ("cie76", "ciede2000")
+    _last_color_sets = ((), None)
+
+    def __init__(self, lab_sets, ids=None, chunk_len=65536):
+        """
+        Init palette index.
+
+        Args:
+            lab_sets (array): lab color sets in shape (n, m, 3), e.g. (n, 5, 3) for color sets.
+            ids (tuple, list, array or None): ids returned for color sets, e.g. indexes in depot. None for 0 ~ n - 1.
+            chunk_len (int): max number of color sets calculated at once.
+        """
+
+        lab_sets = np.asarray(lab_sets, dtype=np.float64)
+        assert len(lab_sets.shape) == 3 and lab_sets.shape[2] == 3, lab_sets.shape
+        self._lab_sets = lab_sets
+        self._features = lab_sets.reshape(len(lab_sets), -1)
+        self._sq_norms = np.einsum("ij,ij->i", self._features, self._features)
+        self._ids = np.arange(len(lab_sets)) if ids is None else np.asarray(ids)
+        assert len(self._ids) == len(lab_sets), (len(self._ids), len(lab_sets))
+        self._chunk_len = max(int(chunk_len), 1)
+
+    def __len__(self):
+        return len(self._lab_sets)
+
+    @classmethod
+    def from_rgb_sets(cls, rgb_sets, ids=None):
+        """
+        Class method. Init palette index from rgb color sets.
+
+        Args:
+            rgb_sets (array): rgb color sets in shape (n, m, 3).
+            ids (tuple, list, array or None): ids returned for color sets. None for 0 ~ n - 1.
+        """
+
+        return cls(Color.rgb2lab_array(np.asarray(rgb_sets).reshape(-1, 3)).reshape(np.shape(rgb_sets)), ids=ids)
+
+    @classmethod
+    def from_color_sets(cls, color_sets):
+        """
+        Class method. Init palette index from color sets, e.g. color sets in depot. Color sets with missing colors are skipped.
+        The index of last color sets is reused if the same color set objects are given, so color sets should not be modified in place.
+
+        Args:
+            color_sets (tuple or list): color sets of five colors in Color type (or None for missing colors).
+
+        Returns:
+            palette index with ids of indexes in color_sets.
+        """
+
+        last_sets, last_index = cls._last_color_sets
+
+        if last_index is not None and len(last_sets) == len(color_sets) and all(a is b for a, b in zip(last_sets, color_sets)):
+            return last_index
+
+        ids = [i for i, color_set in enumerate(color_sets) if len(color_set) == 5 and all(color is not None for color in color_set)]
+        hsv_sets = [color_sets[i].hsv if isinstance(color_sets[i], ColorArray) else [color.hsv for color in color_sets[i]] for i in ids]
+        rgb_sets = Color.hsv2rgb_array(np.array(hsv_sets, dtype=np.float32).reshape(-1, 5, 3))
+        index = cls.from_rgb_sets(rgb_sets, ids=ids)
+        cls._last_color_sets = (tuple(color_sets), index)
+
+        return index
+
+    def distances(self, lab_set, method="cie76"):
+        """
+        Get distances from a color set to all color sets in index.
+
+        Args:
+            lab_set (array): lab color set in shape (m, 3).
+            method (str): delta e method, "cie76" or "ciede2000".
+
+        Returns:
+            distance array in shape (n,).
+        """
+
+        assert method in self.methods, method
+        lab_set = np.asarray(lab_set, dtype=np.float64)
+        assert lab_set.shape == self._lab_sets.shape[1:], lab_set.shape
+
+        if method == "cie76":
+            diff = self._features - lab_set.reshape(-1)
+            return np.sqrt(np.einsum("ij,ij->i", diff, diff) / lab_set.shape[0])
+
+        dists = np.empty(len(self))
+
+        for start in range(0, len(self), self._chunk_len):
+            delta_e = delta_e_ciede2000(self._lab_sets[start: start + self._chunk_len], lab_set)
+            dists[start: start + self._chunk_len] = np.sqrt(np.mean(delta_e * delta_e, axis=1))
+
+        return dists
+
+    def query(self, lab_sets, k=1, method="cie76"):
+        """
+        Find k nearest color sets.
+        For cie76, distances of all color sets are calculated by matrix product and only k nearest ones are calculated exactly.
+
+        Args:
+            lab_sets (array): lab color set in shape (m, 3) or color sets in shape (q, m, 3).
+            k (int): number of nearest color sets.
+            method (str): delta e method, "cie76" or "ciede2000".
+
+        Returns:
+            ids and distances of nearest color sets from near to far, in shape (k,) or (q, k).
+        """
+
+        assert method in self.methods, method
+        lab_sets = np.asarray(lab_sets, dtype=np.float64)
+        single = len(lab_sets.shape) == 2
+        lab_sets = lab_sets[np.newaxis] if single else lab_sets
+        assert lab_sets.shape[1:] == self._lab_sets.shape[1:], lab_sets.shape
+        k = min(int(k), len(self))
+        ids = np.empty((len(lab_sets), k), dtype=self._ids.dtype)
+        dists = np.empty((len(lab_sets), k))
+
+        for i, lab_set in enumerate(lab_sets):
+            if method == "cie76":
+                # squared distances up to a constant, |x|^2 - 2 x . q.
+                scores = self._sq_norms - 2 * self._features.dot(lab_set.reshape(-1))
+
+            else:
+                scores = self.distances(lab_set, method=method)
+
+            nearest = np.argpartition(scores, k - 1)[:k] if 0 < k < len(self) else np.arange(k)
+
+            if method == "cie76":
+                diff = self._features[nearest] - lab_set.reshape(-1)
+                near_dists = np.sqrt(np.einsum("ij,ij->i", diff, diff) / lab_set.shape[0])
+
+            else:
+                near_dists = scores[nearest]
+
+            order = np.argsort(near_dists, kind="stable")
+            ids[i] = self._ids[nearest[order]]
+            dists[i] = near_dists[order]
+
+        if single:
+            return ids[0], dists[0]
+
+        return ids, dists
+
+
+class TestDistance(unittest.TestCase):
+    def test_ciede2000(self):
+        # pairs from Sharma's test data.
+        pairs = (
+            ((50.0, 2.6772, -79.7751), (50.0, 0.0, -82.7485), 2.0425),
+            ((50.0, 3.1571, -77.2803), (50.0, 0.0, -82.7485), 2.8615),
+            ((50.0, 2.8361, -74.0200), (50.0, 0.0, -82.7485), 3.4412),
+            ((50.0, 0.0, 0.0), (50.0, -1.0, 2.0), 2.3669),
+            ((50.0, 2.49, -0.001), (50.0, -2.49, 0.0009), 7.1792),
+            ((50.0, 2.49, -0.001), (50.0, -2.49, 0.0010), 7.2195),
+            ((50.0, 2.5, 0.0), (73.0, 25.0, -18.0), 27.1492),
+            ((50.0, 2.5, 0.0), (50.0, 3.1736, 0.5854), 1.0000),
+            ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+            ((2.0776, 0.0795, -1.1350), (0.9033, -0.0636, -0.5514), 0.9082),
+        )
+
+        lab_a, lab_b, delta_e = [np.array(i) for i in zip(*pairs)]
+        self.assertTrue(np.allclose(delta_e_ciede2000(lab_a, lab_b), delta_e, atol=1E-4))
+        self.assertTrue(np.allclose(delta_e_ciede2000(lab_b, lab_a), delta_e, atol=1E-4))
+        self.assertTrue(np.allclose(delta_e_cie76(lab_a, lab_b), [np.linalg.norm(a - b) for a, b in zip(lab_a, lab_b)]))
+        self.assertEqual(delta_e_ciede2000(lab_a, lab_a).max(), 0.0)
+
+    def test_palette_index(self):
+        rs = np.random.RandomState(0)
+        rgb_sets = rs.randint(0, 256, (3000, 5, 3)).astype(np.uint8)
+        index = PaletteIndex.from_rgb_sets(rgb_sets, ids=np.arange(3000) + 10)
+        lab_sets = Color.rgb2lab_array(rgb_sets)
+
+        for method in PaletteIndex.methods:
+            ids, dists = index.query(lab_sets[:20], k=4, method=method)
+            self.assertEqual(ids.shape, (20, 4))
+            self.assertTrue(np.array_equal(ids[:, 0], np.arange(20) + 10))
+            self.assertTrue(np.allclose(dists[:, 0], 0.0))
+
+            for lab_set, near_ids, near_dists in zip(lab_sets[20:25] + 3.0, *index.query(lab_sets[20:25] + 3.0, k=4, method=method)):
+                if method == "cie76":
+                    all_dists = np.sqrt(np.mean(delta_e_cie76(lab_sets, lab_set) ** 2, axis=1))
+
+                else:
+                    all_dists = np.sqrt(np.mean(delta_e_ciede2000(lab_sets, lab_set) ** 2, axis=1))
+
+                self.assertTrue(np.array_equal(near_ids, np.argsort(all_dists, kind="stable")[:4] + 10))
+                self.assertTrue(np.allclose(near_dists, np.sort(all_dists)[:4]))
+
+        self.assertEqual(index.query(lab_sets[0], k=5000)[0].shape, (3000,))
+        color_sets = [[Color(rgb, tp=CTP.rgb) for rgb in rgb_sets[0]], [None] * 5, ColorArray(rgb_sets[1], tp=CTP.rgb), ()]
+        color_index = PaletteIndex.from_color_sets(color_sets)
+        self.assertEqual(list(color_index.query(lab_sets[1], k=2)[0]), [2, 0])
+        self.assertIs(PaletteIndex.from_color_sets(list(color_sets)), color_index)
+        self.assertEqual(len(PaletteIndex.from_color_sets(color_sets[:1])), 1)
+
+    def test_palette_index_benchmark(self):
+        rs = np.random.RandomState(0)
+        index = PaletteIndex(rs.uniform((0, -128, -128), (100, 128, 128), (100000, 5, 3)))
+        lab_sets = rs.uniform((0, -128, -128), (100, 128, 128), (5, 5, 3))
+
+        for method in PaletteIndex.methods:
+            start = time.perf_counter()
+            index.query(lab_sets, k=10, method=method)
+            cost = (time.perf_counter() - start) / len(lab_sets)
+            print("{} query over {} color sets: {:.4f} s.".format(method, len(index), cost))
+
+
+if __name__ == "__main__":
+    unittest.main()
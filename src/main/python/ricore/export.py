@@ -16,9 +16,10 @@ Copyright (c) 2019-2021 by Eigenmiao. All Rights Reserved.
 import time
 import struct
 import swatch
+import numpy as np
 from lxml import etree
-from ricore.color import Color, CTP
-from ricore.grid import gen_color_grid, gen_assit_color
+from ricore.color import Color, ColorArray, CTP
+from ricore.grid import gen_color_grid, gen_assit_color_array
 from ricore.check import fmt_name
 
 
@@ -33,7 +34,7 @@ def get_export_color_list(color_list, export_grid=False, max_len=65535, useryb=F
         useryb (bool): if use ryb color space.
 
     Returns:
-        export_color_list and export_cname_list.
+        export_color_list (ColorArray) and export_cname_list.
     """
 
     export_color_list = []
@@ -41,10 +42,10 @@ def get_export_color_list(color_list, export_grid=False, max_len=65535, useryb=F
 
     if export_grid:
         for idx in range(len(color_list)):
+            cname_len = len(export_cname_list)
+
             if color_list[idx][7][0]:
                 for i in range(len(color_list[idx][7][0])):
-                    export_color_list.append(Color(color_list[idx][7][0][i], tp=CTP.hec))
-
                     if len(color_list) == 1:
                         name = "{} {}: {}".format(fmt_name(color_list[idx][2]), i + 1, fmt_name(color_list[idx][7][1][i]))
 
@@ -53,16 +54,16 @@ def get_export_color_list(color_list, export_grid=False, max_len=65535, useryb=F
 
                     export_cname_list.append(name.replace("\"", "'"))
 
-                    if len(export_color_list) >= max_len:
+                    if len(export_cname_list) >= max_len:
                         break
 
-            else:
-                color_grid = gen_color_grid(color_list[idx][0], color_list[idx][5], color_list[idx][6], grid_list=None, **color_list[idx][8], useryb=useryb).tolist()
+                export_color_list.append(ColorArray(color_list[idx][7][0][:len(export_cname_list) - cname_len], tp=CTP.hec))
 
-                for i in range(len(color_grid)):
-                    for j in range(len(color_grid[i])):
-                        export_color_list.append(Color(color_grid[i][j], tp=CTP.rgb))
+            else:
+                color_grid = gen_color_grid(color_list[idx][0], color_list[idx][5], color_list[idx][6], grid_list=None, **color_list[idx][8], useryb=useryb)
 
+                for i in range(color_grid.shape[0]):
+                    for j in range(color_grid.shape[1]):
                         if len(color_list) == 1:
                             name = "{} {}-{}".format(fmt_name(color_list[idx][2]), i + 1, j + 1)
 
@@ -71,13 +72,15 @@ def get_export_color_list(color_list, export_grid=False, max_len=65535, useryb=F
 
                         export_cname_list.append(name.replace("\"", "'"))
 
-                        if len(export_color_list) >= max_len:
+                        if len(export_cname_list) >= max_len:
                             break
 
-                    if len(export_color_list) >= max_len:
+                    if len(export_cname_list) >= max_len:
                         break
 
-            if len(export_color_list) >= max_len:
+                export_color_list.append(ColorArray(color_grid.reshape(-1, 3)[:len(export_cname_list) - cname_len], tp=CTP.rgb))
+
+            if len(export_cname_list) >= max_len:
                 break
 
     else:
@@ -96,16 +99,37 @@ def get_export_color_list(color_list, export_grid=False, max_len=65535, useryb=F
                 name = "{} {}-{}".format(fmt_name(color_list[idx][2]), idx + 1, i + 1)
                 export_cname_list.append(name)
 
+                export_color_list.append(gen_assit_color_array(color_list[idx][0][i], [assit_loc[2:6] for assit_loc in color_list[idx][6][i]]))
+
                 for assit_idx in range(len(color_list[idx][6][i])):
-                    assit_color = gen_assit_color(color_list[idx][0][i], *color_list[idx][6][i][assit_idx][2:6])
-                    export_color_list.append(assit_color)
                     name = "{} {}-{}-{}".format(fmt_name(color_list[idx][2]), idx + 1, i + 1, assit_idx + 1)
                     export_cname_list.append(name)
 
-    export_color_list = export_color_list[:max_len]
+    export_color_list = ColorArray.concat(export_color_list)[:max_len]
     export_cname_list = export_cname_list[:max_len]
     return export_color_list, export_cname_list
 
+def get_export_values(export_color_list, ctp="rgb", white_ref=(95.047, 100.0, 108.883)):
+    """
+    Translate all colors in export_color_list into cmyk or lab values at once.
+
+    Args:
+        export_color_list (ColorArray): colors from get_export_color_list.
+        ctp (str): 'rgb', 'hsv', 'cmyk', 'lab' or 'grey'.
+        white_ref (tuple or list): xyz (Tristimulus) Reference values of a perfect reflecting diffuser. default: value of standard "D65, 2Ang".
+
+    Returns:
+        cmyk array in shape (n, 4), lab array in shape (n, 3) or None for other types.
+    """
+
+    if ctp not in ("cmyk", "lab"):
+        return None
+
+    if ctp == "cmyk":
+        return Color.rgb2cmyk_array(export_color_list.rgb)
+
+    return Color.rgb2lab_array(export_color_list.rgb, white_ref=white_ref)
+
 def export_ase(color_list, ctp="rgb", asetp="process", export_grid=False, white_ref=(95.047, 100.0, 108.883), useryb=False):
     """
     Export color set list in ase type (for Adobe exchange).
@@ -123,27 +147,28 @@ def export_ase(color_list, ctp="rgb", asetp="process", export_grid=False, white_
     """
 
     export_color_list, export_cname_list = get_export_color_list(color_list, export_grid=export_grid, useryb=useryb)
+    export_values = get_export_values(export_color_list, ctp=ctp, white_ref=white_ref)
     data = []
 
     for idx in range(len(export_color_list)):
         if ctp == "cmyk":
-            c, m, y, k = Color.rgb2cmyk(export_color_list[idx].rgb)
+            c, m, y, k = export_values[idx]
             data_values = (c, m, y, k)
             data_mode = "CMYK"
 
         elif ctp == "lab":
-            l, a, b = Color.rgb2lab(export_color_list[idx].rgb, white_ref=white_ref)
+            l, a, b = export_values[idx]
             data_values = (l / 100.0, a, b)
             data_mode = "LAB"
 
         elif ctp == "gray":
-            r, g, b = export_color_list[idx].rgb
+            r, g, b = export_color_list.rgb[idx]
             g = 0.2125 * r + 0.7154 * g + 0.0721 * b
             data_values = (g / 255.0,)
             data_mode = "Gray"
 
         else:
-            r, g, b = export_color_list[idx].rgb
+            r, g, b = export_color_list.rgb[idx]
             data_values = (r / 255.0, g / 255.0, b / 255.0)
             data_mode = "RGB"
 
@@ -211,29 +236,30 @@ def export_swatch(color_list, ctp="rgb", export_grid=False, white_ref=(95.047, 1
     """
 
     export_color_list, export_cname_list = get_export_color_list(color_list, export_grid=export_grid, useryb=useryb)
+    export_values = get_export_values(export_color_list, ctp=ctp, white_ref=white_ref)
     swatch_chars_v1 = struct.pack("!H", 1) + struct.pack("!H", len(export_color_list))
     swatch_chars_v2 = struct.pack("!H", 2) + struct.pack("!H", len(export_color_list))
 
     for idx in range(len(export_color_list)):
         if ctp == "hsv":
-            h, s, v = export_color_list[idx].hsv
+            h, s, v = export_color_list.hsv[idx]
             pr_chars = struct.pack("!H", 1) + struct.pack("!H", int(h * 182.04167)) + struct.pack("!H", int(s * 65535)) + struct.pack("!H", int(v * 65535)) + struct.pack("!H", 0)
 
         elif ctp == "cmyk":
-            c, m, y, k = Color.rgb2cmyk(export_color_list[idx].rgb)
+            c, m, y, k = export_values[idx]
             pr_chars = struct.pack("!H", 2) + struct.pack("!H", int((1.0 - c) * 65535)) + struct.pack("!H", int((1.0 - m) * 65535)) + struct.pack("!H", int((1.0 - y) * 65535)) + struct.pack("!H", int((1.0 - k) * 65535))
 
         elif ctp == "lab":
-            l, a, b = Color.rgb2lab(export_color_list[idx].rgb, white_ref=white_ref)
+            l, a, b = export_values[idx]
             pr_chars = struct.pack("!H", 7) + struct.pack("!H", int(l * 100)) + struct.pack("!h", int(a * 100)) + struct.pack("!h", int(b * 100)) + struct.pack("!H", 0)
 
         elif ctp == "gray":
-            r, g, b = export_color_list[idx].rgb
+            r, g, b = export_color_list.rgb[idx]
             g = 0.2125 * r + 0.7154 * g + 0.0721 * b
             pr_chars = struct.pack("!H", 8) + struct.pack("!H", int((255 - g) * 39.2156862745098)) + struct.pack("!H", 0) + struct.pack("!H", 0) + struct.pack("!H", 0)
 
         else:
-            r, g, b = export_color_list[idx].rgb
+            r, g, b = export_color_list.rgb[idx]
             pr_chars = struct.pack("!H", 0) + struct.pack("!H", int(r * 257)) + struct.pack("!H", int(g * 257)) + struct.pack("!H", int(b * 257)) + struct.pack("!H", 0)
 
         swatch_chars_v1 = swatch_chars_v1 + pr_chars
@@ -353,7 +379,7 @@ def export_gpl(color_list, export_grid=False, useryb=False):
     gpl_chars = "GIMP Palette\n"
 
     for idx in range(len(export_color_list)):
-        r, g, b = export_color_list[idx].rgb
+        r, g, b = export_color_list.rgb[idx]
         name = export_cname_list[idx]
         gpl_chars += "{:<5}{:<5}{:<5}{}\n".format(r, g, b, name)
 
@@ -411,7 +437,7 @@ def export_xml(color_list, export_grid=False, useryb=False):
     xml_chars = "<!DOCTYPE PencilPalette>\n<palette>\n"
 
     for idx in range(len(export_color_list)):
-        r, g, b = export_color_list[idx].rgb
+        r, g, b = export_color_list.rgb[idx]
         name = export_cname_list[idx]
         xml_chars += "    <colour red='{}'{} green='{}'{} blue='{}'{} alpha='255' name='{}'/>\n".format(r, " " * (3 - len(str(r))), g, " " * (3 - len(str(g))), b, " " * (3 - len(str(b))), name)
 
@@ -524,21 +550,15 @@ def export_text(color_list, useryb=False):
         for i in (2, 1, 0, 3, 4):
             grid_list.append(color_list[idx][0][i].hec)
 
-            for assit_idx in range(len(color_list[idx][6][i])):
-                assit_color = gen_assit_color(color_list[idx][0][i], *color_list[idx][6][i][assit_idx][2:6])
-                grid_list.append(assit_color.hec)
+            grid_list.extend(gen_assit_color_array(color_list[idx][0][i], [assit_loc[2:6] for assit_loc in color_list[idx][6][i]]).hec)
 
         plain_text += "  " + " ".join(grid_list)
         plain_text += "\n\n# Color Grid ...\n"
-        color_grid = gen_color_grid(color_list[idx][0], color_list[idx][5], color_list[idx][6], grid_list=None, **color_list[idx][8], useryb=useryb).tolist()
-
-        for i in range(len(color_grid)):
-            grid_list = []
-
-            for j in range(len(color_grid[i])):
-                grid_list.append(Color(color_grid[i][j], tp=CTP.rgb).hec)
+        color_grid = gen_color_grid(color_list[idx][0], color_list[idx][5], color_list[idx][6], grid_list=None, **color_list[idx][8], useryb=useryb)
+        grid_hecs = Color.rgb2hec_array(color_grid).tolist()
 
-            plain_text += "  " + " ".join(grid_list) + "\n"
+        for i in range(len(grid_hecs)):
+            plain_text += "  " + " ".join(grid_hecs[i]) + "\n"
         plain_text += "\n"
 
     plain_text += "\n"
@@ -15,7 +15,7 @@ Copyright (c) 2019-2022 by Eigenmiao. All Rights Reserved.
 
 import re
 import numpy as np
-from ricore.color import Color, CTP
+from ricore.color import Color, CTP, ColorArray
 
 
 def gen_color_grid(color_set, grid_locations, grid_assitlocs, grid_list=None, col=9, ctp=("r", "g", "b"), sum_factor=1.0, dim_factor=1.0, assist_factor=0.4, rev_grid=False, useryb=False):
@@ -40,19 +40,10 @@ def gen_color_grid(color_set, grid_locations, grid_assitlocs, grid_list=None, co
     """
 
     if grid_list and grid_list[0]:
-        color_grid_a = np.ones((col, col)) * 255
-        color_grid_b = np.ones((col, col)) * 255
-        color_grid_c = np.ones((col, col)) * 255
-
-        for fixed_idx in range(len(grid_list[0])):
-            if fixed_idx < col * col:
-                r, g, b = Color.hec2rgb(grid_list[0][fixed_idx])
-                color_grid_a[fixed_idx // col, fixed_idx % col] = r
-                color_grid_b[fixed_idx // col, fixed_idx % col] = g
-                color_grid_c[fixed_idx // col, fixed_idx % col] = b
-
-        final_grid = np.stack((color_grid_a, color_grid_b, color_grid_c), axis=2)
-        final_grid = Color.fmt_rgb_array(final_grid)
+        fixed_grid = Color.hec2rgb_array(np.array(grid_list[0][:col * col], dtype=str))
+        final_grid = np.full((col * col, 3), 255, dtype=np.uint8)
+        final_grid[:len(fixed_grid)] = fixed_grid
+        final_grid = final_grid.reshape(col, col, 3)
         return final_grid
 
     else:
@@ -70,10 +61,12 @@ def gen_color_grid(color_set, grid_locations, grid_assitlocs, grid_list=None, co
         for idx in range(5):
             pt_rxy = np.array(grid_locations[idx])
 
+            assit_colors = gen_assit_color_array(color_set[idx], [assit_loc[2:6] for assit_loc in grid_assitlocs[idx]])
+
             for assit_idx in range(len(grid_assitlocs[idx])):
                 assit_rpt = pt_rxy + np.array(grid_assitlocs[idx][assit_idx][0:2])
                 assi_points[idx].append(assit_rpt)
-                assit_color = gen_assit_color(color_set[idx], *grid_assitlocs[idx][assit_idx][2:6])
+                assit_color = assit_colors[assit_idx]
 
                 if useryb and "h" in ctp:
                     assi_colors[idx].append(Color.spc_rgb2ryb(assit_color))
@@ -419,6 +412,23 @@ def gen_assit_color(curr_color, assit_h, assit_s, assit_v, relativity):
         ), tp=CTP.hsv, overflow=curr_color.get_overflow())
     return assit_color
 
+def gen_assit_color_array(curr_color, assit_values):
+    """
+    Generate all assit colors relative to current color at once, in the same way as gen_assit_color.
+
+    Args:
+        curr_color (Color): current color.
+        assit_values (tuple, list or array): assit_h, assit_s, assit_v and relativity of each assit color in shape (n, 4).
+
+    Returns:
+        assit colors in ColorArray.
+    """
+
+    assit_values = np.array(assit_values, dtype=np.float64).reshape(-1, 4)
+    relativity = assit_values[:, 3:4] != 0
+    assit_hsv = np.where(relativity, np.array(curr_color.hsv, dtype=np.float64) + assit_values[:, :3], assit_values[:, :3])
+    return ColorArray(assit_hsv, tp=CTP.hsv, overflow=curr_color.get_overflow())
+
 def gen_assit_args(curr_color, assit_color, relativity):
     """
     Generate assit arguments relative to current color.
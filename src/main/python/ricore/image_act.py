@@ -13,77 +13,578 @@ infomation about DigitalPalette.
 Copyright (c) 2019-2021 by Eigenmiao. All Rights Reserved.
 """
 
+import time
 import random
+import hashlib
+import unittest
+import unittest.mock
 import numpy as np
 from ricore.color import Color, CTP
+from ricore.distance import delta_e_cie76
 
 
-def get_centers(data, k, max_iters=100):
+def get_rgb_edge(rgb_ext_data, vertical=True):
     """
-    One dimensional kmeans for searching color centers.
+    Sobel edge detection on the whole extended rgb array at once.
+
+    Args:
+        rgb_ext_data (3D array): rgb data extended by one pixel on each side (see get_ext_data).
+        vertical (bool): True for vertical edge (kernel along columns) and False for horizontal edge.
+
+    Returns:
+        edge array in uint8, same as abs(sum(kernel * window)) / 4 of each pixel.
+    """
+
+    data = rgb_ext_data.astype(np.int16)
+
+    if vertical:
+        diff = data[:, 2:] - data[:, :-2]
+        edge = diff[:-2] + diff[1:-1] * 2 + diff[2:]
+
+    else:
+        diff = data[2:] - data[:-2]
+        edge = diff[:, :-2] + diff[:, 1:-1] * 2 + diff[:, 2:]
+
+    np.abs(edge, out=edge)
+    edge >>= 2
+    return edge.astype(np.uint8)
+
+def get_hsv_edge(hsv_ext_data, vertical=True):
+    """
+    Sobel edge detection on the whole extended hsv array at once. The hue difference is wrapped at 360.
+
+    Args:
+        hsv_ext_data (3D array): hsv data extended by one pixel on each side (see get_ext_data).
+        vertical (bool): True for vertical edge (kernel along columns) and False for horizontal edge.
+
+    Returns:
+        edge array in uint8, h scaled by 0.3542 and s, v scaled by 63.75.
+    """
+
+    if vertical:
+        h_diff = np.abs(hsv_ext_data[:, 2:, 0] - hsv_ext_data[:, :-2, 0]).astype(np.float64)
+        sv_diff = hsv_ext_data[:, 2:, 1:3].astype(np.float64) - hsv_ext_data[:, :-2, 1:3]
+
+    else:
+        h_diff = np.abs(hsv_ext_data[2:, :, 0] - hsv_ext_data[:-2, :, 0]).astype(np.float64)
+        sv_diff = hsv_ext_data[2:, :, 1:3].astype(np.float64) - hsv_ext_data[:-2, :, 1:3]
+
+    pos = np.where(h_diff > 180.0)
+    h_diff[pos] = 360.0 - h_diff[pos]
+
+    if vertical:
+        h_edge = h_diff[:-2] + h_diff[1:-1] * 2 + h_diff[2:]
+        sv_edge = sv_diff[:-2] + sv_diff[1:-1] * 2 + sv_diff[2:]
+
+    else:
+        h_edge = h_diff[:, :-2] + h_diff[:, 1:-1] * 2 + h_diff[:, 2:]
+        sv_edge = sv_diff[:, :-2] + sv_diff[:, 1:-1] * 2 + sv_diff[:, 2:]
+
+    sv_edge = np.abs(sv_edge.astype(np.float32)).astype(np.float64) * 63.75
+    edge = np.empty(h_edge.shape + (3,), dtype=np.uint8)
+    edge[:, :, 0] = h_edge * 0.3542
+    edge[:, :, 1:3] = sv_edge
+    return edge
+
+def get_ext_data(data, start=0, end=None):
+    """
+    Extend rows start ~ end of data by one reflected pixel on each side for Sobel edge detection.
+    Rows start - 1 and end are taken from data as halo, so that edges of bands are same as edges of the whole data.
+
+    Args:
+        data (3D array): rgb or hsv data.
+        start (int): first row of band.
+        end (int or None): last row (exclusive) of band. None for the last row of data.
+
+    Returns:
+        extended band data in shape (end - start + 2, width + 2, 3).
+    """
+
+    hig, wid = data.shape[:2]
+    end = hig if end is None else end
+    rows = np.arange(start - 1, end + 1)
+    rows[0] = 1 if start == 0 else rows[0]
+    rows[-1] = hig - 2 if end == hig else rows[-1]
+    cols = np.arange(-1, wid + 1)
+    cols[0] = 1
+    cols[-1] = wid - 2
+    return data[rows[:, None], cols]
+
+def get_enhance_lut(reg, separ, fact, sigma, onedir):
+    """
+    Get lookup tables of rgb enhancement. The transfer function of each channel only depends on the value of the channel,
+    so it is evaluated once for all 256 values and then applied to image by a gather, e.g. lut[k][rgb_data[:, :, k]].
+
+    Args:
+        reg (tuple or list): enhanced channels, e.g. (0, 1, 2).
+        separ (tuple or list): separation of each channel in reg.
+        fact (tuple or list): factor of each channel in reg.
+        sigma (float): sigma in scope [0.0, 1.0].
+        onedir (bool): enhance in one direction.
+
+    Returns:
+        lookup tables in shape (3, 256) and dtype uint8. Channels not in reg are identity.
+    """
+
+    lut = np.tile(np.arange(256, dtype=np.uint8), (3, 1))
+
+    for k, k_separ, k_fact in zip(reg, separ, fact):
+        if abs(k_fact) < 1E-3:
+            continue
+
+        data = np.arange(256, dtype=np.float32)
+
+        if sigma == 0.0:
+            expd = np.zeros(data.shape)
+            expd[np.where((data < k_separ + 1) & (data > k_separ - 1))] = k_fact
+
+        elif sigma == 1.0:
+            expd = np.ones(data.shape) * k_fact
+
+        else:
+            expd = 0.001 * (10 ** (4.5 * sigma)) * -1
+            expd = np.exp(((data - k_separ) / 255.0) ** 2 / expd) * k_fact
+
+        if onedir:
+            data = data + expd * 255.0
+
+        else:
+            expd = np.abs(expd)
+            selection = np.where(data >= k_separ) if k_separ < 125 else np.where(data > k_separ)
+            data = data * (1.0 - expd)
+            data[selection] = data[selection] + expd[selection] * 255.0
+
+        data[np.where(data < 0)] = 0
+        data[np.where(data > 255)] = 255
+        # compose with previous table if channel is enhanced more than once.
+        lut[k] = np.array(data, dtype=np.uint8)[lut[k]]
+
+    return lut
+
+def get_centers(data, k, max_iters=100, weights=None, n_init=1, rng=None):
+    """
+    One dimensional kmeans for searching color centers. Data are sorted once, and clusters are contiguous ranges of sorted data
+    split at midpoints of centers, so each iteration costs O(k log n) by prefix sums.
+
+    Args:
+        data (array): one dimensional data.
+        k (int): number of centers.
+        max_iters (int): max number of iterations.
+        weights (array or None): weights of data, e.g. pixel counts of histogram bins. None for unweighted data.
+        n_init (int): number of starts run in a batch. The first start is at quantiles of data and others are at random data.
+        rng (RandomState or None): random state for other starts. None for np.random.
+
+    Returns:
+        centers of the start with least inertia, in order of initial centers.
+    """
+
+    data = np.asarray(data, dtype=np.float64)
+
+    if weights is None:
+        sep = len(data) // k
+        init = data[int(sep / 2)::sep][:k]
+
+    else:
+        # initial centers at weighted quantiles.
+        order = np.argsort(data, kind="stable")
+        cum_weights = np.cumsum(weights[order])
+        init = data[order][np.searchsorted(cum_weights, (np.arange(k) + 0.5) / k * cum_weights[-1]).clip(0, len(data) - 1)]
+
+    sorted_data, cum_w, cum_wx, cum_wxx = get_prefix_sums(data, weights)
+    centers = np.vstack([init,] + [get_rand_data(data, k, weights, rng) for _ in range(n_init - 1)])
+
+    def split(centers):
+        # ranges are found in sorted centers and returned in original order of centers.
+        order = np.lexsort((np.broadcast_to(np.arange(k), centers.shape), centers), axis=1)
+        sorted_centers = np.take_along_axis(centers, order, axis=1)
+        bounds = get_split_bounds(sorted_data, sorted_centers, order)
+        sorted_starts = np.hstack([np.zeros((n_init, 1), dtype=bounds.dtype), bounds])
+        sorted_ends = np.hstack([bounds, np.full((n_init, 1), len(sorted_data), dtype=bounds.dtype)])
+        starts, ends = np.empty_like(sorted_starts), np.empty_like(sorted_ends)
+        np.put_along_axis(starts, order, sorted_starts, axis=1)
+        np.put_along_axis(ends, order, sorted_ends, axis=1)
+        return starts, ends
+
+    for _ in range(max_iters):
+        starts, ends = split(centers)
+        sum_w = cum_w[ends] - cum_w[starts]
+        new_centers = np.where(sum_w > 0, (cum_wx[ends] - cum_wx[starts]) / np.where(sum_w > 0, sum_w, 1.0), 0.0)
+
+        if np.all(centers == new_centers):
+            break
+
+        centers = new_centers
+
+    inertia = get_inertia(centers, *split(centers), cum_w, cum_wx, cum_wxx)
+    return centers[np.argmin(inertia)]
+
+def get_split_bounds(sorted_data, sorted_centers, order):
     """
+    Get bounds between ranges of sorted data nearest to sorted centers, with ties to the center of lower original index as np.argmin does.
+    Bounds are found by bisection on the exact comparison of distances, and repeated centers except the one of lowest index get empty ranges.
+
+    Args:
+        sorted_data (array): sorted data in shape (n,).
+        sorted_centers (array): sorted centers in shape (m, k), with repeated centers sorted by original index.
+        order (array): original index of sorted centers in shape (m, k).
+
+    Returns:
+        bounds in shape (m, k - 1).
+    """
+
+    num, k = len(sorted_data), sorted_centers.shape[1]
+    owners = order.copy()
+
+    for i in range(1, k):
+        owners[:, i] = np.where(sorted_centers[:, i] == sorted_centers[:, i - 1], owners[:, i - 1], order[:, i])
+
+    left, right = sorted_centers[:, :-1], sorted_centers[:, 1:]
+    left_first = owners[:, :-1] < order[:, 1:]
+    lows = np.zeros(left.shape, dtype=np.int64)
+    highs = np.full(left.shape, num, dtype=np.int64)
+
+    while (lows < highs).any():
+        mids = (lows + highs) // 2
+        values = sorted_data[np.minimum(mids, num - 1)]
+        dist_l, dist_r = np.abs(values - left), np.abs(values - right)
+        to_left = (dist_l < dist_r) | ((dist_l == dist_r) & left_first)
+        active = lows < highs
+        lows = np.where(active & to_left, mids + 1, lows)
+        highs = np.where(active & ~to_left, mids, highs)
+
+    # bisection gives the end of data to the lowest index of repeated centers, and it is passed to the end of the repeated ones.
+    for i in range(k - 3, -1, -1):
+        lows[:, i] = np.where(sorted_centers[:, i] == sorted_centers[:, i + 1], lows[:, i + 1], lows[:, i])
+
+    return lows
+
+def get_hue_centers(h_data, k, max_iters=100, weights=None, h_ref=0.0, n_init=1, rng=None):
+    """
+    Circular kmeans for searching hue centers. Hue clusters are contiguous arcs, so sorted hues are extended by one turn on
+    both sides and each iteration costs O(k log n) by prefix sums as in get_centers.
+
+    Args:
+        h_data (array): hue data in 0 ~ 360.
+        k (int): number of centers.
+        max_iters (int): max number of iterations.
+        weights (array or None): weights of data, e.g. pixel counts of histogram bins. None for unweighted data.
+        h_ref (int or float): ref hue. The first start is at quantiles of hues relative to h_ref in -180 ~ 180.
+        n_init (int): number of starts run in a batch. Other starts are at random data.
+        rng (RandomState or None): random state for other starts. None for np.random.
+
+    Returns:
+        hue centers in 0 ~ 360 of the start with least inertia, in order of initial centers.
+    """
+
+    h_data = np.mod(np.asarray(h_data, dtype=np.float64), 360.0)
+    rel_data = np.mod(h_data - h_ref + 180.0, 360.0)
+    order = np.argsort(rel_data, kind="stable")
+    cum_weights = np.cumsum(np.ones(len(h_data)) if weights is None else weights[order])
+    init = rel_data[order][np.searchsorted(cum_weights, (np.arange(k) + 0.5) / k * cum_weights[-1]).clip(0, len(h_data) - 1)] + h_ref - 180.0
+    sorted_data, cum_w, cum_wx, cum_wxx = get_prefix_sums(h_data, weights, period=360.0)
+    centers = np.mod(np.vstack([init,] + [get_rand_data(h_data, k, weights, rng) for _ in range(n_init - 1)]), 360.0)
 
-    sep = len(data) // k
-    centers = data[int(sep / 2)::sep][:k]
+    def split(centers):
+        # arc of center i is from the midpoint with previous center to the midpoint with next center.
+        # arcs are found in sorted centers and returned in original order of centers.
+        order = np.argsort(centers, axis=1, kind="stable")
+        sorted_centers = np.take_along_axis(centers, order, axis=1)
+        highs = (sorted_centers + np.hstack([sorted_centers[:, 1:], sorted_centers[:, :1] + 360.0])) / 2
+        lows = np.hstack([highs[:, -1:] - 360.0, highs[:, :-1]])
+        arcs = [np.empty_like(x) for x in (lows, lows, lows)]
+
+        for arc, value in zip(arcs, (np.searchsorted(sorted_data, lows), np.searchsorted(sorted_data, highs), lows)):
+            np.put_along_axis(arc, order, value, axis=1)
+
+        return arcs[0].astype(np.int64), arcs[1].astype(np.int64), arcs[2]
 
     for _ in range(max_iters):
-        labels = np.argmin(np.abs(data[:, None] - centers), axis=1)
-        new_centers = np.array([np.mean(data[labels == i]) if len(data[labels == i]) else 0 for i in range(k)])
+        starts, ends, _ = split(centers)
+        sum_w = cum_w[ends] - cum_w[starts]
+        new_centers = np.where(sum_w > 0, np.mod((cum_wx[ends] - cum_wx[starts]) / np.where(sum_w > 0, sum_w, 1.0), 360.0), centers)
 
         if np.all(centers == new_centers):
             break
 
         centers = new_centers
-    return centers
 
-def get_h_ref(h_array):
+    starts, ends, lows = split(centers)
+    # inertia is computed with centers unwrapped into their arcs.
+    inertia = get_inertia(centers + np.where(centers < lows, 360.0, 0.0), starts, ends, cum_w, cum_wx, cum_wxx)
+    return centers[np.argmin(inertia)]
+
+def get_prefix_sums(data, weights=None, period=None):
+    order = np.argsort(data, kind="stable")
+    sorted_data = data[order]
+    sorted_weights = np.ones(len(data)) if weights is None else np.asarray(weights, dtype=np.float64)[order]
+
+    if period:
+        sorted_data = np.hstack([sorted_data - period, sorted_data, sorted_data + period])
+        sorted_weights = np.hstack([sorted_weights,] * 3)
+
+    cum_w = np.hstack([0.0, np.cumsum(sorted_weights)])
+    cum_wx = np.hstack([0.0, np.cumsum(sorted_weights * sorted_data)])
+    cum_wxx = np.hstack([0.0, np.cumsum(sorted_weights * sorted_data ** 2)])
+    return sorted_data, cum_w, cum_wx, cum_wxx
+
+def get_rand_data(data, k, weights=None, rng=None):
+    rng = np.random if rng is None else rng
+    return data[rng.choice(len(data), k, p=None if weights is None else weights / np.sum(weights))]
+
+def get_inertia(centers, starts, ends, cum_w, cum_wx, cum_wxx):
+    sum_w = cum_w[ends] - cum_w[starts]
+    sum_wx = cum_wx[ends] - cum_wx[starts]
+    sum_wxx = cum_wxx[ends] - cum_wxx[starts]
+    return np.sum(sum_wxx - 2 * centers * sum_wx + centers ** 2 * sum_w, axis=1)
+
+def get_hue_dist(h_array, h):
+    """
+    Get circular distance between hues.
+    """
+
+    return np.abs(np.mod(h_array - h + 180.0, 360.0) - 180.0)
+
+def count_data(selection, weights=None):
+    """
+    Count selected data.
+
+    Args:
+        selection (array): bool array of selected data.
+        weights (array or None): weights of data. None for unweighted data.
+    """
+
+    if weights is None:
+        return len(np.where(selection)[0])
+
+    return weights[selection].sum()
+
+def get_h_ref(h_array, weights=None, rng=None):
     """
     Get ref h of data.
+
+    Args:
+        h_array (array): hue data.
+        weights (array or None): weights of data. None for unweighted data.
+        rng (RandomState or None): random state. None for global random state.
     """
 
-    sel_pro = [1.0 / (len(np.where((h_array >= 345) | (h_array < 15))[0]) + 1E-2)] + \
-              [1.0 / (len(np.where((h_array >= i * 30 + 15) & (h_array < i * 30 + 45.0))[0]) + 1E-2) for i in range(11)]
+    sel_pro = [1.0 / (count_data((h_array >= 345) | (h_array < 15), weights) + 1E-2)] + \
+              [1.0 / (count_data((h_array >= i * 30 + 15) & (h_array < i * 30 + 45.0), weights) + 1E-2) for i in range(11)]
 
     sel_pro_sum = sum(sel_pro)
     sel_pro = [i / sel_pro_sum for i in sel_pro]
-    sel_idx = random.choices(range(len(sel_pro)), sel_pro)[0]
+    sel_idx = random.choices(range(len(sel_pro)), sel_pro)[0] if rng is None else rng.choice(len(sel_pro), p=np.array(sel_pro) / np.sum(sel_pro))
     return [30 * i for i in range(12)][sel_idx]
 
-def get_color_type(h_array):
+def get_color_type(h_array, weights=None, rng=None):
     """
     Determine whether the image has richer hue or brightness.
+
+    Args:
+        h_array (array): hue data.
+        weights (array or None): weights of data. None for unweighted data.
+        rng (RandomState or None): random state. None for global random state.
     """
 
-    sel_pro = [len(np.where((h_array >= 345) | (h_array < 15))[0])] + \
-              [len(np.where((h_array >= i * 30 + 15) & (h_array < i * 30 + 45.0))[0]) for i in range(11)]
+    sel_pro = [count_data((h_array >= 345) | (h_array < 15), weights)] + \
+              [count_data((h_array >= i * 30 + 15) & (h_array < i * 30 + 45.0), weights) for i in range(11)]
 
     sel_max = max(sel_pro)
     sel_pro = [int(i > sel_max * 0.05) for i in sel_pro]
-    sel_pro = 0 if sum(sel_pro) < 2 else random.choice(sel_pro)
+    sel_pro = 0 if sum(sel_pro) < 2 else (random.choice(sel_pro) if rng is None else sel_pro[rng.randint(0, len(sel_pro))])
     return sel_pro * 3
 
-def extract_image(display_data, rand_num, color_type, useryb=False):
+def get_color_hist(display_data, bits=5, band_len=1048576):
+    """
+    Get quantized color histogram of display data. Each bin keeps a pixel in it as the bin color, so that extracted colors could be located in display data.
+
+    Args:
+        display_data (3D array): rgb display data.
+        bits (int): quantized bits of each channel, in 1 ~ 8.
+        band_len (int): max number of pixels counted at once.
+
+    Returns:
+        (rgb colors in shape (n, 3), pixel counts in shape (n,), flat pixel positions in shape (n,)) of non-empty bins.
+    """
+
+    assert 0 < bits <= 8, bits
+    shift = 8 - bits
+    pixels = display_data.reshape(-1, 3)
+    counts = np.zeros(1 << (bits * 3), dtype=np.int64)
+    positions = np.zeros(1 << (bits * 3), dtype=np.int64)
+
+    for start in range(0, len(pixels), band_len):
+        band = pixels[start: start + band_len]
+        packed = (band[:, 0].astype(np.int64) >> shift << (bits * 2)) | (band[:, 1].astype(np.int64) >> shift << bits) | (band[:, 2].astype(np.int64) >> shift)
+        counts += np.bincount(packed, minlength=len(counts))
+        positions[packed] = np.arange(start, start + len(band))
+
+    bins = np.flatnonzero(counts)
+    return pixels[positions[bins]], counts[bins], positions[bins]
+
+def get_color_index(display_data):
+    """
+    Get a sorted index from packed 24-bit rgb values to pixel positions. Index items are packed rgb << 32 | flat pixel position,
+    so that pixels of the same color are in row-major order.
+
+    Args:
+        display_data (3D array): rgb display data.
+
+    Returns:
+        sorted int64 index array.
+    """
+
+    pixels = display_data.reshape(-1, 3)
+    color_index = pixels[:, 0].astype(np.int64) << 48
+    color_index |= pixels[:, 1].astype(np.int64) << 40
+    color_index |= pixels[:, 2].astype(np.int64) << 32
+    color_index |= np.arange(len(pixels), dtype=np.int64)
+    color_index.sort()
+    return color_index
+
+def locate_color(color_index, rgb, tolerance=0):
+    """
+    Locate pixels of a color by color index.
+
+    Args:
+        color_index (array): sorted index from get_color_index.
+        rgb (tuple or array): rgb color.
+        tolerance (int): max difference of each channel. 0 for the exact color.
+
+    Returns:
+        flat pixel positions in ascending order.
+    """
+
+    channels = [np.arange(max(0, int(x) - tolerance), min(255, int(x) + tolerance) + 1, dtype=np.int64) for x in rgb]
+    keys = ((channels[0][:, None, None] << 16) | (channels[1][None, :, None] << 8) | channels[2][None, None, :]).reshape(-1)
+    starts = np.searchsorted(color_index, keys << 32)
+    ends = np.searchsorted(color_index, (keys + 1) << 32)
+    positions = np.concatenate([color_index[i: j] for i, j in zip(starts, ends)]) & 0xFFFFFFFF
+
+    if len(keys) > 1:
+        positions.sort()
+
+    return positions
+
+def get_content_hash(display_data):
+    """
+    Get content hash of display data for keying cached results.
+
+    Args:
+        display_data (array): display data.
+
+    Returns:
+        hex digest string.
+    """
+
+    data = np.ascontiguousarray(display_data)
+    content_hash = hashlib.blake2b(digest_size=16)
+    content_hash.update("{}{}".format(data.shape, data.dtype).encode())
+    content_hash.update(data.data)
+    return content_hash.hexdigest()
+
+def extract_image(display_data, rand_num, color_type, useryb=False, hist=None, color_index=None, rng=None):
     """
     Extract a set of colors in different extract types.
 
     Args:
-        process_scope (tuple or list): in format (start point, total length), e.g. (0, 100).
-        values (tuple or list): (random number, color type).
+        display_data (3D array): rgb display data.
+        rand_num (int): number of sampled pixels, or max number of sampled bins with hist. 0 for all pixels (or bins).
+        color_type (int): extract type in 0 ~ 5. -1 for random type by the image.
+        useryb (bool): if use ryb color space.
+        hist (tuple or None): color histogram of display data from get_color_hist. None for sampling pixels on a mesh.
+        color_index (array, function or None): color index of display data from get_color_index, or a function returning it, which is called only if a color is not located in hist. None for locating extracted colors by scanning display data.
+        rng (RandomState or None): random state for reproducible results. None for global random state.
+    """
+
+    if display_data.shape[0] * display_data.shape[1] < 9:
+        rng = np.random if rng is None else rng
+        return [(rng.random(), rng.random()) for _ in range(5)]
+
+    hsv_data, weights = get_extract_data(display_data, rand_num, 0 if color_type < 0 else color_type, useryb=useryb, hist=hist)
+    rgb_ans = select_extract_colors(hsv_data, weights, color_type, useryb=useryb, rng=rng)
+    return locate_extract_colors(display_data, rgb_ans, hist=hist, color_index=color_index, rng=rng)
+
+def extract_image_candidates(display_data, rand_num, color_type, num, useryb=False, hist=None, color_index=None, rng=None):
+    """
+    Extract candidate sets of colors in one pass. Sampled (or histogram) data are filtered once and shared by all candidates,
+    and only the random hue clustering and selection run for each candidate.
+
+    Args:
+        display_data (3D array): rgb display data.
+        rand_num (int): number of sampled pixels, or max number of sampled bins with hist. 0 for all pixels (or bins).
+        color_type (int): extract type in 0 ~ 5. -1 for random type by the image.
+        num (int): number of candidates.
+        useryb (bool): if use ryb color space.
+        hist (tuple or None): color histogram of display data from get_color_hist. None for sampling pixels on a mesh.
+        color_index (array, function or None): color index of display data from get_color_index, or a function returning it, which is called only if a color is not located in hist. None for locating extracted colors by scanning display data.
+        rng (RandomState or None): random state for reproducible results. None for global random state.
+
+    Returns:
+        list of extracts in descending order of diversity. Repeated color sets are removed.
+    """
+
+    if display_data.shape[0] * display_data.shape[1] < 9:
+        rng = np.random if rng is None else rng
+        return [[(rng.random(), rng.random()) for _ in range(5)] for _ in range(num)]
+
+    hsv_data, weights = get_extract_data(display_data, rand_num, 0 if color_type < 0 else color_type, useryb=useryb, hist=hist)
+    uniq_data = np.unique(hsv_data, axis=0)
+    rgb_sets = []
+    set_keys = set()
+
+    for _ in range(num):
+        rgb_ans = select_extract_colors(hsv_data, weights, color_type, useryb=useryb, uniq_data=uniq_data, rng=rng)
+
+        # colors are compared as whole rows, so sets with channels swapped across colors are not repeated.
+        set_key = tuple(sorted(map(tuple, np.asarray(rgb_ans).tolist())))
+
+        if set_key not in set_keys:
+            set_keys.add(set_key)
+            rgb_sets.append(rgb_ans)
+
+    scores = get_set_diversity(rgb_sets)
+    return [locate_extract_colors(display_data, rgb_sets[idx], hist=hist, color_index=color_index, rng=rng) for idx in np.argsort(-scores, kind="stable")]
+
+def get_set_diversity(rgb_sets):
+    """
+    Get diversity scores of color sets, i.e. mean delta e (cie76) between colors in each set.
+
+    Args:
+        rgb_sets (array): rgb color sets in shape (n, m, 3).
+
+    Returns:
+        score array in shape (n,).
+    """
+
+    lab_sets = Color.rgb2lab_array(np.asarray(rgb_sets, dtype=np.uint8))
+    num = lab_sets.shape[1]
+    return np.sum(delta_e_cie76(lab_sets[:, :, None], lab_sets[:, None, :]), axis=(1, 2)) / max(1, num * (num - 1))
+
+def get_extract_data(display_data, rand_num, color_tp, useryb=False, hist=None):
+    """
+    Get sampled (or histogram) hsv data filtered by extract type.
+
+    Returns:
+        (hsv data, weights). Weights are None for sampled data.
     """
 
-    color_tp = 0 if color_type < 0 else color_type
     image_size = display_data.shape[0] * display_data.shape[1]
+    weights = None
+
+    if hist is not None:
+        data = hist[0]
+        weights = np.array(hist[1], dtype=np.float64)
 
-    if image_size < 9:
-        return [
-            (np.random.random(), np.random.random()),
-            (np.random.random(), np.random.random()),
-            (np.random.random(), np.random.random()),
-            (np.random.random(), np.random.random()),
-            (np.random.random(), np.random.random()),
-        ]
+        if rand_num > 0 and len(data) > rand_num * 1.5:
+            # systematic sampling of bins by pixel counts, so that at most rand_num bins are used as the mesh does for pixels.
+            cum_weights = np.cumsum(weights)
+            samples = np.searchsorted(cum_weights, (np.arange(rand_num) + 0.5) / rand_num * cum_weights[-1], side="right")
+            bins, counts = np.unique(samples.clip(0, len(data) - 1), return_counts=True)
+            data = data[bins]
+            weights = counts.astype(np.float64)
 
-    if rand_num > 0 and image_size > rand_num * 1.5:
+    elif rand_num > 0 and image_size > rand_num * 1.5:
         ratio = np.sqrt(rand_num / image_size)
         rand_num_0 = int(ratio * display_data.shape[0])
         rand_num_1 = int(ratio * display_data.shape[1])
@@ -97,9 +598,11 @@ def extract_image(display_data, rand_num, color_type, useryb=False):
         data = np.vstack(display_data)
 
     if len(data) < 9:
+        weights = None if weights is None else np.tile(weights, 9 // len(data) + 1)
         data = np.vstack([data,] * (9 // len(data) + 1))
 
     hsv_data = Color.rgb2hsv_array(np.array([data,]))[0]
+    total = len(hsv_data) if weights is None else weights.sum()
 
     if len(hsv_data) > 12:
         s_data = hsv_data[:, 1]
@@ -107,17 +610,20 @@ def extract_image(display_data, rand_num, color_type, useryb=False):
         for ext in (0.1, 0.05, 0.01):
             data_pos = np.where(s_data >= ext)
 
-            if len(data_pos[0]) > max(9, len(hsv_data) * 5 * ext):
+            if count_data(s_data >= ext, weights) > max(9, total * 5 * ext):
                 hsv_data = hsv_data[data_pos]
+                weights = None if weights is None else weights[data_pos]
                 break
 
         v_data = hsv_data[:, 2]
+        total = len(hsv_data) if weights is None else weights.sum()
 
         for ext in (0.1, 0.05, 0.01):
             data_pos = np.where(v_data >= ext)
 
-            if len(data_pos[0]) > max(9, len(hsv_data) * 5 * ext):
+            if count_data(v_data >= ext, weights) > max(9, total * 5 * ext):
                 hsv_data = hsv_data[data_pos]
+                weights = None if weights is None else weights[data_pos]
                 break
 
     if len(hsv_data) > 12:
@@ -125,39 +631,52 @@ def extract_image(display_data, rand_num, color_type, useryb=False):
         v_data = hsv_data[:, 2]
         s_range = (s_data.min(), s_data.max(), s_data.max() - s_data.min())
         v_range = (v_data.min(), v_data.max(), v_data.max() - v_data.min())
+        total = len(hsv_data) if weights is None else weights.sum()
 
         for ext in (1.0, 0.8, 0.6, 0.3):
             if color_tp in (0, 3):
-                data_pos = np.where((s_data >= s_range[0] + s_range[2] * 0.3 * ext) & (v_data >= v_range[0] + v_range[2] * 0.3 * ext))
+                selection = (s_data >= s_range[0] + s_range[2] * 0.3 * ext) & (v_data >= v_range[0] + v_range[2] * 0.3 * ext)
 
             elif color_tp in (1, 4):
-                data_pos = np.where((s_data <= s_range[1] - s_range[2] * 0.3 * ext) & (v_data >= v_range[0] + v_range[2] * 0.5 * ext))
+                selection = (s_data <= s_range[1] - s_range[2] * 0.3 * ext) & (v_data >= v_range[0] + v_range[2] * 0.5 * ext)
 
             else:
-                data_pos = np.where(v_data <= v_range[1] - v_range[2] * 0.4 * ext)
+                selection = v_data <= v_range[1] - v_range[2] * 0.4 * ext
 
-            if len(data_pos[0]) > max(9, len(hsv_data) * 0.3 * ext):
+            if count_data(selection, weights) > max(9, total * 0.3 * ext):
+                data_pos = np.where(selection)
                 hsv_data = hsv_data[data_pos]
+                weights = None if weights is None else weights[data_pos]
                 break
 
     if useryb:
         hsv_data = Color.spc_rgb2ryb_array(np.array([hsv_data,]))[0]
 
     if len(hsv_data) < 9:
+        weights = None if weights is None else np.tile(weights, 9 // len(hsv_data) + 1)
         hsv_data = np.vstack([hsv_data,] * (9 // len(hsv_data) + 1))
 
+    return hsv_data, weights
+
+def select_extract_colors(hsv_data, weights, color_type, useryb=False, uniq_data=None, rng=None):
+    """
+    Select a set of five colors from filtered hsv data by random hue clustering.
+
+    Returns:
+        rgb colors in shape (5, 3).
+    """
+
+    color_tp = 0 if color_type < 0 else color_type
     h_data = hsv_data[:, 0]
-    h_ref = get_h_ref(h_data)
+    h_ref = get_h_ref(h_data, weights, rng=rng)
 
     if color_type < 0:
-        color_tp = get_color_type(h_data)
+        color_tp = get_color_type(h_data, weights, rng=rng)
 
-    h_data = Color((h_ref, 1, 1), tp=CTP.hsv).ref_h_array(h_data)
-    hsv_data[:, 0] = h_data
-    h_centers = get_centers(h_data, 5)
-    hsv_data = np.unique(hsv_data, axis=0)
+    h_centers = get_hue_centers(h_data, 5, weights=weights, h_ref=h_ref)
+    hsv_data = np.unique(hsv_data, axis=0) if uniq_data is None else uniq_data
     h_data = hsv_data[:, 0]
-    h_labels = np.argmin(np.abs(h_data[:, None] - h_centers), axis=1)
+    h_labels = np.argmin(get_hue_dist(h_data[:, None], h_centers), axis=1)
 
     if color_tp < 3:
         data_comb = []
@@ -194,9 +713,9 @@ def extract_image(display_data, rand_num, color_type, useryb=False):
         else:
             h_sel = hsv_data
 
-        hsv_ans = [h_sel[np.argmin(np.abs(h_sel[:, 0] - h_centers[i]))] for i in range(5)]
+        hsv_ans = [h_sel[np.argmin(get_hue_dist(h_sel[:, 0], h_centers[i]))] for i in range(5)]
     else:
-        hsv_sel = hsv_data[np.where(h_labels == np.random.randint(0, 5))]
+        hsv_sel = hsv_data[np.where(h_labels == (np.random if rng is None else rng).randint(0, 5))]
 
         if len(hsv_sel) < 9:
             if len(hsv_data) > 9:
@@ -218,34 +737,394 @@ def extract_image(display_data, rand_num, color_type, useryb=False):
         hsv_ans = [hsv_sel[np.argmin(np.abs(sv_sel - sv_centers[i]))] for i in range(5)]
 
     hsv_ans = np.array(hsv_ans)
-    hsv_ans[:, 0] = hsv_ans[:, 0] + h_ref
 
     if useryb:
         hsv_ans = Color.spc_ryb2rgb_array(np.array([hsv_ans,]))[0]
 
     rgb_ans = Color.hsv2rgb_array(np.array([hsv_ans,]))[0]
+    return rgb_ans
+
+def locate_extract_colors(display_data, rgb_ans, hist=None, color_index=None, rng=None):
+    """
+    Locate extracted colors in display data.
+
+    Returns:
+        list of relative locations (x, y).
+    """
+
+    rng = np.random if rng is None else rng
     extracts = []
 
-    for idx in range(5):
+    for idx in range(len(rgb_ans)):
         sample = rgb_ans[idx]
-        sample_pos = np.where(
-            (display_data[:, :, 0] == sample[0]) & \
-            (display_data[:, :, 1] == sample[1]) & \
-            (display_data[:, :, 2] == sample[2])
-        )
+        sample_pos = None
+
+        if hist is not None:
+            # extracted colors are usually bin colors, which are located in O(bins) instead of O(pixels).
+            positions = hist[2][np.where((hist[0] == sample).all(axis=1))[0][:1]]
+
+            if len(positions) > 0:
+                sample_pos = (positions // display_data.shape[1], positions % display_data.shape[1])
+
+        if sample_pos is None and color_index is not None:
+            # color index could be built lazily, only if a color is not located in histogram.
+            color_index = color_index() if callable(color_index) else color_index
+            positions = locate_color(color_index, sample)
 
-        if len(sample_pos) < 1:
+            if len(positions) < 1:
+                positions = locate_color(color_index, sample, tolerance=2)
+
+            sample_pos = (positions // display_data.shape[1], positions % display_data.shape[1])
+
+        if sample_pos is None:
+            sample_pos = np.where(
+                (display_data[:, :, 0] == sample[0]) & \
+                (display_data[:, :, 1] == sample[1]) & \
+                (display_data[:, :, 2] == sample[2])
+            )
+
+        if len(sample_pos[0]) < 1 and color_index is None:
+            sample = sample.astype(int)
             sample_pos = np.where(
                 (display_data[:, :, 0] > sample[0] - 3) & (display_data[:, :, 0] < sample[0] + 3) & \
                 (display_data[:, :, 1] > sample[1] - 3) & (display_data[:, :, 1] < sample[1] + 3) & \
                 (display_data[:, :, 2] > sample[2] - 3) & (display_data[:, :, 2] < sample[2] + 3)
             )
 
-        if len(sample_pos) > 0:
-            pos = int(np.random.random() * len(sample_pos[0]))
+        if len(sample_pos[0]) > 0:
+            pos = int(rng.random() * len(sample_pos[0]))
             extracts.append((sample_pos[1][pos] / (display_data.shape[1] - 1), sample_pos[0][pos] / (display_data.shape[0] - 1)))
 
         else:
-            extracts.append((np.random.random(), np.random.random()))
+            extracts.append((rng.random(), rng.random()))
 
     return extracts
+
+
+class TestImageAct(unittest.TestCase):
+    """
+    Test image actions.
+    """
+
+    @classmethod
+    def loop_rgb_edge(cls, rgb_ext_data, vertical=True):
+        if vertical:
+            kernel = [[[-1, -1, -1], [0, 0, 0], [1, 1, 1]], [[-2, -2, -2], [0, 0, 0], [2, 2, 2]], [[-1, -1, -1], [0, 0, 0], [1, 1, 1]]]
+
+        else:
+            kernel = [[[-1, -1, -1], [-2, -2, -2], [-1, -1, -1]], [[0, 0, 0], [0, 0, 0], [0, 0, 0]], [[1, 1, 1], [2, 2, 2], [1, 1, 1]]]
+
+        edge = np.zeros((rgb_ext_data.shape[0] - 2, rgb_ext_data.shape[1] - 2, 3), dtype=np.uint8)
+
+        for i in range(edge.shape[0]):
+            for j in range(edge.shape[1]):
+                rgb_result = rgb_ext_data[i:i + 3, j:j + 3, :] * kernel
+                rgb_result = rgb_result.sum(axis=(0, 1)) / 4
+                edge[i][j] = np.abs(rgb_result).astype(np.uint8)
+
+        return edge
+
+    @classmethod
+    def loop_hsv_edge(cls, hsv_ext_data, vertical=True):
+        if vertical:
+            kernel = [[[-1, -1], [0, 0], [1, 1]], [[-2, -2], [0, 0], [2, 2]], [[-1, -1], [0, 0], [1, 1]]]
+
+        else:
+            kernel = [[[-1, -1], [-2, -2], [-1, -1]], [[0, 0], [0, 0], [0, 0]], [[1, 1], [2, 2], [1, 1]]]
+
+        edge = np.zeros((hsv_ext_data.shape[0] - 2, hsv_ext_data.shape[1] - 2, 3), dtype=np.uint8)
+
+        for i in range(edge.shape[0]):
+            for j in range(edge.shape[1]):
+                if vertical:
+                    h_results = [abs(hsv_ext_data[i + k][j + 2][0] - hsv_ext_data[i + k][j][0]) for k in range(3)]
+
+                else:
+                    h_results = [abs(hsv_ext_data[i + 2][j + k][0] - hsv_ext_data[i][j + k][0]) for k in range(3)]
+
+                h_results = [360.0 - h if h > 180.0 else h for h in h_results]
+                h_result = h_results[0] + h_results[1] * 2 + h_results[2]
+                sv_result = hsv_ext_data[i:i + 3, j:j + 3, 1:3] * kernel
+                sv_result = sv_result.sum(axis=(0, 1)).astype(np.float32)
+                edge[i][j] = np.array((h_result * 0.3542, abs(sv_result[0]) * 63.75, abs(sv_result[1]) * 63.75), dtype=np.uint8)
+
+        return edge
+
+    @classmethod
+    def array_enhance_rgb(cls, rgb_data, reg, separ, fact, sigma, onedir):
+        rgb_data = np.array(rgb_data, dtype=np.uint8)
+
+        for k, k_separ, k_fact in zip(reg, separ, fact):
+            if abs(k_fact) < 1E-3:
+                continue
+
+            data = np.array(rgb_data[:, :, k], dtype=np.float32)
+
+            if sigma == 0.0:
+                expd = np.zeros(data.shape)
+                expd[np.where((data < k_separ + 1) & (data > k_separ - 1))] = k_fact
+
+            elif sigma == 1.0:
+                expd = np.ones(data.shape) * k_fact
+
+            else:
+                expd = 0.001 * (10 ** (4.5 * sigma)) * -1
+                expd = np.exp(((data - k_separ) / 255.0) ** 2 / expd) * k_fact
+
+            if onedir:
+                data = data + expd * 255.0
+
+            else:
+                expd = np.abs(expd)
+                selection = np.where(data >= k_separ) if k_separ < 125 else np.where(data > k_separ)
+                data = data * (1.0 - expd)
+                data[selection] = data[selection] + expd[selection] * 255.0
+
+            data[np.where(data < 0)] = 0
+            data[np.where(data > 255)] = 255
+            rgb_data[:, :, k] = np.array(data, dtype=np.uint8)
+
+        return rgb_data
+
+    @classmethod
+    def rand_hsv_ext(cls, hig, wid, seed=0):
+        rgb_data = np.random.RandomState(seed).randint(0, 256, (hig, wid, 3)).astype(np.uint8)
+        return np.pad(Color.rgb2hsv_array(rgb_data), ((1, 1), (1, 1), (0, 0)), mode="reflect")
+
+    @classmethod
+    def rand_rgb_ext(cls, hig, wid, seed=0):
+        rgb_data = np.random.RandomState(seed).randint(0, 256, (hig, wid, 3)).astype(np.uint8)
+        return np.pad(rgb_data, ((1, 1), (1, 1), (0, 0)), mode="reflect")
+
+    def test_rgb_edge(self):
+        for hig, wid in ((1, 1), (2, 3), (7, 5), (64, 48)):
+            rgb_ext_data = self.rand_rgb_ext(hig, wid)
+
+            for vertical in (True, False):
+                edge = get_rgb_edge(rgb_ext_data, vertical=vertical)
+                self.assertEqual(edge.dtype, np.uint8)
+                self.assertTrue((edge == self.loop_rgb_edge(rgb_ext_data, vertical=vertical)).all())
+
+    def test_hsv_edge(self):
+        for hig, wid in ((1, 1), (2, 3), (7, 5), (64, 48)):
+            hsv_ext_data = self.rand_hsv_ext(hig, wid)
+
+            for vertical in (True, False):
+                edge = get_hsv_edge(hsv_ext_data, vertical=vertical)
+                self.assertEqual(edge.dtype, np.uint8)
+                self.assertTrue((edge == self.loop_hsv_edge(hsv_ext_data, vertical=vertical)).all())
+
+    def test_ext_data(self):
+        rs = np.random.RandomState(3)
+
+        for shape in ((5, 5), (9, 7), (31, 17)):
+            rgb_data = (rs.rand(*shape, 3) * 255).astype(np.uint8)
+            hsv_data = Color.rgb2hsv_array(rgb_data)
+            rgb_ext_data = np.pad(rgb_data, ((1, 1), (1, 1), (0, 0)), mode="reflect")
+            self.assertTrue(np.array_equal(get_ext_data(rgb_data), rgb_ext_data))
+
+            for vertical in (True, False):
+                for step in (1, 2, 4):
+                    rgb_edge = np.concatenate([get_rgb_edge(get_ext_data(rgb_data, i, min(i + step, shape[0])), vertical=vertical) for i in range(0, shape[0], step)])
+                    hsv_edge = np.concatenate([get_hsv_edge(get_ext_data(hsv_data, i, min(i + step, shape[0])), vertical=vertical) for i in range(0, shape[0], step)])
+                    self.assertTrue(np.array_equal(rgb_edge, get_rgb_edge(rgb_ext_data, vertical=vertical)))
+                    self.assertTrue(np.array_equal(hsv_edge, get_hsv_edge(get_ext_data(hsv_data), vertical=vertical)))
+
+    def test_enhance_lut(self):
+        rs = np.random.RandomState(5)
+        rgb_data = rs.randint(0, 256, (64, 48, 3)).astype(np.uint8)
+        rgb_data[:16, :16] = np.arange(256, dtype=np.uint8).reshape(16, 16, 1)
+
+        for sigma in (0.0, 0.2, 0.5, 0.8, 1.0):
+            for onedir in (True, False):
+                for reg, separ, fact in (((0, 1, 2), (0, 124.6, 255), (0.3, -0.2, 1E-4)), ((1,), (125.0,), (0.8,)), ((2, 2), (60, 200), (0.5, -0.6))):
+                    lut = get_enhance_lut(reg, separ, fact, sigma, onedir)
+                    self.assertEqual(lut.dtype, np.uint8)
+                    data = np.stack([lut[k][rgb_data[:, :, k]] for k in range(3)], axis=2)
+                    self.assertTrue(np.array_equal(data, self.array_enhance_rgb(rgb_data, reg, separ, fact, sigma, onedir)))
+
+    def test_color_hist(self):
+        rgb_data = np.random.RandomState(7).randint(0, 256, (37, 29, 3)).astype(np.uint8)
+
+        for bits in (3, 5, 8):
+            colors, counts, positions = get_color_hist(rgb_data, bits=bits, band_len=100)
+            self.assertEqual(counts.sum(), 37 * 29)
+            packed = [tuple(x >> (8 - bits)) for x in rgb_data.reshape(-1, 3)]
+            self.assertEqual(sorted(counts.tolist()), sorted([packed.count(x) for x in set(packed)]))
+            self.assertTrue(np.array_equal(colors, rgb_data.reshape(-1, 3)[positions]))
+
+    def test_extract_hist(self):
+        rgb_data = np.random.RandomState(9).randint(0, 256, (64, 48, 3)).astype(np.uint8)
+        rgb_data[:32] = rgb_data[:32] // 4
+        hist = get_color_hist(rgb_data)
+
+        for color_type in range(-1, 6):
+            for useryb in (False, True):
+                extracts = extract_image(rgb_data, 0, color_type, useryb=useryb, hist=hist)
+                self.assertEqual(len(extracts), 5)
+
+                for pos in extracts:
+                    self.assertTrue(0.0 <= pos[0] <= 1.0 and 0.0 <= pos[1] <= 1.0)
+
+        for rand_num in (0, 50, 500):
+            hsv_data, weights = get_extract_data(rgb_data, rand_num, 0, hist=hist)
+            self.assertLessEqual(len(hsv_data), rand_num if rand_num else len(hist[0]))
+
+    def test_extract_hist_benchmark(self):
+        for hig, wid in ((120, 160), (2160, 3840)):
+            rgb_data = np.random.RandomState(0).randint(0, 256, (hig, wid, 3)).astype(np.uint8)
+            hist = get_color_hist(rgb_data)
+            start = time.perf_counter()
+
+            for color_type in range(6):
+                extract_image(rgb_data, 200000, color_type, hist=hist)
+
+            cost_hist = (time.perf_counter() - start) / 6
+            start = time.perf_counter()
+
+            for color_type in range(6):
+                extract_image(rgb_data, 200000, color_type)
+
+            cost_mesh = (time.perf_counter() - start) / 6
+            print("extract {}x{}: mesh {:.4f} s, hist {:.4f} s per extract.".format(wid, hig, cost_mesh, cost_hist))
+
+    def test_color_index(self):
+        rgb_data = (np.random.RandomState(11).randint(0, 256, (41, 53, 3)) // 16 * 16).astype(np.uint8)
+        color_index = get_color_index(rgb_data)
+
+        for rgb in ((0, 0, 0), (255, 255, 255), (17, 33, 2), tuple(rgb_data[5, 7])):
+            for tolerance in (0, 2, 16):
+                positions = np.flatnonzero((np.abs(rgb_data.reshape(-1, 3).astype(int) - rgb) <= tolerance).all(axis=1))
+                self.assertTrue(np.array_equal(locate_color(color_index, rgb, tolerance=tolerance), positions))
+
+        for color_type in range(-1, 6):
+            extracts = []
+
+            for index in (None, color_index):
+                random.seed(color_type + 2)
+                np.random.seed(color_type + 2)
+                extracts.append(extract_image(rgb_data, 300, color_type, color_index=index))
+
+            self.assertEqual(extracts[0], extracts[1])
+        calls = []
+        hist = get_color_hist(rgb_data)
+        extract_image(rgb_data, 0, 0, hist=hist, color_index=lambda: calls.append(1) or color_index)
+        self.assertEqual(calls, [])
+        empty_hist = (np.zeros((0, 3), dtype=np.uint8), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        extracts = locate_extract_colors(rgb_data, rgb_data[3:4, 5], hist=empty_hist, color_index=lambda: calls.append(1) or color_index)
+        self.assertEqual(calls, [1])
+        self.assertTrue((rgb_data[int(round(extracts[0][1] * 40)), int(round(extracts[0][0] * 52))] == rgb_data[3, 5]).all())
+
+    @classmethod
+    def loop_centers(cls, data, k, max_iters=100):
+        sep = len(data) // k
+        centers = data[int(sep / 2)::sep][:k]
+
+        for _ in range(max_iters):
+            labels = np.argmin(np.abs(data[:, None] - centers), axis=1)
+            new_centers = np.array([np.mean(data[labels == i]) if len(data[labels == i]) else 0 for i in range(k)])
+
+            if np.all(centers == new_centers):
+                break
+
+            centers = new_centers
+
+        return centers
+
+    def test_centers(self):
+        rs = np.random.RandomState(13)
+
+        for _ in range(50):
+            data = np.hstack([rs.normal(rs.uniform(0, 300), rs.uniform(1, 30), rs.randint(5, 200)) for _ in range(rs.randint(1, 6))])
+            self.assertTrue(np.allclose(get_centers(data, 5), self.loop_centers(data, 5)))
+            # discrete data with ties and repeated centers.
+            data = rs.randint(0, rs.randint(2, 12), rs.randint(5, 300)).astype(np.float32)
+            self.assertTrue(np.allclose(get_centers(data, 5), self.loop_centers(data, 5)))
+
+        data = np.hstack([rs.normal(0, 1, 100), rs.normal(10, 1, 100), rs.normal(20, 1, 100)])
+        centers = get_centers(data, 3, n_init=8, rng=np.random.RandomState(0))
+        self.assertTrue(np.allclose(centers, [data[:100].mean(), data[100:200].mean(), data[200:].mean()]))
+
+        h_data = np.mod(np.hstack([rs.normal(0, 5, 200), rs.normal(120, 5, 100)]), 360.0)
+
+        for h_ref in (0, 90, 180, 270):
+            h_centers = get_hue_centers(h_data, 2, h_ref=h_ref, n_init=4, rng=np.random.RandomState(h_ref))
+            self.assertLess(min(get_hue_dist(h_centers, 0.0)), 2.0)
+            self.assertLess(min(get_hue_dist(h_centers, 120.0)), 2.0)
+
+        # hue centers keep the order of initial centers, i.e. ascending from h_ref - 180.
+        h_data = np.mod(np.hstack([rs.normal(h, 4, 50) for h in (10, 80, 150, 220, 290)]), 360.0)
+
+        for h_ref in (0, 45, 100, 200, 330):
+            h_centers = get_hue_centers(h_data, 5, h_ref=h_ref)
+            self.assertTrue((np.diff(np.mod(h_centers - h_ref + 180.0, 360.0)) > 0).all())
+
+    def test_extract_candidates(self):
+        rgb_data = np.random.RandomState(17).randint(0, 256, (64, 48, 3)).astype(np.uint8)
+        rgb_data[:32] = rgb_data[:32] // 4
+        hist = get_color_hist(rgb_data)
+        color_index = get_color_index(rgb_data)
+
+        for color_type in range(-1, 6):
+            candidates = extract_image_candidates(rgb_data, 0, color_type, 6, hist=hist, color_index=color_index)
+            self.assertTrue(0 < len(candidates) <= 6)
+            rgb_sets = [[rgb_data[int(round(y * 63)), int(round(x * 47))] for x, y in extracts] for extracts in candidates]
+            scores = get_set_diversity(rgb_sets)
+            self.assertTrue((scores[:-1] >= scores[1:]).all())
+
+        rgb_sets = [np.array([[10, 200, 30], [250, 20, 90]] * 2 + [[0, 0, 0]], dtype=np.uint8), np.array([[10, 20, 30], [250, 200, 90]] * 2 + [[0, 0, 0]], dtype=np.uint8)]
+        rgb_sets.append(rgb_sets[0][::-1].copy())
+
+        with unittest.mock.patch(__name__ + ".select_extract_colors", side_effect=lambda *args, **kwargs: rgb_sets.pop(0)):
+            candidates = extract_image_candidates(rgb_data, 0, 0, 3)
+
+        self.assertEqual(len(candidates), 2)
+
+    def test_seeded_extract(self):
+        rgb_data = np.random.RandomState(19).randint(0, 256, (64, 48, 3)).astype(np.uint8)
+        hist = get_color_hist(rgb_data)
+
+        for color_type in range(-1, 6):
+            extracts = [extract_image_candidates(rgb_data, 0, color_type, 4, hist=hist, rng=np.random.RandomState(seed)) for seed in (7, 7, 8)]
+            self.assertEqual(extracts[0], extracts[1])
+            self.assertEqual(extract_image(rgb_data, 300, color_type, rng=np.random.RandomState(3)), extract_image(rgb_data, 300, color_type, rng=np.random.RandomState(3)))
+
+        self.assertEqual(get_content_hash(rgb_data), get_content_hash(rgb_data.copy()))
+        self.assertNotEqual(get_content_hash(rgb_data), get_content_hash(rgb_data.reshape(48, 64, 3)))
+
+    def test_enhance_lut_benchmark(self):
+        rgb_data = np.random.RandomState(0).randint(0, 256, (1200, 1600, 3)).astype(np.uint8)
+        args = ((0, 1, 2), (80, 120, 160), (0.3, 0.3, 0.3), 0.5, False)
+        start = time.perf_counter()
+        self.array_enhance_rgb(rgb_data, *args)
+        cost_array = time.perf_counter() - start
+        start = time.perf_counter()
+        lut = get_enhance_lut(*args)
+        data = np.empty_like(rgb_data)
+
+        for k in range(3):
+            data[:, :, k] = lut[k][rgb_data[:, :, k]]
+
+        cost_lut = time.perf_counter() - start
+        print("enhance rgb: array {:.4f} s, lut {:.4f} s per megapixel.".format(cost_array / 1.92, cost_lut / 1.92))
+
+    def test_rgb_edge_benchmark(self):
+        for name, func, hig, wid in (("loop", self.loop_rgb_edge, 120, 160), ("array", get_rgb_edge, 1200, 1600)):
+            rgb_ext_data = self.rand_rgb_ext(hig, wid)
+            start = time.perf_counter()
+            func(rgb_ext_data, vertical=True)
+            func(rgb_ext_data, vertical=False)
+            cost = (time.perf_counter() - start) / 2
+            print("rgb edge ({}): {:.4f} s per megapixel.".format(name, cost * 1E6 / (hig * wid)))
+
+    def test_hsv_edge_benchmark(self):
+        for name, func, hig, wid in (("loop", self.loop_hsv_edge, 120, 160), ("array", get_hsv_edge, 1200, 1600)):
+            hsv_ext_data = self.rand_hsv_ext(hig, wid)
+            start = time.perf_counter()
+            func(hsv_ext_data, vertical=True)
+            func(hsv_ext_data, vertical=False)
+            cost = (time.perf_counter() - start) / 2
+            print("hsv edge ({}): {:.4f} s per megapixel.".format(name, cost * 1E6 / (hig * wid)))
+
+if __name__ == "__main__":
+    unittest.main()
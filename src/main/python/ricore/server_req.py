@@ -15,7 +15,9 @@ Copyright (c) 2019-2023 by Eigenmiao. All Rights Reserved.
 
 import os
 import time
+from ricore.color import Color
 from ricore.export import get_export_color_list
+from ricore.distance import PaletteIndex
 from socketserver import BaseRequestHandler
 
 
@@ -117,9 +119,9 @@ class Request(BaseRequestHandler):
             text = ""
             text += "{}; ".format(rule)
             text += "{}; ".format(self.args.sys_activated_idx)
-            text += "{}; ".format(" ".join([i.hec for i in main_color_list]))
+            text += "{}; ".format(" ".join(main_color_list.hec))
             text += "{}; ".format(self.args.sys_grid_values["col"])
-            text += "{}; ".format(" ".join([i.hec for i in grid_color_list]))
+            text += "{}; ".format(" ".join(grid_color_list.hec))
 
             if self.args.sys_grid_list[0]:
                 text += " ".join(['"{}"'.format(i) for i in grid_cname_list])
@@ -129,6 +131,30 @@ class Request(BaseRequestHandler):
             self.request.sendall(text.encode("utf-8"))
             self.args.d_info(802, text)
 
+        elif req == "near":
+            text = self.request.recv(1024)
+            text = text.decode("utf-8")
+            self.args.d_info(801, text)
+            text = text.split("; ")
+            ids = []
+
+            try:
+                k = int(text[0]) if text[0] else 1
+                hec_list = Color.findall_hec_lst(text[1])
+                index = PaletteIndex.from_color_sets([getattr(unit_cell, "color_set", ()) for unit_cell in self.args.stab_ucells])
+
+                if len(hec_list) == 5 and k > 0 and len(index):
+                    lab_set = Color.rgb2lab_array(Color.hec2rgb_array(hec_list))
+                    ids = index.query(lab_set, k=k, method=text[2] if len(text) > 2 and text[2] in PaletteIndex.methods else "cie76")[0].tolist()
+
+            except Exception as err:
+                self.args.d_error(801, err)
+
+            text = " ".join([str(i) for i in ids])
+            text = "{:10d}".format(len(text)) + text
+            self.request.sendall(text.encode("utf-8"))
+            self.args.d_info(802, text)
+
         elif req == "exit":
             text = self.request.recv(1)
             text = text.decode("utf-8")
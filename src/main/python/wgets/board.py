@@ -961,13 +961,7 @@ class Board(QWidget):
 
         else:
             self._show_points = False
-            grid_list = [[], ["",] * self._args.sys_grid_values["col"] ** 2]
-            color_grid = self._color_grid.tolist()
-
-            for i in range(len(color_grid)):
-                for j in range(len(color_grid[i])):
-                    grid_list[0].append(Color.rgb2hec(color_grid[i][j]))
-
+            grid_list = [Color.rgb2hec_array(self._color_grid).reshape(-1).tolist(), ["",] * self._args.sys_grid_values["col"] ** 2]
             self._args.sys_grid_list = grid_list
         self._selecting_idx = -1
         self._last_selecting_idx = -1
@@ -23,8 +23,9 @@ from PyQt5.QtCore import Qt, pyqtSignal, QCoreApplication, QMimeData, QPoint, QU
 from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QCursor, QKeySequence, QPixmap, QIcon, QDrag
 from cguis.design.info_dialog import Ui_InfoDialog
 from cguis.resource import view_rc
-from ricore.color import Color, CTP
+from ricore.color import Color, ColorArray, CTP
 from ricore.export import export_list
+from ricore.distance import PaletteIndex
 from ricore.transpt import get_link_tag
 from ricore.grid import norm_grid_locations, norm_grid_list, norm_grid_values
 from ricore.check import check_image_desc, fmt_im_time
@@ -306,16 +307,21 @@ class UnitCell(QWidget):
         self.update_colors(hsv_set, hm_rule, grid_locations, grid_assitlocs, grid_list, grid_values, update_time=False)
 
     def update_colors(self, hsv_set, hm_rule, grid_locations, grid_assitlocs, grid_list, grid_values, update_time=True):
-        self.color_set = []
+        if hsv_set and all(isinstance(hsv, (tuple, list, np.ndarray)) for hsv in hsv_set):
+            self.color_set = ColorArray(hsv_set, tp=CTP.hsv)
 
-        for hsv in hsv_set:
-            if isinstance(hsv, (tuple, list, np.ndarray)):
-                self.color_set.append(Color(hsv, tp=CTP.hsv))
+        else:
+            self.color_set = []
 
-            else:
-                self.color_set.append(None)
+            for hsv in hsv_set:
+                if isinstance(hsv, (tuple, list, np.ndarray)):
+                    self.color_set.append(Color(hsv, tp=CTP.hsv))
+
+                else:
+                    self.color_set.append(None)
+
+            self.color_set = tuple(self.color_set)
 
-        self.color_set = tuple(self.color_set)
         self.hm_rule = str(hm_rule)
 
         if hsv_set:
@@ -1157,6 +1163,29 @@ class Depot(QWidget):
 
         self.update()
 
+    def nearest_sets(self, color_set, k=1, method="cie76"):
+        """
+        Find k color sets in depot nearest to a color set.
+
+        Args:
+            color_set (tuple or list): five colors in Color type, e.g. self._args.sys_color_set.
+            k (int): number of nearest color sets.
+            method (str): delta e method, "cie76" or "ciede2000".
+
+        Returns:
+            indexes of color sets in depot and their distances, from near to far.
+        """
+
+        index = PaletteIndex.from_color_sets([getattr(unit_cell, "color_set", ()) for unit_cell in self._args.stab_ucells])
+
+        if not len(index):
+            return [], []
+
+        lab_set = Color.rgb2lab_array(np.array([color.rgb for color in color_set], dtype=np.uint8))
+        ids, dists = index.query(lab_set, k=k, method=method)
+
+        return ids.tolist(), dists.tolist()
+
     def clipboard_in(self):
         """
         Load depot from clipboard.
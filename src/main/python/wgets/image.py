@@ -52,7 +52,6 @@ class Image(QWidget):
         self._args = args
         self._categories = set()
         self._start_pt = None
-        self._enhance_lock = False
         self._home_image = False
         self._croping_img = False
         self._croping_img_loc = None
@@ -74,13 +73,16 @@ class Image(QWidget):
         self._ico = None
         self.init_icon()
         self._ico_label = QLabel(self)
-        self.image3c = Image3C(self._args.global_temp_dir, (self._args.d_error, self._args.d_info, self._args.d_action))
+        self.image3c = Image3C(self._args.global_temp_dir, (self._args.d_error, self._args.d_info, self._args.d_action), cache_size=self._args.image_cache_size, cache_spill=self._args.image_cache_spill, tile_size=self._args.image_tile_size, tile_memmap=self._args.image_tile_memmap, workers=self._args.image_workers, precompute=self._args.image_precompute)
         self.image3c.ps_describe.connect(self.update_loading_label)
         self.image3c.ps_proceses.connect(self.update_loading_bar)
         self.image3c.ps_finished.connect(self.loading_finished)
+        self.image3c.ps_precomputed.connect(self.precompute_finished)
         self.image3c.ps_enhanced.connect(self.enhance_finished)
         self.image3c.ps_extracts.connect(self.extract_finished)
         self._outer_circles = None
+        self._extract_candidates = []
+        self._extract_candidate_idx = 0
         self.create_menu()
         self.update_action_text()
 
@@ -130,7 +132,9 @@ class Image(QWidget):
             self._tip_label.hide()
 
             if not self.image3c.display:
-                self.image3c.load_image(self._args.sys_category, self._args.sys_channel)
+                if not self.image3c.load_image(self._args.sys_category, self._args.sys_channel):
+                    self._categories.discard(self._args.sys_category * 10 + self._args.sys_channel)
+                    self.image3c.submit(self._args.sys_category)
 
             else:
                 if not isinstance(self._resized_img_pos, np.ndarray):
@@ -847,8 +851,9 @@ class Image(QWidget):
         if not (self.isVisible() and self.image3c.display):
             return
 
-        if self._home_image:
-            self.image3c.load_image(self._args.sys_category, self._args.sys_channel)
+        if self._home_image and not self.image3c.load_image(self._args.sys_category, self._args.sys_channel):
+            self.update()
+            return
 
         img_wid = int(self.image3c.display.size().width())
         img_hig = int(self.image3c.display.size().height())
@@ -892,14 +897,12 @@ class Image(QWidget):
         if script and (not self.image3c.img_data):
             return
 
-        if self.image3c.isRunning() or self._enhance_lock:
-            self.warning(self._image_errs[1])
-            return
-
         if not self._args.check_temp_dir():
             self.warning(self._image_errs[2])
             return
 
+        self.image3c.cancel_jobs()
+
         if not isinstance(script, tuple):
             if direct:
                 img_data = image
@@ -936,21 +939,18 @@ class Image(QWidget):
         self.image3c.res_display_data = None
         self.image3c.rev_display_data = None
         self.image3c.rgb_data = None
+        self._extract_candidates = []
         self.image3c.hsv_data = None
 
         if isinstance(script, tuple):
             if script[0] in ("ZOOM", "CROP"):
                 self._resized_img_pos = None
 
-            self.image3c.run_args = script
-            self.image3c.run_category = "init"
-            self.image3c.start()
+            self.image3c.submit("init", script)
 
         else:
             self._resized_img_pos = None
-            self.image3c.run_args = None
-            self.image3c.run_category = "init"
-            self.image3c.start()
+            self.image3c.submit("init")
 
         self.ps_history_backup.emit(True)
         self.update()
@@ -971,19 +971,15 @@ class Image(QWidget):
             self.warning(self._image_errs[2])
             return
 
-        if self._enhance_lock:
-            self.ps_recover_channel.emit(True)
-            self.warning(self._image_errs[1])
-            return
-
+        # jobs reading display data are cancelled and awaited before display data are reset.
+        self.image3c.cancel_jobs(("enhance", "extract"))
         self.image3c.display = None
         self.image3c.ori_display_data = None
         self.image3c.res_display_data = None
         self.image3c.rev_display_data = None
 
         if self._args.sys_category * 10 + self._args.sys_channel not in self._categories:
-            self.image3c.run_category = self._args.sys_category
-            self.image3c.start()
+            self.image3c.submit(self._args.sys_category)
 
         self.update()
 
@@ -995,14 +991,20 @@ class Image(QWidget):
         if not (self.isVisible() and self.image3c.display):
             return
 
-        if self.image3c.isRunning():
-            self.warning(self._image_errs[1])
+        seed = None if self._args.extract_seed < 0 else self._args.extract_seed
+        self.image3c.submit("extract", (self._args.rand_num, values, self._args.dep_wtp, self._args.extract_num, seed))
+        self.update()
+
+    def switch_extract(self, step):
+        """
+        Switch to previous or next extracted candidate color set.
+        """
+
+        if not (self.isVisible() and self.image3c.display and self._extract_candidates):
             return
 
-        self.image3c.run_args = (self._args.rand_num, values, self._args.dep_wtp)
-        self.image3c.run_category = "extract"
-        self.image3c.start()
-        self.update()
+        self._extract_candidate_idx = (self._extract_candidate_idx + step) % len(self._extract_candidates)
+        self.apply_extract(self._extract_candidates[self._extract_candidate_idx])
 
     def enhance_image(self, values):
         """
@@ -1012,10 +1014,6 @@ class Image(QWidget):
         if not (self.isVisible() and self.image3c.display):
             return
 
-        if self.image3c.isRunning():
-            self.warning(self._image_errs[1])
-            return
-
         if values[0][:5] == "cover":
             cb_filter = "{} (*.png *.bmp *.jpg *.jpeg *.tif *.tiff *.webp);; {} (*.png);; {} (*.bmp);; {} (*.jpg *.jpeg);; {} (*.tif *.tiff);; {} (*.webp)".format(*self._extend_descs)
             cb_file = QFileDialog.getOpenFileName(None, self._open_descs[3], self._args.usr_image, filter=cb_filter)
@@ -1027,10 +1025,7 @@ class Image(QWidget):
             else:
                 return
 
-        self._enhance_lock = True
-        self.image3c.run_args = values[1:]
-        self.image3c.run_category = values[0]
-        self.image3c.start()
+        self.image3c.submit(values[0], tuple(values[1:]))
         self.update()
 
     def cancel_croping_or_locating(self):
@@ -1056,10 +1051,6 @@ class Image(QWidget):
         if self._locating_img:
             return
 
-        if self.image3c.isRunning() or self._enhance_lock:
-            self.warning(self._image_errs[1])
-            return
-
         if value:
             if isinstance(self._croping_img_loc, tuple) and self._croping_img == 2:
                 revised_croping_value = self.get_revised_croping_in_img()
@@ -1088,10 +1079,6 @@ class Image(QWidget):
         if not (self.isVisible() and self.image3c.display and isinstance(self.image3c.rgb_data, np.ndarray)):
             return
 
-        if self.image3c.isRunning():
-            self.warning(self._image_errs[1])
-            return
-
         if self._croping_img:
             return
 
@@ -1111,8 +1098,7 @@ class Image(QWidget):
                             separ.append(rgb[i])
                             fact.append((self._args.sys_color_set[self._args.sys_activated_idx].rgb[i] - rgb[i]) / 255.0)
 
-                        self.image3c.run_args = ((0, 1, 2), tuple(separ), tuple(fact), value[1], value[2], True, self._args.dep_wtp)
-                        self.image3c.run_category = "enhance_rgb"
+                        self.image3c.submit("enhance_rgb", ((0, 1, 2), tuple(separ), tuple(fact), value[1], value[2], True, self._args.dep_wtp))
 
                     elif value[0] == 2:
                         point = Color(rgb, tp=CTP.rgb)
@@ -1130,11 +1116,7 @@ class Image(QWidget):
                         fact.append((self._args.sys_color_set[self._args.sys_activated_idx].hsv[1] - hsv[1]))
                         separ.append(hsv[2])
                         fact.append((self._args.sys_color_set[self._args.sys_activated_idx].hsv[2] - hsv[2]))
-                        self.image3c.run_args = ((0, 1, 2), tuple(separ), tuple(fact), value[1], value[2], True, self._args.dep_wtp)
-                        self.image3c.run_category = "enhance_hsv"
-
-                    self.image3c.start()
-                    self._enhance_lock = True
+                        self.image3c.submit("enhance_hsv", ((0, 1, 2), tuple(separ), tuple(fact), value[1], value[2], True, self._args.dep_wtp))
 
                 else:
                     self._locating_img = False
@@ -1179,17 +1161,38 @@ class Image(QWidget):
         self._home_image = False
         self.update()
 
+    def precompute_finished(self, idx):
+        """
+        Background precompute finished. Only mark category image as available, crop and locate in progress are kept.
+        """
+
+        self._categories.add(idx)
+        self.update()
+
     def extract_finished(self, value):
         """
-        Enhance finished.
+        Extract finished. Candidate color sets are kept for switching.
+        """
+
+        self._extract_candidates = tuple(tuple(tuple(loc) if loc else None for loc in extracts) for extracts in value)
+        self._extract_candidate_idx = 0
+        self.apply_extract(self._extract_candidates[0])
+
+    def apply_extract(self, value):
+        """
+        Apply extracted color locations into color set.
         """
 
         self._args.hm_rule = "custom"
         self.ps_modify_rule.emit(True)
-        self._args.sys_color_locs = value
+        self._args.sys_color_locs = list(value)
+        rgb_data = self.image3c.rgb_data
 
         for i in range(5):
-            rgb = self.image3c.rgb_data[int(round(value[i][1] * (self.image3c.rgb_data.shape[0] - 1)))][int(round(value[i][0] * (self.image3c.rgb_data.shape[1] - 1)))]
+            if not value[i] or not isinstance(rgb_data, np.ndarray):
+                continue
+
+            rgb = rgb_data[int(round(value[i][1] * (rgb_data.shape[0] - 1)))][int(round(value[i][0] * (rgb_data.shape[1] - 1)))]
             color = Color(rgb, tp=CTP.rgb, overflow=self._args.sys_color_set.get_overflow())
             self._args.sys_color_set.modify(self._args.hm_rule, i, color, do_sync=False)
 
@@ -1209,7 +1212,6 @@ class Image(QWidget):
         if idx == 3:
             self.warning(self._image_errs[7])
 
-        self._enhance_lock = False
         self._locating_img = False
         self._locating_img_loc = None
         self._home_image = False
@@ -1220,7 +1222,10 @@ class Image(QWidget):
         Modify color set by overlabel.
         """
 
-        if not isinstance(self.image3c.rgb_data, np.ndarray):
+        # rgb data is read once, since it is replaced by the image thread when an image is opened.
+        rgb_data = self.image3c.rgb_data
+
+        if not isinstance(rgb_data, np.ndarray):
             return
 
         if self._args.sys_activated_assit_idx < 0:
@@ -1230,8 +1235,8 @@ class Image(QWidget):
             loc = self._args.sys_assit_color_locs[self._args.sys_activated_idx][self._args.sys_activated_assit_idx]
 
         if loc:
-            shape = self.image3c.rgb_data.shape
-            rgb = self.image3c.rgb_data[int(round(loc[1] * (shape[0] - 1)))][int(round(loc[0] * (shape[1] - 1)))]
+            shape = rgb_data.shape
+            rgb = rgb_data[int(round(loc[1] * (shape[0] - 1)))][int(round(loc[0] * (shape[1] - 1)))]
 
             if self._args.sys_activated_assit_idx < 0:
                 if not (rgb == self._args.sys_color_set[self._args.sys_activated_idx].rgb).all():
@@ -1249,15 +1254,17 @@ class Image(QWidget):
         Update color set by overlabel.
         """
 
-        if not isinstance(self.image3c.rgb_data, np.ndarray):
+        rgb_data = self.image3c.rgb_data
+
+        if not isinstance(rgb_data, np.ndarray):
             return
 
         for idx in range(5):
             loc = self._args.sys_color_locs[idx]
 
             if loc:
-                shape = self.image3c.rgb_data.shape
-                rgb = self.image3c.rgb_data[int(round(loc[1] * (shape[0] - 1)))][int(round(loc[0] * (shape[1] - 1)))]
+                shape = rgb_data.shape
+                rgb = rgb_data[int(round(loc[1] * (shape[0] - 1)))][int(round(loc[0] * (shape[1] - 1)))]
 
                 if not (rgb == self._args.sys_color_set[idx].rgb).all():
                     self._args.sys_color_locs[idx] = None
@@ -1266,8 +1273,8 @@ class Image(QWidget):
                 loc = self._args.sys_assit_color_locs[idx][assit_idx]
 
                 if loc:
-                    shape = self.image3c.rgb_data.shape
-                    rgb = self.image3c.rgb_data[int(round(loc[1] * (shape[0] - 1)))][int(round(loc[0] * (shape[1] - 1)))]
+                    shape = rgb_data.shape
+                    rgb = rgb_data[int(round(loc[1] * (shape[0] - 1)))][int(round(loc[0] * (shape[1] - 1)))]
                     curr_color = gen_assit_color(self._args.sys_color_set[idx], *self._args.sys_grid_assitlocs[idx][assit_idx][2:6])
 
                     if not (rgb == curr_color.rgb).all():
@@ -1283,7 +1290,7 @@ class Image(QWidget):
         if not (self.isVisible() and self.image3c.display):
             return
 
-        if self.image3c.isRunning():
+        if self.image3c.is_busy():
             self.warning(self._image_errs[1])
             return
 
@@ -28,6 +28,7 @@ class Script(SideWidget):
     ps_freeze = pyqtSignal(bool)
     ps_print = pyqtSignal(bool)
     ps_extract = pyqtSignal(int)
+    ps_switch_extract = pyqtSignal(int)
 
     def __init__(self, wget, args):
         """
@@ -123,7 +124,7 @@ class Script(SideWidget):
         self.scroll_grid_layout.addWidget(self._extract_fbox, 1, 1, 1, 1)
         self._extract_btns = []
 
-        for i in range(6):
+        for i in range(8):
             btn = QPushButton(self._extract_fbox.gbox)
             self._extract_btns.append(btn)
 
@@ -139,12 +140,16 @@ class Script(SideWidget):
         self._extract_btns[4].clicked.connect(lambda x: self.ps_extract.emit(4))
         gbox_grid_layout.addWidget(self._extract_btns[5], 5, 1, 1, 1)
         self._extract_btns[5].clicked.connect(lambda x: self.ps_extract.emit(5))
+        gbox_grid_layout.addWidget(self._extract_btns[6], 6, 1, 1, 1)
+        self._extract_btns[6].clicked.connect(lambda x: self.ps_switch_extract.emit(-1))
+        gbox_grid_layout.addWidget(self._extract_btns[7], 7, 1, 1, 1)
+        self._extract_btns[7].clicked.connect(lambda x: self.ps_switch_extract.emit(1))
         spacer = QSpacerItem(5, 5, QSizePolicy.Minimum, QSizePolicy.Expanding)
-        gbox_grid_layout.addItem(spacer, 6, 1, 1, 1)
+        gbox_grid_layout.addItem(spacer, 8, 1, 1, 1)
         spacer = QSpacerItem(5, 5, QSizePolicy.Minimum, QSizePolicy.Minimum)
-        gbox_grid_layout.addItem(spacer, 6, 0, 1, 1)
+        gbox_grid_layout.addItem(spacer, 8, 0, 1, 1)
         spacer = QSpacerItem(5, 5, QSizePolicy.Minimum, QSizePolicy.Minimum)
-        gbox_grid_layout.addItem(spacer, 6, 2, 1, 1)
+        gbox_grid_layout.addItem(spacer, 8, 2, 1, 1)
         self.scroll_grid_layout.addItem(self.over_spacer, 6, 1, 1, 1)
         self._all_fboxes = (self._filter_fbox, self._zoom_fbox, self._crop_fbox, self._snap_fbox, self._extract_fbox)
         self.scroll_grid_layout.addWidget(self._exp_all_btn, 0, 1, 1, 1)
@@ -186,7 +191,7 @@ class Script(SideWidget):
         self.btn_print.setText(self._snap_descs[1])
         self._extract_fbox.set_title(self._gbox_descs[4])
 
-        for i in range(6):
+        for i in range(8):
             self._extract_btns[i].setText(self._extract_descs[i])
 
     def _func_tr_(self):
@@ -206,6 +211,8 @@ class Script(SideWidget):
             _translate("Script", "Bright"),
             _translate("Script", "Light"),
             _translate("Script", "Dark"),
+            _translate("Script", "Previous Extract"),
+            _translate("Script", "Next Extract"),
         )
 
         self._filter_descs = (